@@ -1,6 +1,12 @@
 import streamlit as st
 
+from aquecimento import AQUECER_AO_INICIAR
+from recursos_compartilhados import obter_aquecimento
+
 st.set_page_config(layout="wide")
+# Carrega base, vagas e (no runtime NumPy) o recomendador em segundo plano assim que o servidor atende a primeira sessão.
+if AQUECER_AO_INICIAR:
+    obter_aquecimento().iniciar()
 # Logo apenas na sidebar expandida
 st.logo(
     image="assets/logo-transparente (2).png",  # Caminho para sua imagem principal
@@ -3,6 +3,8 @@ import google.generativeai as genai
 import os
 import json
 
+from rastreamento import etapa
+
 def generate(texto):
     """
     Gera conteúdo usando a API Gemini com base no texto de entrada.
@@ -117,7 +119,10 @@ def generate(texto):
             generation_config=generation_config,            
         )
 
-        response = model.generate_content(contents=contents,  request_options={'timeout': 120})
+        with etapa("gemini_gerar_perguntas", modelo=model_name) as atributos:
+            response = model.generate_content(contents=contents,  request_options={'timeout': 120})
+            if response.usage_metadata:
+                atributos["tokens"] = response.usage_metadata.total_token_count
 
         if response.usage_metadata:
             print("Informações de Uso de Tokens:")
@@ -217,7 +222,10 @@ def melhorar_descricao_vaga(texto):
             generation_config=generation_config,            
         )
 
-        response = model.generate_content(contents=contents,  request_options={'timeout': 120})
+        with etapa("gemini_melhorar_descricao", modelo=model_name) as atributos:
+            response = model.generate_content(contents=contents,  request_options={'timeout': 120})
+            if response.usage_metadata:
+                atributos["tokens"] = response.usage_metadata.total_token_count
 
         if response.usage_metadata:
             print("Informações de Uso de Tokens:")
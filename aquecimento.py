@@ -0,0 +1,176 @@
+"""
+Aquecimento, em segundo plano, dos recursos da página de ranking quando o
+servidor sobe.
+
+Sem ele, o primeiro recrutador a escolher "Dados Internos (Sistema)" depois
+de um deploy esperava a carga da base de candidatos e, ao gerar o ranking, a
+do modelo e do índice. O ``App.py`` inicia um ``Aquecimento`` (compartilhado
+por todas as sessões via ``st.cache_resource``) que, em uma thread, carrega
+a base de candidatos, o catálogo de vagas e o recomendador, publicando este
+último no ``RegistroRecomendadores`` do processo. A página consulta o estado
+de cada etapa: enquanto a base não está pronta ela mostra o aquecimento em
+vez de bloquear; depois, todas as sessões já encontram tudo carregado.
+
+Com o armazém SQLite/FTS5 configurado (``ARMAZEM_CANDIDATOS``), a base não é
+carregada em memória: a etapa de candidatos fica pronta de imediato e o
+recomendador lê os candidatos do armazém.
+
+O recomendador só é aquecido quando o modelo roda no runtime NumPy (pesos
+exportados por ``modelo_numpy.py`` e atualizados). Sem eles, carregá-lo
+importaria o TensorFlow em todo processo do servidor, mesmo que nenhuma
+página de ranking fosse aberta; a etapa fica pendente e o modelo é carregado
+na primeira geração de ranking.
+
+Defina ``AQUECIMENTO=0`` para não aquecer ao iniciar (a página volta a
+carregar tudo sob demanda).
+"""
+import os
+import time
+import threading
+
+from base_dados import carregar_candidatos_internos, carregar_vagas_sistema
+from indice_candidatos import DIRETORIO_INDICE_PADRAO, indice_disponivel
+from armazem_candidatos import ARQUIVO_ARMAZEM_PADRAO, armazem_disponivel
+from modelo_numpy import pesos_atualizados
+
+
+AQUECER_AO_INICIAR = os.environ.get("AQUECIMENTO", "1") != "0"
+MODELO_PADRAO = "modelo_final.keras"
+
+PENDENTE = "pendente"
+CARREGANDO = "carregando"
+PRONTO = "pronto"
+ERRO = "erro"
+
+ETAPA_CANDIDATOS = "candidatos"
+ETAPA_VAGAS = "vagas"
+ETAPA_RECOMENDADOR = "recomendador"
+ETAPAS = (ETAPA_CANDIDATOS, ETAPA_VAGAS, ETAPA_RECOMENDADOR)
+
+
+class Aquecimento:
+    """
+    Carrega a base de candidatos, as vagas e o recomendador em uma thread.
+
+    Args:
+        registro (RegistroRecomendadores): Registro onde o recomendador aquecido
+            é publicado (o mesmo consultado pela página).
+        model_path (str): Caminho do modelo, como passado pela página.
+        diretorio_indice (str): Índice persistido, usado se estiver disponível.
+        caminho_armazem (str): Armazém de candidatos; se existir, tem precedência
+            sobre o índice e a base não é carregada em memória.
+    """
+
+    def __init__(self, registro, model_path=MODELO_PADRAO, diretorio_indice=DIRETORIO_INDICE_PADRAO,
+                 caminho_armazem=ARQUIVO_ARMAZEM_PADRAO):
+        self.registro = registro
+        self.model_path = model_path
+        self.diretorio_indice = diretorio_indice
+        self.caminho_armazem = caminho_armazem
+        self._estados = {etapa: {"estado": PENDENTE} for etapa in ETAPAS}
+        self._valores = {}
+        self._trava = threading.Lock()
+        self._concluido = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        """
+        Inicia a thread de aquecimento (só na primeira chamada).
+
+        Returns:
+            Aquecimento: A própria instância.
+        """
+        with self._trava:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="aquecimento", daemon=True)
+                self._thread.start()
+        return self
+
+    @property
+    def iniciado(self):
+        return self._thread is not None
+
+    @property
+    def em_andamento(self):
+        return self.iniciado and not self._concluido.is_set()
+
+    def aguardar(self, timeout=None):
+        """
+        Espera o fim do aquecimento. Retorna False se o ``timeout`` expirar.
+        """
+        return self._concluido.wait(timeout)
+
+    def estado(self, etapa):
+        """
+        Estado de uma etapa: dicionário com 'estado' (pendente, carregando,
+        pronto ou erro) e, conforme o caso, 'duracao_s', 'erro' ou 'motivo'
+        (recomendador deixado para a primeira geração de ranking).
+        """
+        with self._trava:
+            return dict(self._estados[etapa])
+
+    def estados(self):
+        with self._trava:
+            return {etapa: dict(estado) for etapa, estado in self._estados.items()}
+
+    def pronto(self, etapa):
+        return self.estado(etapa)["estado"] == PRONTO
+
+    def valor(self, etapa):
+        """
+        Resultado da etapa (DataFrame ou recomendador), ou None se ainda não está pronto.
+        """
+        with self._trava:
+            return self._valores.get(etapa)
+
+    def _atualizar(self, etapa, **campos):
+        with self._trava:
+            self._estados[etapa] = campos
+
+    def _etapa(self, etapa, carregar):
+        self._atualizar(etapa, estado=CARREGANDO)
+        inicio = time.perf_counter()
+        try:
+            valor = carregar()
+        except Exception as e:
+            # Uma etapa com erro não derruba o servidor: a página carrega sob demanda.
+            print(f"Aquecimento: falha em '{etapa}': {e}")
+            self._atualizar(etapa, estado=ERRO, erro=str(e), duracao_s=time.perf_counter() - inicio)
+            return None
+        duracao = time.perf_counter() - inicio
+        with self._trava:
+            self._valores[etapa] = valor
+            self._estados[etapa] = {"estado": PRONTO, "duracao_s": duracao}
+        print(f"Aquecimento: '{etapa}' pronto em {duracao:.1f}s")
+        return valor
+
+    def _aquecer_recomendador(self, df_candidatos, caminho_armazem=None):
+        if not pesos_atualizados(self.model_path):
+            # O Keras importaria o TensorFlow agora; fica para a primeira geração de ranking.
+            print("Aquecimento: modelo sem pesos exportados para o runtime NumPy; "
+                  "o recomendador será carregado sob demanda.")
+            self._atualizar(ETAPA_RECOMENDADOR, estado=PENDENTE, motivo="modelo sem pesos exportados (.npz)")
+            return
+        self._etapa(ETAPA_RECOMENDADOR, lambda: self._carregar_recomendador(df_candidatos, caminho_armazem))
+
+    def _carregar_recomendador(self, df_candidatos, caminho_armazem=None):
+        caminho_indice = self.diretorio_indice if indice_disponivel(self.diretorio_indice) else None
+        return self.registro.obter(df_candidatos=df_candidatos, model_path=self.model_path,
+                                   caminho_indice=caminho_indice, caminho_armazem=caminho_armazem)
+
+    def _executar(self):
+        try:
+            if armazem_disponivel(self.caminho_armazem):
+                # Base no armazém: nada a carregar em memória.
+                self._atualizar(ETAPA_CANDIDATOS, estado=PRONTO, duracao_s=0.0, armazem=self.caminho_armazem)
+                self._etapa(ETAPA_VAGAS, carregar_vagas_sistema)
+                self._aquecer_recomendador(None, self.caminho_armazem)
+                return
+            df_candidatos = self._etapa(ETAPA_CANDIDATOS, carregar_candidatos_internos)
+            self._etapa(ETAPA_VAGAS, carregar_vagas_sistema)
+            if df_candidatos is None:
+                self._atualizar(ETAPA_RECOMENDADOR, estado=ERRO, erro="base de candidatos indisponível")
+            else:
+                self._aquecer_recomendador(df_candidatos)
+        finally:
+            self._concluido.set()
@@ -0,0 +1,445 @@
+"""
+Armazém local de candidatos em SQLite, com índice de texto completo FTS5
+sobre o currículo pré-processado, usado como pré-filtro da busca.
+
+Com a base inteira em um DataFrame mais a matriz TF-IDF, a memória cresce
+com o número de candidatos. No armazém cada candidato é uma linha da tabela
+``candidatos`` (com o currículo original e o pré-processado) e a tabela
+virtual ``candidatos_fts`` indexa o texto pré-processado (os mesmos tokens do
+vetorizador). Uma consulta:
+
+1. transforma a vaga no espaço TF-IDF e usa os termos de maior peso dela
+   (sem os que aparecem em mais de ``FRACAO_MAXIMA_DOCUMENTOS`` da base) em
+   uma consulta FTS5 (``termo1 OR termo2 ...``), ordenada por BM25, que
+   devolve até ``LIMITE_PRE_FILTRO`` candidatos;
+2. monta a matriz TF-IDF só desse subconjunto, a partir dos vetores gravados
+   com cada candidato, e aplica o mesmo cosseno de ``modelo.py``
+   (``topk_similaridade``);
+3. lê da tabela as demais colunas apenas dos ``k`` escolhidos.
+
+Só o subconjunto passa pela memória, então o uso de memória não depende do
+tamanho da base. O vocabulário e o IDF vêm do índice persistido
+(``indice_candidatos.py``), quando existe, ou são ajustados sobre uma amostra
+de até ``AMOSTRA_VETORIZADOR`` currículos do próprio armazém; ficam gravados
+no arquivo, que é autossuficiente.
+
+O armazém é opcional: a página e o aquecimento só o usam quando a variável de
+ambiente ``ARMAZEM_CANDIDATOS`` aponta para um arquivo construído. Nesse caso
+a base não é carregada em memória e as colunas dos candidatos retornados são
+lidas do armazém (``ler``).
+
+Custo do pré-filtro: o ranking final é o cosseno TF-IDF, mas só sobre os
+``LIMITE_PRE_FILTRO`` melhores pelo BM25 do FTS5; um candidato fora desse
+corte nunca é considerado. Em bases sintéticas de 20 mil currículos o recall@10
+contra o índice exato ficou em ~0,89, com p50 de ~280 ms por consulta contra
+~6 ms do índice em memória, e a latência cresce com a base (as listas dos
+termos frequentes crescem junto). Use o armazém quando a memória da base
+inteira for o limite, não a latência.
+
+    python armazem_candidatos.py --saida candidatos.sqlite
+    python armazem_candidatos.py --candidatos planilha.xlsx --saida candidatos.sqlite   # acrescenta
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from base_dados import (CAMINHO_APPLICANTS, CAMPOS_CATEGORICOS_CANDIDATO, COLUNAS_TRECHOS_MODELO,
+                        iterar_blocos_candidatos, converter_ids)
+from busca_topk import topk_similaridade
+from indice_candidatos import (DIRETORIO_INDICE_PADRAO, ARQUIVO_VOCABULARIO, ARQUIVO_IDF, TIPO_VALORES,
+                               criar_vetorizador, compactar_matriz, indice_disponivel)
+from preprocessamento import preprocessar_lote, garantir_recursos_nltk
+
+
+ARQUIVO_ARMAZEM_PADRAO = os.environ.get("ARMAZEM_CANDIDATOS")
+LIMITE_PRE_FILTRO = 3000
+AMOSTRA_VETORIZADOR = 20000
+TAMANHO_BLOCO_ARMAZEM = 5000
+# Termos da vaga usados na consulta FTS5 (os de maior peso TF-IDF): cada termo a mais
+# encarece o ranking BM25 do FTS5 mais do que melhora o pré-filtro.
+MAXIMO_TERMOS_CONSULTA = 32
+# Termos presentes em mais que essa fração da base casam quase todos os candidatos: só
+# alongam as listas que o FTS5 percorre e ficam fora da consulta. Se a vaga só tiver
+# termos assim, entram os ``MINIMO_TERMOS_CONSULTA`` mais raros.
+FRACAO_MAXIMA_DOCUMENTOS = 0.5
+MINIMO_TERMOS_CONSULTA = 4
+
+COLUNAS_CATEGORICAS = list(CAMPOS_CATEGORICOS_CANDIDATO.values())
+COLUNAS_POSICOES_MODELO = [coluna for par in COLUNAS_TRECHOS_MODELO for coluna in par]
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS candidatos (
+    linha INTEGER PRIMARY KEY,
+    id_candidato UNIQUE NOT NULL,
+    nome_candidato TEXT,
+    curriculo TEXT NOT NULL,
+    curriculo_processado TEXT NOT NULL,
+    -- Vetor TF-IDF esparso: colunas (int32) e pesos (float32) em bytes.
+    vetor_colunas BLOB,
+    vetor_pesos BLOB,
+    -- Posições, no currículo, dos trechos do texto do modelo (NULL: o currículo todo).
+    {', '.join(f'{coluna} INTEGER' for coluna in COLUNAS_POSICOES_MODELO)},
+    {', '.join(f'{coluna} TEXT' for coluna in COLUNAS_CATEGORICAS)}
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS candidatos_fts USING fts5(
+    curriculo_processado, content='candidatos', content_rowid='linha', tokenize='unicode61 remove_diacritics 2'
+);
+-- O índice FTS5 (de conteúdo externo) acompanha a tabela pelos gatilhos. Indexa o texto
+-- pré-processado, o mesmo do vetorizador: os termos da consulta têm os mesmos tokens.
+CREATE TRIGGER IF NOT EXISTS candidatos_inclusao AFTER INSERT ON candidatos BEGIN
+    INSERT INTO candidatos_fts(rowid, curriculo_processado) VALUES (new.linha, new.curriculo_processado);
+END;
+CREATE TRIGGER IF NOT EXISTS candidatos_exclusao AFTER DELETE ON candidatos BEGIN
+    INSERT INTO candidatos_fts(candidatos_fts, rowid, curriculo_processado)
+        VALUES ('delete', old.linha, old.curriculo_processado);
+END;
+CREATE TRIGGER IF NOT EXISTS candidatos_alteracao AFTER UPDATE OF curriculo_processado ON candidatos BEGIN
+    INSERT INTO candidatos_fts(candidatos_fts, rowid, curriculo_processado)
+        VALUES ('delete', old.linha, old.curriculo_processado);
+    INSERT INTO candidatos_fts(rowid, curriculo_processado) VALUES (new.linha, new.curriculo_processado);
+END;
+CREATE TABLE IF NOT EXISTS metadados (chave TEXT PRIMARY KEY, valor TEXT NOT NULL);
+"""
+
+_COLUNAS_SAIDA = ["id_candidato", "nome_candidato", "curriculo"] + COLUNAS_POSICOES_MODELO + COLUNAS_CATEGORICAS
+
+
+def armazem_disponivel(caminho=ARQUIVO_ARMAZEM_PADRAO):
+    return bool(caminho) and os.path.isfile(caminho)
+
+
+def _serializar(matriz):
+    matriz = compactar_matriz(matriz)
+    colunas = matriz.indices.astype(np.int32, copy=False)
+    return [(colunas[inicio:fim].tobytes(), matriz.data[inicio:fim].tobytes())
+            for inicio, fim in zip(matriz.indptr[:-1], matriz.indptr[1:])]
+
+
+def _desserializar(vetores, n_termos):
+    colunas = [np.frombuffer(v[0] or b'', dtype=np.int32) for v in vetores]
+    pesos = [np.frombuffer(v[1] or b'', dtype=TIPO_VALORES) for v in vetores]
+    indptr = np.zeros(len(vetores) + 1, dtype=np.int32)
+    np.cumsum([len(c) for c in colunas], out=indptr[1:])
+    vazio = np.empty(0, dtype=np.int32)
+    return sparse.csr_matrix(
+        (np.concatenate(pesos) if pesos else np.empty(0, dtype=TIPO_VALORES),
+         np.concatenate(colunas) if colunas else vazio, indptr),
+        shape=(len(vetores), n_termos)
+    )
+
+
+def consulta_fts(termos):
+    """
+    Consulta FTS5 que casa qualquer um dos ``termos`` (bigramas viram frases).
+    """
+    # Aspas duplas delimitam frases no FTS5; dentro delas, são escapadas dobrando.
+    frases = ['"' + termo.replace('"', '""') + '"' for termo in termos if termo.strip()]
+    return ' OR '.join(frases)
+
+
+class ArmazemCandidatos:
+    """
+    Candidatos em um arquivo SQLite com índice FTS5.
+
+    Cada operação abre a própria conexão, de modo que a instância pode ser
+    compartilhada entre as sessões (threads) do servidor.
+
+    Args:
+        caminho (str): Arquivo do armazém (criado se não existir).
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._vectorizer = None
+        self._termos = None
+        self._trava = threading.Lock()
+        with self._conectar() as conexao:
+            conexao.executescript(_ESQUEMA)
+            # Armazéns gravados antes das colunas do texto do modelo.
+            existentes = {coluna[1] for coluna in conexao.execute("PRAGMA table_info(candidatos)")}
+            for coluna in COLUNAS_POSICOES_MODELO:
+                if coluna not in existentes:
+                    conexao.execute(f"ALTER TABLE candidatos ADD COLUMN {coluna} INTEGER")
+
+    @contextmanager
+    def _conectar(self):
+        # Uma transação por bloco ``with``; a conexão é fechada ao sair.
+        conexao = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            with conexao:
+                yield conexao
+        finally:
+            conexao.close()
+
+    def _metadado(self, chave, padrao=None):
+        with self._conectar() as conexao:
+            linha = conexao.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+        return json.loads(linha[0]) if linha else padrao
+
+    def _gravar_metadados(self, conexao, **valores):
+        conexao.executemany("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)",
+                            [(chave, json.dumps(valor, ensure_ascii=False)) for chave, valor in valores.items()])
+
+    def __len__(self):
+        with self._conectar() as conexao:
+            return conexao.execute("SELECT COUNT(*) FROM candidatos").fetchone()[0]
+
+    @property
+    def versao(self):
+        """
+        Muda a cada escrita; usada para invalidar resultados em cache.
+        """
+        return self._metadado("versao")
+
+    def adicionar(self, df_candidatos, n_processos=None):
+        """
+        Insere (ou atualiza, pelo ``id_candidato``) os candidatos do DataFrame.
+
+        Args:
+            df_candidatos (DataFrame): Colunas 'id_candidato' e 'curriculo';
+                'nome_candidato', as posições do texto do modelo
+                (``COLUNAS_TRECHOS_MODELO``) e os campos categóricos são opcionais.
+            n_processos (int, opcional): Processos do pré-processamento.
+
+        Returns:
+            int: Candidatos gravados.
+        """
+        if df_candidatos.empty:
+            return 0
+        processados = preprocessar_lote(df_candidatos['curriculo'].fillna('').astype(str), n_processos=n_processos)
+        colunas = {coluna: (df_candidatos[coluna].fillna('').astype(str).tolist() if coluna in df_candidatos.columns
+                            else [''] * len(df_candidatos)) for coluna in ["nome_candidato"] + COLUNAS_CATEGORICAS}
+        posicoes = {coluna: ([None if pd.isna(p) else int(p) for p in df_candidatos[coluna]]
+                             if coluna in df_candidatos.columns else [None] * len(df_candidatos))
+                    for coluna in COLUNAS_POSICOES_MODELO}
+        ids = [i.item() if hasattr(i, 'item') else i for i in df_candidatos['id_candidato']]
+        # Sem vetorizador ainda, os vetores são gravados por ``definir_vetorizador``.
+        vetores = (_serializar(self.transformar(processados)) if self._metadado("vocabulario") is not None
+                   else [(None, None)] * len(processados))
+        linhas = zip(ids, colunas["nome_candidato"], df_candidatos['curriculo'].fillna('').astype(str), processados,
+                     *zip(*vetores),
+                     *(posicoes[coluna] for coluna in COLUNAS_POSICOES_MODELO), *(colunas[coluna] for coluna in COLUNAS_CATEGORICAS))
+        nomes = (["id_candidato", "nome_candidato", "curriculo", "curriculo_processado", "vetor_colunas", "vetor_pesos"]
+                 + COLUNAS_POSICOES_MODELO + COLUNAS_CATEGORICAS)
+        atualizacao = ', '.join(f"{nome} = excluded.{nome}" for nome in nomes[1:])
+        with self._conectar() as conexao:
+            conexao.executemany(
+                f"INSERT INTO candidatos ({', '.join(nomes)}) VALUES ({', '.join('?' * len(nomes))}) "
+                f"ON CONFLICT(id_candidato) DO UPDATE SET {atualizacao}",
+                linhas
+            )
+            self._gravar_metadados(conexao, versao=uuid.uuid4().hex)
+        return len(df_candidatos)
+
+    def definir_vetorizador(self, vocabulario, idf, tamanho_bloco=TAMANHO_BLOCO_ARMAZEM):
+        """
+        Grava o vocabulário (termo -> coluna) e o IDF usados nas consultas e
+        refaz, bloco a bloco, os vetores TF-IDF dos candidatos já gravados.
+        """
+        with self._conectar() as conexao:
+            self._gravar_metadados(conexao, vocabulario={termo: int(coluna) for termo, coluna in vocabulario.items()},
+                                   idf=[float(valor) for valor in idf], versao=uuid.uuid4().hex)
+        with self._trava:
+            self._vectorizer = None
+            self._termos = None
+        ultima = -1
+        while True:
+            with self._conectar() as conexao:
+                bloco = conexao.execute(
+                    "SELECT linha, curriculo_processado FROM candidatos WHERE linha > ? ORDER BY linha LIMIT ?",
+                    (ultima, tamanho_bloco)).fetchall()
+                if not bloco:
+                    break
+                vetores = _serializar(self.transformar([linha[1] for linha in bloco]))
+                conexao.executemany("UPDATE candidatos SET vetor_colunas = ?, vetor_pesos = ? WHERE linha = ?",
+                                    [(*vetor, linha[0]) for vetor, linha in zip(vetores, bloco)])
+            ultima = bloco[-1][0]
+
+    def ajustar_vetorizador(self, tamanho_amostra=AMOSTRA_VETORIZADOR):
+        """
+        Ajusta o vetorizador sobre uma amostra aleatória dos currículos do armazém.
+        """
+        with self._conectar() as conexao:
+            amostra = [linha[0] for linha in conexao.execute(
+                "SELECT curriculo_processado FROM candidatos ORDER BY random() LIMIT ?", (tamanho_amostra,))]
+        vectorizer = criar_vetorizador().fit(amostra)
+        self.definir_vetorizador(vectorizer.vocabulary_, vectorizer.idf_)
+
+    @property
+    def vectorizer(self):
+        with self._trava:
+            if self._vectorizer is None:
+                vocabulario = self._metadado("vocabulario")
+                if vocabulario is None:
+                    raise FileNotFoundError(f"O armazém {self.caminho} não tem vetorizador; reconstrua-o.")
+                self._vectorizer = criar_vetorizador(vocabulario=vocabulario, idf=np.array(self._metadado("idf")))
+                termos = np.empty(len(vocabulario), dtype=object)
+                termos[list(vocabulario.values())] = list(vocabulario)
+                self._termos = termos
+            return self._vectorizer
+
+    @property
+    def termos(self):
+        """
+        Termo de cada coluna do vetorizador.
+        """
+        self.vectorizer
+        return self._termos
+
+    def transformar(self, textos_preprocessados):
+        return compactar_matriz(self.vectorizer.transform(textos_preprocessados))
+
+    def termos_consulta(self, embedding_vaga):
+        """
+        Termos da vaga usados no pré-filtro: os de maior peso TF-IDF, sem os
+        que aparecem em mais de ``FRACAO_MAXIMA_DOCUMENTOS`` da base.
+        """
+        pesos = embedding_vaga.tocsr()
+        idf = self.vectorizer.idf_[pesos.indices]
+        # Com smooth_idf, idf = ln((1 + n) / (1 + df)) + 1: df <= fração * (1 + n) - 1.
+        seletivos = idf >= 1 + np.log(1 / FRACAO_MAXIMA_DOCUMENTOS)
+        if seletivos.any():
+            ordem = np.argsort(-np.where(seletivos, pesos.data, -np.inf), kind='stable')
+            ordem = ordem[:min(MAXIMO_TERMOS_CONSULTA, int(seletivos.sum()))]
+        else:
+            ordem = np.argsort(-idf, kind='stable')[:MINIMO_TERMOS_CONSULTA]
+        # Bigramas entram como frase.
+        return self.termos[pesos.indices[ordem]]
+
+    def primeiros(self, n=10):
+        """
+        Os ``n`` primeiros candidatos do armazém (para pré-visualização).
+        """
+        with self._conectar() as conexao:
+            registros = conexao.execute(
+                f"SELECT {', '.join(_COLUNAS_SAIDA)} FROM candidatos ORDER BY linha LIMIT ?", (int(n),)).fetchall()
+        return pd.DataFrame(registros, columns=_COLUNAS_SAIDA)
+
+    def pre_filtrar(self, termos, limite=LIMITE_PRE_FILTRO):
+        """
+        Até ``limite`` candidatos cujo currículo casa algum dos ``termos``, do
+        maior para o menor BM25.
+
+        Returns:
+            tuple: (array com a 'linha' de cada candidato, matriz TF-IDF deles).
+        """
+        consulta = consulta_fts(termos)
+        linhas = []
+        if consulta:
+            with self._conectar() as conexao:
+                linhas = conexao.execute(
+                    "SELECT c.linha, c.vetor_colunas, c.vetor_pesos "
+                    "FROM candidatos_fts f JOIN candidatos c ON c.linha = f.rowid "
+                    "WHERE candidatos_fts MATCH ? ORDER BY f.rank LIMIT ?",
+                    (consulta, int(limite))
+                ).fetchall()
+        matriz = _desserializar([linha[1:] for linha in linhas], len(self.termos))
+        return np.array([linha[0] for linha in linhas], dtype=np.int64), matriz
+
+    def ler(self, linhas):
+        """
+        Colunas de saída dos candidatos nas ``linhas`` dadas, na mesma ordem.
+        """
+        linhas = [int(linha) for linha in linhas]
+        if not linhas:
+            return pd.DataFrame(columns=_COLUNAS_SAIDA)
+        with self._conectar() as conexao:
+            registros = conexao.execute(
+                f"SELECT linha, {', '.join(_COLUNAS_SAIDA)} FROM candidatos "
+                f"WHERE linha IN ({', '.join('?' * len(linhas))})", linhas).fetchall()
+        por_linha = {registro[0]: registro[1:] for registro in registros}
+        return pd.DataFrame([por_linha[linha] for linha in linhas], columns=_COLUNAS_SAIDA)
+
+    def buscar(self, embedding_vaga, k, limite=LIMITE_PRE_FILTRO):
+        """
+        Os ``k`` candidatos mais similares à vaga entre os pré-filtrados pelo FTS5.
+
+        Args:
+            embedding_vaga (csr_matrix): Vaga no espaço TF-IDF do armazém (1 x n_termos).
+            k (int): Quantidade de candidatos retornados.
+            limite (int): Tamanho máximo do subconjunto pré-filtrado.
+
+        Returns:
+            tuple: (DataFrame dos candidatos, similaridades, vetores TF-IDF deles).
+        """
+        linhas, vetores = self.pre_filtrar(self.termos_consulta(embedding_vaga), max(limite, k))
+        if not len(linhas):
+            return self.ler([]), np.empty(0, dtype=np.float32), vetores
+        posicoes, similaridades = topk_similaridade(vetores, embedding_vaga, k)
+        return self.ler(linhas[posicoes]), similaridades, vetores[posicoes]
+
+
+def _ler_blocos(caminho, tamanho_bloco):
+    if caminho.endswith(".json"):
+        for ids, bloco in iterar_blocos_candidatos(caminho, tamanho_bloco=tamanho_bloco):
+            bloco.insert(0, "id_candidato", converter_ids(ids))
+            yield bloco
+    elif caminho.endswith(".xlsx"):
+        yield pd.read_excel(caminho)
+    elif caminho.endswith(".csv"):
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco)
+    else:
+        raise ValueError(f"Formato de arquivo de candidatos não suportado: {caminho}")
+
+
+def construir_armazem(caminho_candidatos, caminho_armazem, diretorio_indice=DIRETORIO_INDICE_PADRAO,
+                      n_processos=None, tamanho_bloco=TAMANHO_BLOCO_ARMAZEM):
+    """
+    Acrescenta ao armazém os candidatos de um applicants.json, de uma planilha
+    no formato do template (.xlsx) ou de um .csv, bloco a bloco.
+
+    Se o armazém ainda não tem vetorizador, usa o do índice persistido em
+    ``diretorio_indice`` (quando existe) ou o ajusta sobre uma amostra.
+
+    Returns:
+        ArmazemCandidatos: O armazém atualizado.
+    """
+    armazem = ArmazemCandidatos(caminho_armazem)
+    sem_vetorizador = armazem._metadado("vocabulario") is None
+    if sem_vetorizador and diretorio_indice and indice_disponivel(diretorio_indice):
+        # Antes da carga: os vetores já são gravados junto com cada bloco.
+        with open(os.path.join(diretorio_indice, ARQUIVO_VOCABULARIO), 'r', encoding='utf-8') as f:
+            vocabulario = json.load(f)
+        armazem.definir_vetorizador(vocabulario, np.load(os.path.join(diretorio_indice, ARQUIVO_IDF)))
+        print(f"Vetorizador copiado do índice {diretorio_indice}")
+        sem_vetorizador = False
+    for bloco in _ler_blocos(caminho_candidatos, tamanho_bloco):
+        gravados = armazem.adicionar(bloco, n_processos=n_processos)
+        print(f"{gravados} candidatos gravados ({len(armazem)} no armazém)")
+    if sem_vetorizador:
+        armazem.ajustar_vetorizador()
+        print("Vetorizador ajustado sobre uma amostra do armazém")
+    return armazem
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Constrói (ou amplia) o armazém SQLite/FTS5 de candidatos.")
+    parser.add_argument("--candidatos", default=CAMINHO_APPLICANTS,
+                        help="applicants.json, .xlsx no formato do template ou .csv com a coluna 'curriculo'.")
+    parser.add_argument("--saida", default=ARQUIVO_ARMAZEM_PADRAO or "candidatos.sqlite",
+                        help="Arquivo do armazém (acrescenta se já existir).")
+    parser.add_argument("--indice", default=DIRETORIO_INDICE_PADRAO,
+                        help="Índice persistido de onde copiar vocabulário e IDF.")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos para o pré-processamento (padrão: número de CPUs).")
+    args = parser.parse_args()
+
+    garantir_recursos_nltk()
+    inicio = time.time()
+    armazem = construir_armazem(args.candidatos, args.saida, args.indice, n_processos=args.processos)
+    print(f"Armazém {args.saida}: {len(armazem)} candidatos em {time.time() - inicio:.1f}s "
+          f"(versão {armazem.versao})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import re
+import json
+
+import pandas as pd
+
+from cache_dataset import carregar_com_cache
+from importacao_tardia import modulo_tardio
+
+pa = modulo_tardio("pyarrow")
+pc = modulo_tardio("pyarrow.compute")
+
+
+CAMINHO_APPLICANTS = "dataset/applicants.json"
+CAMINHO_VAGAS = "dataset/vagas.json"
+
+# Caracteres lidos por vez do applicants.json (o arquivo nunca é carregado inteiro).
+TAMANHO_LEITURA_JSON = 1 << 20
+_ESPACOS_JSON = re.compile(r'[ \t\n\r]*')
+# Caracteres que ainda fazem parte de um número JSON (fração, expoente, sinal).
+_CONTINUACAO_NUMERO_JSON = frozenset('0123456789.eE+-')
+
+# Lista de colunas consideradas importantes para formar o campo 'curriculo' consolidado.
+COLUNAS_IMPORTANTES = ["cv_pt", "cv_en", "informacoes_profissionais_titulo_profissional", "informacoes_profissionais_area_atuacao", "informacoes_profissionais_conhecimentos_tecnicos", "informacoes_profissionais_certificacoes", "informacoes_profissionais_outras_certificacoes", "informacoes_profissionais_nivel_profissional", "informacoes_profissionais_qualificacoes", "informacoes_profissionais_experiencias", "formacao_e_idiomas_nivel_academico", "formacao_e_idiomas_nivel_ingles", "formacao_e_idiomas_nivel_espanhol", "formacao_e_idiomas_outro_idioma", "formacao_e_idiomas_cursos", "formacao_e_idiomas_outro_curso"]
+
+COLUNA_NOME_APPLICANTS = "infos_basicas_nome"
+# Seções (objetos aninhados) de cada candidato no applicants.json.
+SECOES_APPLICANTS = ("infos_basicas", "informacoes_pessoais", "informacoes_profissionais", "formacao_e_idiomas",
+                     "cargo_atual")
+# Candidatos montados por vez na carga (e linhas por vez em concatenar_colunas).
+TAMANHO_BLOCO_CURRICULO = 10000
+# Versão do formato das tabelas geradas; muda o rótulo do cache quando as colunas mudam.
+VERSAO_FORMATO = 2
+
+# Texto do candidato usado no treino do modelo (modeloRanking.ipynb: cv_texto_pt,
+# applicant_conhecimentos e applicant_certificacoes). Cada trecho é uma sequência
+# contígua de ``COLUNAS_IMPORTANTES``; sua posição dentro do 'curriculo' fica nas
+# colunas 'inicio_modelo_<trecho>' e 'fim_modelo_<trecho>' (``COLUNAS_TRECHOS_MODELO``).
+TRECHOS_TEXTO_MODELO = {
+    "cv": ["cv_pt"],
+    "competencias": ["informacoes_profissionais_conhecimentos_tecnicos", "informacoes_profissionais_certificacoes"],
+}
+COLUNAS_TRECHOS_MODELO = [(f"inicio_modelo_{nome}", f"fim_modelo_{nome}") for nome in TRECHOS_TEXTO_MODELO]
+
+# Campos categóricos usados pelo modelo treinado (modeloRanking.ipynb), com os
+# nomes de coluna do notebook. Candidato: coluna normalizada do applicants.json.
+CAMPOS_CATEGORICOS_CANDIDATO = {
+    "informacoes_profissionais_area_atuacao": "applicant_area_atuacao",
+    "informacoes_profissionais_nivel_profissional": "applicant_nivel_profissional",
+    "formacao_e_idiomas_nivel_academico": "applicant_nivel_academico",
+    "formacao_e_idiomas_nivel_ingles": "applicant_nivel_ingles",
+    "formacao_e_idiomas_nivel_espanhol": "applicant_nivel_espanhol",
+}
+# Vaga: (seção, campo) do vagas.json, lidos com as mesmas chaves do notebook.
+CAMPOS_CATEGORICOS_VAGA = {
+    ("informacoes_basicas", "tipo_contratacao"): "tipo_contratacao",
+    ("perfil_vaga", "pais"): "pais_vaga",
+    ("perfil_vaga", "estado"): "estado_vaga",
+    ("perfil_vaga", "cidade"): "cidade_vaga",
+    ("perfil_vaga", "nivel_profissional"): "nivel_profissional_vaga",
+    ("perfil_vaga", "nivel_academico"): "nivel_academico_vaga",
+    ("perfil_vaga", "nivel_ingles"): "nivel_ingles_vaga",
+    ("perfil_vaga", "nivel_espanhol"): "nivel_espanhol_vaga",
+    ("perfil_vaga", "areas_atuacao"): "areas_atuacao_vaga",
+    ("perfil_vaga", "vaga_especifica_para_pcd"): "pcd_vaga",
+}
+
+
+def anular_campos_vazio(campo):
+    campo = str(campo)   
+
+    if campo == 'nan':
+        return None
+    
+    if campo != None:
+        campo = campo.strip()
+        
+    if campo ==  "":
+        return None
+    
+    return campo
+
+
+class _LeitorJson:
+    """
+    Lê um arquivo JSON em blocos e decodifica um valor por vez com
+    ``JSONDecoder.raw_decode``, mantendo em memória só o bloco corrente.
+    """
+
+    def __init__(self, arquivo, tamanho_leitura=TAMANHO_LEITURA_JSON):
+        self.arquivo = arquivo
+        self.tamanho_leitura = tamanho_leitura
+        self.buffer = ''
+        self.posicao = 0
+        self.fim_arquivo = False
+        self.decodificador = json.JSONDecoder()
+
+    def _ler(self):
+        bloco = self.arquivo.read(self.tamanho_leitura)
+        if not bloco:
+            self.fim_arquivo = True
+            return False
+        # Descarta o que já foi consumido antes de anexar o bloco novo.
+        self.buffer = self.buffer[self.posicao:] + bloco
+        self.posicao = 0
+        return True
+
+    def caractere(self):
+        """
+        Consome e retorna o próximo caractere que não é espaço ('' no fim do arquivo).
+        """
+        while True:
+            espacos = _ESPACOS_JSON.match(self.buffer, self.posicao)
+            self.posicao = espacos.end()
+            if self.posicao < len(self.buffer):
+                self.posicao += 1
+                return self.buffer[self.posicao - 1]
+            if not self._ler():
+                return ''
+
+    def valor(self):
+        """
+        Decodifica o próximo valor JSON, lendo mais blocos enquanto ele estiver incompleto.
+        """
+        while True:
+            self.posicao = _ESPACOS_JSON.match(self.buffer, self.posicao).end()
+            try:
+                valor, fim = self.decodificador.raw_decode(self.buffer, self.posicao)
+                # Um valor que termina no fim do bloco pode estar cortado (ex.: um número), e
+                # um número cortado no meio ("12." + "5") decodifica só a parte inicial.
+                cortado = fim == len(self.buffer) or (
+                    self.buffer[self.posicao] in '-0123456789' and self.buffer[fim] in _CONTINUACAO_NUMERO_JSON)
+                if not cortado or self.fim_arquivo:
+                    self.posicao = fim
+                    return valor
+            except json.JSONDecodeError:
+                if self.fim_arquivo:
+                    raise
+            self._ler()
+
+
+def iterar_objeto_json(caminho, tamanho_leitura=TAMANHO_LEITURA_JSON):
+    """
+    Percorre o objeto de nível superior de um arquivo JSON, um par (chave,
+    valor) por vez, sem carregar o arquivo inteiro.
+
+    Args:
+        caminho (str): Arquivo com um objeto JSON (ex.: applicants.json).
+        tamanho_leitura (int): Caracteres lidos do arquivo por vez.
+
+    Yields:
+        tuple: (chave, valor decodificado).
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        leitor = _LeitorJson(f, tamanho_leitura)
+        if leitor.caractere() != '{':
+            raise ValueError(f"{caminho} não contém um objeto JSON.")
+        separador = leitor.caractere()
+        if separador == '}':
+            return
+        leitor.posicao -= 1
+        while True:
+            chave = leitor.valor()
+            if leitor.caractere() != ':':
+                raise ValueError(f"JSON inválido em {caminho}: esperado ':' após a chave {chave!r}.")
+            yield chave, leitor.valor()
+            separador = leitor.caractere()
+            if separador == '}':
+                return
+            if separador != ',':
+                raise ValueError(f"JSON inválido em {caminho}: esperado ',' ou '}}' após a chave {chave!r}.")
+
+
+def converter_ids(ids):
+    """
+    Como o pd.read_json: chaves numéricas viram inteiros (todas ou nenhuma).
+    """
+    try:
+        return pd.array([int(i) for i in ids], dtype="int64")
+    except ValueError:
+        return ids
+
+
+def _caminho_coluna(coluna):
+    """
+    (seção, campo) do applicants.json para uma coluna do json_normalize
+    ('<seção>_<campo>'); colunas de nível superior (ex.: 'cv_pt') têm seção None.
+    """
+    for secao in SECOES_APPLICANTS:
+        if coluna.startswith(secao + '_'):
+            return secao, coluna[len(secao) + 1:]
+    return None, coluna
+
+
+def concatenar_colunas(df, colunas, tamanho_bloco=TAMANHO_BLOCO_CURRICULO):
+    """
+    Une as ``colunas`` de texto de cada linha por espaço, coluna a coluna.
+
+    Equivale a ``df[colunas].fillna('').astype(str).agg(' '.join, axis=1)``,
+    mas a junção é feita de uma vez por bloco de até ``tamanho_bloco`` linhas
+    pelo kernel ``binary_join_element_wise`` do Arrow, em vez de um join
+    Python por linha.
+
+    Args:
+        df (DataFrame): Base com as colunas de texto.
+        colunas (list): Colunas unidas, nesta ordem (ausentes contam como "").
+        tamanho_bloco (int): Linhas processadas por vez.
+
+    Returns:
+        Series: Texto unido, com o mesmo índice de ``df``.
+    """
+    separador = pa.scalar(' ', pa.large_string())
+    partes = []
+    for inicio in range(0, len(df), max(tamanho_bloco, 1)):
+        bloco = df.iloc[inicio:inicio + tamanho_bloco]
+        textos = [pa.array(bloco[coluna].fillna('').astype(str), type=pa.large_string()) if coluna in bloco.columns
+                  else pa.array([''] * len(bloco), type=pa.large_string()) for coluna in colunas]
+        partes.append(pc.binary_join_element_wise(*textos, separador).to_pandas().set_axis(bloco.index))
+    if not partes:
+        return pd.Series([], index=df.index, dtype=object)
+    return pd.concat(partes)
+
+
+def posicao_trecho(df, colunas, trecho):
+    """
+    Posição, em caracteres, das colunas ``trecho`` dentro do texto de
+    ``concatenar_colunas(df, colunas)``.
+
+    Args:
+        df (DataFrame): Base com as colunas de texto.
+        colunas (list): Colunas unidas, na ordem de ``concatenar_colunas``.
+        trecho (list): Sequência contígua de ``colunas``.
+
+    Returns:
+        tuple: (Series com o início, Series com o fim) de cada linha, em int32.
+    """
+    primeira = colunas.index(trecho[0])
+    if colunas[primeira:primeira + len(trecho)] != list(trecho):
+        raise ValueError(f"As colunas {trecho} não são contíguas no texto unido.")
+    tamanhos = [df[coluna].fillna('').astype(str).str.len() if coluna in df.columns
+                else pd.Series(0, index=df.index) for coluna in colunas]
+    # Cada coluna anterior ocupa o próprio texto mais o espaço separador.
+    inicio = sum((tamanho + 1 for tamanho in tamanhos[:primeira]), pd.Series(0, index=df.index))
+    fim = inicio + sum(tamanhos[primeira:primeira + len(trecho)]) + len(trecho) - 1
+    return inicio.astype('int32'), fim.astype('int32')
+
+
+def _montar_bloco(colunas, manter_campos):
+    """
+    DataFrame de saída (sem o id) de um bloco de candidatos já projetados.
+    """
+    bloco = pd.DataFrame(colunas)
+    resultado = pd.DataFrame({
+        "nome_candidato": bloco[COLUNA_NOME_APPLICANTS],
+        # 'curriculo': conteúdo das 'colunas_importantes' unido por espaço (ausentes viram "").
+        "curriculo": concatenar_colunas(bloco, COLUNAS_IMPORTANTES, len(bloco)),
+    })
+    # Onde estão, no 'curriculo', os trechos do texto do modelo.
+    for (inicio, fim), trecho in zip(COLUNAS_TRECHOS_MODELO, TRECHOS_TEXTO_MODELO.values()):
+        resultado[inicio], resultado[fim] = posicao_trecho(bloco, COLUNAS_IMPORTANTES, trecho)
+    # Campos categóricos com os nomes do notebook; ausentes viram "" como no treino.
+    for coluna, nome in CAMPOS_CATEGORICOS_CANDIDATO.items():
+        resultado[nome] = bloco[coluna].fillna('')
+    if manter_campos:
+        # Os campos categóricos já seguem acima, com os nomes do notebook.
+        for coluna in COLUNAS_IMPORTANTES:
+            if coluna not in CAMPOS_CATEGORICOS_CANDIDATO:
+                resultado[coluna] = bloco[coluna].fillna('')
+    return resultado
+
+
+def iterar_blocos_candidatos(caminho=CAMINHO_APPLICANTS, manter_campos=False, tamanho_bloco=TAMANHO_BLOCO_CURRICULO):
+    """
+    Percorre o applicants.json em blocos de até ``tamanho_bloco`` candidatos
+    já montados, sem nunca manter a base inteira em memória.
+
+    De cada candidato só são lidos o nome e as ``COLUNAS_IMPORTANTES``, direto
+    pelo caminho (seção, campo), e acumulados em colunas. A cada bloco o
+    'curriculo' é montado de forma vetorizada (``concatenar_colunas``) e os
+    textos brutos são descartados.
+
+    Args:
+        caminho (str): Caminho do arquivo applicants.json.
+        manter_campos (bool): Como em ``carregar_candidatos_internos``.
+        tamanho_bloco (int): Candidatos por bloco.
+
+    Yields:
+        tuple: (lista com as chaves dos candidatos no JSON, DataFrame do bloco
+        sem a coluna 'id_candidato'). Uma base vazia gera um único bloco vazio.
+    """
+    projecao = [(coluna, *_caminho_coluna(coluna)) for coluna in [COLUNA_NOME_APPLICANTS] + COLUNAS_IMPORTANTES]
+    ids = []
+    colunas = {coluna: [] for coluna, _, _ in projecao}
+    vazio = True
+
+    for id_candidato, applicant in iterar_objeto_json(caminho):
+        # Candidatos sem CV em português (ausente ou só espaços) ou sem nome ficam de fora.
+        cv_pt = applicant.get('cv_pt')
+        cv_pt = anular_campos_vazio(cv_pt) if cv_pt is not None else None
+        nome = (applicant.get('infos_basicas') or {}).get('nome')
+        if cv_pt is None or nome is None:
+            continue
+        ids.append(id_candidato)
+        for coluna, secao, campo in projecao:
+            conteudo = applicant if secao is None else applicant.get(secao)
+            valor = conteudo.get(campo) if isinstance(conteudo, dict) else None
+            # Objetos aninhados não viram texto (o json_normalize os abriria em outras colunas).
+            colunas[coluna].append(None if isinstance(valor, dict) else valor)
+        colunas['cv_pt'][-1] = cv_pt
+        if len(ids) == tamanho_bloco:
+            yield ids, _montar_bloco(colunas, manter_campos)
+            vazio = False
+            ids = []
+            colunas = {coluna: [] for coluna in colunas}
+    if ids or vazio:
+        yield ids, _montar_bloco(colunas, manter_campos)
+
+
+def carregar_candidatos_internos(caminho=CAMINHO_APPLICANTS, manter_campos=False, usar_cache=True,
+                                 tamanho_bloco=TAMANHO_BLOCO_CURRICULO):
+    """
+    Monta a base interna de candidatos a partir do applicants.json.
+
+    Com ``usar_cache`` o resultado vem do cache colunar em disco
+    (``cache_dataset``), gerado na primeira carga e refeito quando o
+    applicants.json muda; sem ele o JSON é sempre processado.
+
+    O arquivo é percorrido em blocos (``iterar_blocos_candidatos``), de modo
+    que a memória de pico acompanha o tamanho do resultado, não o do JSON.
+
+    Args:
+        caminho (str): Caminho do arquivo applicants.json.
+        manter_campos (bool): Se True, mantém também as ``COLUNAS_IMPORTANTES``
+            separadas (usadas pelo índice BM25F), com "" nos valores ausentes.
+        usar_cache (bool): Se True, usa o cache colunar em disco.
+        tamanho_bloco (int): Candidatos montados por vez.
+
+    Returns:
+        DataFrame: Colunas 'id_candidato', 'nome_candidato', 'curriculo', as
+        posições do texto do modelo no 'curriculo' (``COLUNAS_TRECHOS_MODELO``)
+        e os campos categóricos do modelo (``CAMPOS_CATEGORICOS_CANDIDATO``).
+    """
+    if usar_cache:
+        rotulo = "candidatos-campos" if manter_campos else "candidatos"
+        return carregar_com_cache(caminho, f"{rotulo}-v{VERSAO_FORMATO}",
+                                  lambda: carregar_candidatos_internos(caminho, manter_campos, False, tamanho_bloco))
+    ids, blocos = [], []
+    for ids_bloco, bloco in iterar_blocos_candidatos(caminho, manter_campos, tamanho_bloco):
+        ids.extend(ids_bloco)
+        blocos.append(bloco)
+    df_applicants = pd.concat(blocos, ignore_index=True)
+    df_applicants.insert(0, "id_candidato", converter_ids(ids))
+    return df_applicants
+
+
+def carregar_vagas_sistema(caminho=CAMINHO_VAGAS, usar_cache=True):
+    """
+    Monta o catálogo de vagas a partir do vagas.json.
+
+    Args:
+        caminho (str): Caminho do arquivo vagas.json.
+        usar_cache (bool): Se True, usa o cache colunar em disco (``cache_dataset``).
+
+    Returns:
+        DataFrame: Colunas 'id_vaga', 'titulo', 'descricao', 'observacoes' e os campos
+        categóricos do modelo (``CAMPOS_CATEGORICOS_VAGA``).
+    """
+    if usar_cache:
+        return carregar_com_cache(caminho, f"vagas-v{VERSAO_FORMATO}", lambda: carregar_vagas_sistema(caminho, usar_cache=False))
+    with open(caminho, 'r', encoding='utf-8') as f: # Abre o arquivo JSON de vagas.
+        vagas = json.load(f)
+    
+    dados_vagas = []
+    for id_vaga, info in vagas.items():
+        dados_vagas.append({
+            'id_vaga': id_vaga,
+            'titulo': info.get('informacoes_basicas', {}).get('titulo_vaga', 'Sem título'),
+            # Concatena atividades e competências para formar uma descrição completa da vaga.
+            'descricao': f"{info.get('perfil_vaga', {}).get('principais_atividades', '')} {info.get('perfil_vaga', {}).get('competencia_tecnicas_e_comportamentais', '')}",
+            # Demais observações da vaga: também fazem parte do texto do modelo.
+            'observacoes': info.get('perfil_vaga', {}).get('demais_observacoes', ''),
+            **{coluna: info.get(secao, {}).get(campo, '') for (secao, campo), coluna in CAMPOS_CATEGORICOS_VAGA.items()}
+        })
+    return pd.DataFrame(dados_vagas)
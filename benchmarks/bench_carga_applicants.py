@@ -0,0 +1,122 @@
+"""
+Tempo e pico de memória (RSS) de ``carregar_candidatos_internos``.
+
+Cada carga roda em um interpretador novo, para que o pico de RSS de uma não
+contamine a outra. Sem ``--applicants`` um applicants.json sintético, com a
+mesma estrutura do real (seções aninhadas, CVs longos), é gerado em um
+diretório temporário. Com ``--revisao`` a mesma carga é medida em outro
+commit (extraído com ``git archive``), para comparar antes e depois. A
+árvore atual é medida duas vezes, com o cache colunar (``cache_dataset``) em
+um diretório temporário: frio (parse + gravação) e quente.
+
+    python benchmarks/bench_carga_applicants.py --candidatos 40000
+    python benchmarks/bench_carga_applicants.py --applicants dataset/applicants.json --revisao HEAD~1
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tempo_importacao import RAIZ, extrair_revisao
+from bench_recomendador import gerar_textos
+
+_SECOES = {
+    "infos_basicas": ["telefone_recado", "telefone", "objetivo_profissional", "data_criacao", "inserido_por",
+                      "email", "local", "sabendo_de_nos_por", "data_atualizacao", "codigo_profissional", "nome"],
+    "informacoes_pessoais": ["data_aceite", "nome", "cpf", "fonte_indicacao", "email", "email_secundario",
+                             "data_nascimento", "telefone_celular", "sexo", "estado_civil", "pcd", "endereco"],
+    "informacoes_profissionais": ["titulo_profissional", "area_atuacao", "conhecimentos_tecnicos", "certificacoes",
+                                  "outras_certificacoes", "remuneracao", "nivel_profissional", "qualificacoes",
+                                  "experiencias"],
+    "formacao_e_idiomas": ["nivel_academico", "nivel_ingles", "nivel_espanhol", "outro_idioma", "cursos",
+                           "outro_curso"],
+    "cargo_atual": ["id_ibrati", "email_corporativo", "cargo_atual", "projeto_atual", "cliente", "unidade"],
+}
+
+# Executado no interpretador novo: carrega a base e informa tempo, linhas e pico de RSS.
+# O pico vem de VmHWM, que zera no exec; o ru_maxrss do filho herda o pico do processo pai.
+_MEDIDOR = """
+import sys, time, json
+sys.path.insert(0, {raiz!r})
+
+def pico_rss_mb():
+    with open("/proc/self/status") as f:
+        return next(int(linha.split()[1]) for linha in f if linha.startswith("VmHWM")) / 2**10
+
+from base_dados import carregar_candidatos_internos
+inicio = time.perf_counter()
+df = carregar_candidatos_internos({caminho!r})
+print(json.dumps({{
+    "segundos": time.perf_counter() - inicio,
+    "linhas": len(df),
+    "resultado_mb": df.memory_usage(deep=True).sum() / 2**20,
+    "pico_rss_mb": pico_rss_mb(),
+}}))
+"""
+
+
+def gerar_applicants(caminho, n, semente=0):
+    """
+    Grava um applicants.json sintético com ``n`` candidatos.
+    """
+    rng = np.random.default_rng(semente)
+    cvs = gerar_textos(n, 600, semente)
+    curtos = gerar_textos(n * 4, 8, semente + 1)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i in range(n):
+            applicant = {secao: {campo: curtos[(i * 4 + j) % len(curtos)] for j, campo in enumerate(campos)}
+                         for secao, campos in _SECOES.items()}
+            # Parte da base sem CV em português, como na real.
+            applicant["cv_pt"] = cvs[i] if rng.random() > 0.05 else ""
+            applicant["cv_en"] = "" if rng.random() > 0.1 else cvs[-i - 1]
+            f.write(('' if i == 0 else ',') + json.dumps(str(31000 + i)) + ': ')
+            json.dump(applicant, f, ensure_ascii=False, indent=4)
+        f.write('}')
+
+
+def medir(raiz, caminho, diretorio_cache):
+    codigo = _MEDIDOR.format(raiz=raiz, caminho=os.path.abspath(caminho))
+    ambiente = {**os.environ, "DATASET_CACHE_DIR": diretorio_cache}
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True,
+                           env=ambiente)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", default=None, help="applicants.json a carregar (padrão: sintético).")
+    parser.add_argument("--candidatos", type=int, default=40000, help="Tamanho da base sintética.")
+    parser.add_argument("--revisao", default=None, help="Commit de referência (ex.: HEAD~1).")
+    args = parser.parse_args()
+
+    temporario = tempfile.mkdtemp(prefix="bench-carga-")
+    try:
+        caminho = args.applicants
+        if caminho is None:
+            caminho = os.path.join(temporario, "applicants.json")
+            gerar_applicants(caminho, args.candidatos)
+        print(f"{caminho}: {os.path.getsize(caminho) / 2**20:.0f} MB")
+
+        execucoes = [("atual, frio", RAIZ), ("atual, quente", RAIZ)]
+        if args.revisao:
+            destino = os.path.join(temporario, "revisao")
+            os.makedirs(destino)
+            execucoes.insert(0, (args.revisao, extrair_revisao(args.revisao, destino)))
+        print(f"{'árvore':>14} {'tempo (s)':>10} {'linhas':>8} {'resultado (MB)':>15} {'pico RSS (MB)':>14}")
+        for nome, raiz in execucoes:
+            # Um cache por árvore: a revisão de referência não aquece o da árvore atual.
+            r = medir(raiz, caminho, os.path.join(temporario, "cache-" + os.path.basename(raiz)))
+            print(f"{nome:>14} {r['segundos']:>10.2f} {r['linhas']:>8} {r['resultado_mb']:>15.0f} {r['pico_rss_mb']:>14.0f}")
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Latência de consulta do índice fragmentado (indice_fragmentado.py) em função
+do número de processos, contra a consulta em um único processo.
+
+    python benchmarks/bench_fragmentos.py --candidatos 2000000 --fragmentos 1 2 4 8
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from busca_topk import topk_similaridade
+from indice_candidatos import IndiceCandidatos, criar_vetorizador, salvar_indice, carregar_indice
+from indice_fragmentado import IndiceFragmentado
+from bench_topk import matriz_sintetica
+
+
+def indice_sintetico(diretorio, n_linhas, n_termos, nnz_por_linha):
+    matriz = matriz_sintetica(n_linhas, n_termos, nnz_por_linha)
+    vectorizer = criar_vetorizador(vocabulario={f"t{i}": i for i in range(n_termos)}, idf=np.ones(n_termos))
+    metadados = {"versao": "bench", "n_candidatos": n_linhas, "n_termos": n_termos}
+    candidatos = pd.DataFrame({"id_candidato": np.arange(n_linhas)})
+    salvar_indice(IndiceCandidatos(vectorizer, matriz, candidatos, metadados), diretorio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidatos", type=int, default=2000000)
+    parser.add_argument("--termos", type=int, default=5000)
+    parser.add_argument("--nnz-por-linha", type=int, default=80)
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--consultas", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = os.path.join(temporario, "indice")
+        indice_sintetico(diretorio, args.candidatos, args.termos, args.nnz_por_linha)
+        matriz = carregar_indice(diretorio).matriz
+        consultas = [matriz_sintetica(1, args.termos, args.nnz_por_linha, semente=s) for s in range(args.consultas)]
+
+        tempos = []
+        esperados = []
+        for consulta in consultas:
+            inicio = time.perf_counter()
+            esperados.append(topk_similaridade(matriz, consulta, args.k)[0])
+            tempos.append(time.perf_counter() - inicio)
+        base = float(np.median(tempos))
+        print(f"{'fragmentos':>10} {'p50 (ms)':>9} {'ganho':>7} {'mesmo top-k':>12}")
+        print(f"{'-':>10} {base * 1000:>9.1f} {1.0:>6.1f}x {'True':>12}")
+
+        for n_fragmentos in args.fragmentos:
+            fragmentado = IndiceFragmentado(diretorio, n_fragmentos)
+            fragmentado.buscar(consultas[0], args.k)
+            tempos, iguais = [], True
+            for consulta, esperado in zip(consultas, esperados):
+                inicio = time.perf_counter()
+                posicoes, _ = fragmentado.buscar(consulta, args.k)
+                tempos.append(time.perf_counter() - inicio)
+                iguais &= set(posicoes.tolist()) == set(esperado.tolist())
+            fragmentado.fechar()
+            mediana = float(np.median(tempos))
+            print(f"{n_fragmentos:>10} {mediana * 1000:>9.1f} {base / mediana:>6.1f}x {str(iguais):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmark do recomendador por tamanho da base de candidatos.
+
+Gera bases sintéticas de currículos em português no formato da coluna
+'curriculo' (campos do applicants.json unidos por espaço) e, para cada motor
+de busca, mede o tempo de construção do índice, o pico de memória (RSS) da
+construção e das consultas, o tamanho em disco e a latência das consultas
+(p50/p95/p99, da descrição da vaga em texto até o top-k).
+
+Cada medição roda em um processo próprio, para que o pico de RSS de um motor
+não contamine o do seguinte. O resultado vai para um JSON identificado pelo
+commit atual; ``--comparar`` mostra a variação contra um JSON anterior.
+
+    python benchmarks/bench_recomendador.py --tamanhos 1000 10000 100000 500000
+    python benchmarks/bench_recomendador.py --tamanhos 10000 --comparar benchmarks/resultados/bench_abc1234.json
+"""
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+DIRETORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+TAMANHOS_PADRAO = [1000, 10000, 100000, 500000]
+MOTORES = ["exato", "ann", "fragmentado", "bm25f", "armazem"]
+ARQUIVO_ARMAZEM = "candidatos.sqlite"
+PERCENTIS = (50, 95, 99)
+
+# Vocabulário de currículos de TI em português; a cauda longa é completada
+# com termos sintéticos para aproximar o tamanho do vocabulário real.
+_TERMOS_TECNICOS = (
+    "python java javascript typescript sql nosql oracle sap abap fiori hana react angular vue node "
+    "spring django flask docker kubernetes aws azure gcp linux windows git jenkins scrum kanban agile "
+    "excel powerbi tableau etl spark hadoop kafka rest api microservicos testes automatizados selenium "
+    "cobol mainframe delphi php laravel dotnet csharp c++ golang rust android ios swift kotlin flutter "
+    "salesforce servicenow itil cobit redes firewall seguranca suporte infraestrutura banco dados "
+    "analise requisitos arquitetura cloud devops integracao continua pipeline datawarehouse bi"
+).split()
+_PALAVRAS_COMUNS = (
+    "experiencia desenvolvimento projetos empresa sistemas atuacao responsavel equipe clientes gestao "
+    "implantacao manutencao analista desenvolvedor consultor coordenador gerente tecnico senior pleno "
+    "junior estagio formacao graduacao pos mba ingles espanhol avancado intermediario basico fluente "
+    "certificacao curso conhecimento area tecnologia informacao negocio processos melhoria atendimento "
+    "documentacao treinamento usuarios levantamento implementacao migracao otimizacao relatorios"
+).split()
+_STOPWORDS = "de da do em para com e a o no na os as um uma por que se ao dos das".split()
+_NIVEIS = ["Básico", "Intermediário", "Avançado", "Fluente", ""]
+# Colunas de origem do 'curriculo' sintético, usadas só pelos campos do BM25F.
+COLUNAS_CAMPOS_SINTETICOS = ["cv_pt", "informacoes_profissionais_conhecimentos_tecnicos",
+                             "formacao_e_idiomas_nivel_academico"]
+
+
+def _vocabulario(n_sinteticos=20000):
+    return np.array(_TERMOS_TECNICOS + _PALAVRAS_COMUNS + [f"termo{i}" for i in range(n_sinteticos)])
+
+
+def gerar_textos(n, palavras_por_texto, semente):
+    """
+    Textos com frequência de termos em lei de Zipf e stopwords intercaladas,
+    gerados em bloco (sem laço por palavra).
+    """
+    rng = np.random.default_rng(semente)
+    vocabulario = _vocabulario()
+    tamanhos = np.maximum(5, rng.poisson(palavras_por_texto, size=n))
+    posicoes = np.minimum(rng.zipf(1.2, size=int(tamanhos.sum())) - 1, len(vocabulario) - 1)
+    palavras = vocabulario[posicoes]
+    stop = rng.random(palavras.shape[0]) < 0.3
+    palavras[stop] = np.array(_STOPWORDS)[rng.integers(0, len(_STOPWORDS), int(stop.sum()))]
+    cortes = np.cumsum(tamanhos)[:-1]
+    return [' '.join(partes) for partes in np.split(palavras, cortes)]
+
+
+def gerar_candidatos(n, semente=0, manter_campos=False):
+    """
+    Base sintética com as colunas de ``base_dados.carregar_candidatos_internos``
+    (com ``manter_campos``, também as colunas de origem usadas pelo BM25F).
+    """
+    rng = np.random.default_rng(semente)
+    cv = gerar_textos(n, 250, semente)
+    conhecimentos = gerar_textos(n, 15, semente + 1)
+    niveis = np.array(_NIVEIS)[rng.integers(0, len(_NIVEIS), size=(n, 3))]
+    # Mesma composição do 'curriculo': campos do applicants.json unidos por espaço.
+    curriculo = [f"{a} {b} {c} {d} {e}" for a, b, (c, d, e) in zip(cv, conhecimentos, niveis)]
+    df = pd.DataFrame({
+        "id_candidato": np.arange(n, dtype=np.int64),
+        "nome_candidato": [f"Candidato {i}" for i in range(n)],
+        "curriculo": curriculo,
+        "applicant_nivel_ingles": niveis[:, 0],
+        "applicant_nivel_espanhol": niveis[:, 1],
+    })
+    if manter_campos:
+        for coluna, valores in zip(COLUNAS_CAMPOS_SINTETICOS, (cv, conhecimentos, niveis[:, 2])):
+            df[coluna] = valores
+    return df
+
+
+def _pico_rss_mb():
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss vem em KB no Linux e em bytes no macOS.
+        return pico / (2**20 if sys.platform == "darwin" else 2**10)
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+
+def _tamanho_disco_mb(diretorio):
+    total = 0
+    for raiz, _, arquivos in os.walk(diretorio):
+        total += sum(os.path.getsize(os.path.join(raiz, nome)) for nome in arquivos)
+    return total / 2**20
+
+
+def _construir(motor, n, diretorio, fila):
+    from preprocessamento import garantir_recursos_nltk
+    from indice_candidatos import construir_indice
+    garantir_recursos_nltk()
+    df = gerar_candidatos(n, manter_campos=motor == "bm25f")
+    inicio = time.perf_counter()
+    indice = construir_indice(df.drop(columns=COLUNAS_CAMPOS_SINTETICOS, errors='ignore'), diretorio)
+    if motor == "ann":
+        from indice_ann import construir_indice_ann
+        construir_indice_ann(indice, diretorio)
+    elif motor == "bm25f":
+        from indice_bm25f import construir_indice_bm25f
+        construir_indice_bm25f(df, indice, diretorio)
+    elif motor == "armazem":
+        from armazem_candidatos import ArmazemCandidatos
+        armazem = ArmazemCandidatos(os.path.join(diretorio, ARQUIVO_ARMAZEM))
+        armazem.definir_vetorizador(indice.vectorizer.vocabulary_, indice.vectorizer.idf_)
+        armazem.adicionar(df)
+    fila.put({"construcao_s": time.perf_counter() - inicio, "pico_rss_construcao_mb": _pico_rss_mb()})
+
+
+def _consultar(motor, diretorio, n_consultas, k, n_fragmentos, fila):
+    from preprocessamento import garantir_recursos_nltk, preprocessar_texto
+    from indice_incremental import IndiceIncremental
+    garantir_recursos_nltk()
+    vagas = gerar_textos(n_consultas, 60, semente=10**6)
+    indice = None
+
+    if motor == "armazem":
+        # Sem abrir o índice: a consulta só toca o arquivo SQLite.
+        from armazem_candidatos import ArmazemCandidatos
+        armazem = ArmazemCandidatos(os.path.join(diretorio, ARQUIVO_ARMAZEM))
+
+        def buscar(texto):
+            return armazem.buscar(armazem.transformar([preprocessar_texto(texto)]), k)
+    else:
+        indice = IndiceIncremental(diretorio, n_fragmentos=n_fragmentos if motor == "fragmentado" else 0,
+                                   usar_ann=motor == "ann")
+
+        def buscar(texto):
+            return indice.buscar(indice.vectorizer.transform([preprocessar_texto(texto)]), k)
+
+    if motor == "bm25f":
+        from indice_bm25f import carregar_indice_bm25f
+        bm25f = carregar_indice_bm25f(diretorio, indice.vectorizer.vocabulary_)
+
+        def buscar(texto):
+            return bm25f.buscar(bm25f.transformar([preprocessar_texto(texto)]), k)
+
+    buscar(vagas[0])
+    tempos = []
+    for texto in vagas:
+        inicio = time.perf_counter()
+        buscar(texto)
+        tempos.append(time.perf_counter() - inicio)
+    if indice is not None and indice.fragmentos is not None:
+        indice.fragmentos.fechar()
+    resultado = {f"p{p}_ms": float(np.percentile(tempos, p) * 1000) for p in PERCENTIS}
+    resultado["pico_rss_consulta_mb"] = _pico_rss_mb()
+    fila.put(resultado)
+
+
+def _em_processo(funcao, *args):
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=funcao, args=(*args, fila))
+    processo.start()
+    while True:
+        try:
+            resultado = fila.get(timeout=1)
+            break
+        except queue.Empty:
+            if not processo.is_alive():
+                raise RuntimeError(f"{funcao.__name__} terminou sem resultado (código {processo.exitcode}).")
+    processo.join()
+    return resultado
+
+
+def medir(motor, n, n_consultas=200, k=10, n_fragmentos=4):
+    """
+    Mede um motor para uma base de ``n`` candidatos.
+
+    Returns:
+        dict: Tempo de construção, picos de RSS, tamanho em disco e latências.
+    """
+    temporario = tempfile.mkdtemp(prefix="bench-recomendador-")
+    try:
+        diretorio = os.path.join(temporario, "indice")
+        resultado = {"motor": motor, "candidatos": n}
+        resultado.update(_em_processo(_construir, motor, n, diretorio))
+        resultado["disco_mb"] = _tamanho_disco_mb(diretorio)
+        resultado.update(_em_processo(_consultar, motor, diretorio, n_consultas, k, n_fragmentos))
+        return resultado
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+def _commit_atual():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def comparar(atual, anterior):
+    """
+    Imprime a variação percentual de cada métrica contra um resultado anterior.
+    """
+    chave = lambda r: (r["motor"], r["candidatos"])
+    antigos = {chave(r): r for r in anterior["resultados"]}
+    metricas = ["construcao_s", "pico_rss_construcao_mb", "disco_mb", "p50_ms", "p95_ms", "p99_ms"]
+    print(f"\nVariação contra {anterior['commit']}:")
+    print(f"{'motor':>12} {'candidatos':>10} " + " ".join(f"{m:>22}" for m in metricas))
+    for linha in atual["resultados"]:
+        antiga = antigos.get(chave(linha))
+        if antiga is None:
+            continue
+        variacoes = [(linha[m] - antiga[m]) / antiga[m] * 100 if antiga.get(m) else float("nan") for m in metricas]
+        print(f"{linha['motor']:>12} {linha['candidatos']:>10} " + " ".join(f"{v:>+21.1f}%" for v in variacoes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=MOTORES)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--fragmentos", type=int, default=4, help="Processos do motor 'fragmentado'.")
+    parser.add_argument("--saida", default=None, help="Padrão: benchmarks/resultados/bench_<commit>.json")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior.")
+    args = parser.parse_args()
+
+    commit = _commit_atual()
+    relatorio = {
+        "commit": commit,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "maquina": {"sistema": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "parametros": {"consultas": args.consultas, "k": args.k, "fragmentos": args.fragmentos},
+        "resultados": [],
+    }
+
+    print(f"{'motor':>12} {'candidatos':>10} {'construção (s)':>15} {'RSS constr. (MB)':>17} "
+          f"{'RSS cons. (MB)':>15} {'disco (MB)':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for n in args.tamanhos:
+        for motor in args.motores:
+            r = medir(motor, n, args.consultas, args.k, args.fragmentos)
+            relatorio["resultados"].append(r)
+            print(f"{motor:>12} {n:>10} {r['construcao_s']:>15.1f} {r['pico_rss_construcao_mb']:>17.0f} "
+                  f"{r['pico_rss_consulta_mb']:>15.0f} {r['disco_mb']:>11.1f} {r['p50_ms']:>9.2f} "
+                  f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"bench_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            comparar(relatorio, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
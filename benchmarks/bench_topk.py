@@ -0,0 +1,81 @@
+"""
+Compara o ranqueamento antigo (cosine_similarity + argsort completo) com o
+motor top-k em blocos de busca_topk.py em matrizes TF-IDF sintéticas.
+
+    python benchmarks/bench_topk.py --tamanhos 50000 500000 2000000
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from busca_topk import topk_similaridade
+
+
+def matriz_sintetica(n_linhas, n_termos, nnz_por_linha, semente=0):
+    """
+    Matriz CSR com ``nnz_por_linha`` termos por linha e linhas normalizadas (L2),
+    no formato que o TfidfVectorizer produz.
+    """
+    rng = np.random.default_rng(semente)
+    # Distribuição de Zipf aproxima a frequência de termos em currículos.
+    indices = np.minimum(rng.zipf(1.3, size=n_linhas * nnz_por_linha) - 1, n_termos - 1).astype(np.int32)
+    dados = rng.random(n_linhas * nnz_por_linha)
+    indptr = np.arange(0, n_linhas * nnz_por_linha + 1, nnz_por_linha, dtype=np.int64)
+    matriz = sparse.csr_matrix((dados, indices, indptr), shape=(n_linhas, n_termos))
+    matriz.sum_duplicates()
+    return normalize(matriz, copy=False)
+
+
+def ranking_antigo(matriz, consulta, k):
+    similaridades = cosine_similarity(consulta, matriz).flatten()
+    top_indices = similaridades.argsort()[-k:][::-1]
+    return top_indices, similaridades[top_indices]
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    pico = 0
+    for _ in range(repeticoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return resultado, float(np.median(tempos)), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[50000, 500000, 2000000])
+    parser.add_argument("--termos", type=int, default=5000)
+    parser.add_argument("--nnz-por-linha", type=int, default=80)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'candidatos':>12} {'antigo (ms)':>12} {'top-k (ms)':>12} {'ganho':>7} "
+          f"{'pico antigo (MB)':>17} {'pico top-k (MB)':>16} {'mesmo top-k':>12}")
+    for n_linhas in args.tamanhos:
+        matriz = matriz_sintetica(n_linhas, args.termos, args.nnz_por_linha)
+        consulta = matriz_sintetica(1, args.termos, args.nnz_por_linha, semente=n_linhas + 1)
+
+        (idx_antigo, _), t_antigo, pico_antigo = medir(lambda: ranking_antigo(matriz, consulta, args.k), args.repeticoes)
+        (idx_novo, _), t_novo, pico_novo = medir(lambda: topk_similaridade(matriz, consulta, args.k), args.repeticoes)
+
+        print(f"{n_linhas:>12} {t_antigo * 1000:>12.1f} {t_novo * 1000:>12.1f} {t_antigo / t_novo:>6.1f}x "
+              f"{pico_antigo / 2**20:>17.1f} {pico_novo / 2**20:>16.1f} "
+              f"{str(set(idx_antigo) == set(idx_novo)):>12}")
+        del matriz
+
+
+if __name__ == "__main__":
+    main()
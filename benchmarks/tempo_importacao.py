@@ -0,0 +1,136 @@
+"""
+Relatório do tempo de import de cada página do app.
+
+Para cada página, executa em um interpretador novo apenas os imports do topo
+do arquivo (o que o Streamlit paga ao abrir a página, antes de qualquer
+interação) e registra o tempo e quais bibliotecas pesadas acabaram carregadas.
+Com ``--revisao`` o mesmo é medido em outro commit (extraído com
+``git archive``), para comparar antes e depois.
+
+    python benchmarks/tempo_importacao.py
+    python benchmarks/tempo_importacao.py --revisao HEAD~1 --repeticoes 5
+"""
+import os
+import ast
+import sys
+import json
+import shutil
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ALVOS = [
+    "App.py",
+    "pages/pagina_inicial.py",
+    "pages/modulo_ranking_empresa.py",
+    "pages/modulo_gerador_avaliacao_tech.py",
+    "pages/sobre.py",
+]
+BIBLIOTECAS_PESADAS = ["tensorflow", "sklearn", "nltk", "joblib", "google.generativeai"]
+
+# Executado no interpretador novo: cada import separado, para que uma
+# dependência ausente neste ambiente não impeça a medição das demais.
+_MEDIDOR = """
+import sys, time, json
+sys.path.insert(0, {raiz!r})
+comandos = {comandos!r}
+inicio = time.perf_counter()
+falhas = []
+for comando in comandos:
+    try:
+        exec(comando, {{}})
+    except ImportError as e:
+        falhas.append(f"{{comando}}: {{e}}")
+duracao = time.perf_counter() - inicio
+print(json.dumps({{
+    "segundos": duracao,
+    "carregadas": [nome for nome in {pesadas!r} if nome in sys.modules],
+    "falhas": falhas,
+}}))
+"""
+
+
+def imports_do_topo(caminho):
+    """
+    Comandos de import no nível do módulo (fora de funções), como código-fonte.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        arvore = ast.parse(f.read())
+    return [ast.unparse(no) for no in arvore.body if isinstance(no, (ast.Import, ast.ImportFrom))]
+
+
+def medir(raiz, alvo, repeticoes):
+    """
+    Mediana do tempo de import de ``alvo`` em ``repeticoes`` interpretadores novos.
+    """
+    codigo = _MEDIDOR.format(raiz=raiz, comandos=imports_do_topo(os.path.join(raiz, alvo)),
+                             pesadas=BIBLIOTECAS_PESADAS)
+    execucoes = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True)
+        execucoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    resultado = execucoes[-1]
+    resultado["segundos"] = float(np.median([execucao["segundos"] for execucao in execucoes]))
+    return resultado
+
+
+def extrair_revisao(revisao, destino):
+    arquivo = os.path.join(destino, "revisao.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", arquivo, revisao], cwd=RAIZ, check=True)
+    with tarfile.open(arquivo) as tar:
+        tar.extractall(destino)
+    os.remove(arquivo)
+    return destino
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revisao", default=None, help="Commit de referência (ex.: HEAD~1).")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default=None, help="Grava o relatório em JSON.")
+    args = parser.parse_args()
+
+    arvores = {"atual": RAIZ}
+    temporario = None
+    if args.revisao:
+        temporario = tempfile.mkdtemp(prefix="tempo-importacao-")
+        arvores = {args.revisao: extrair_revisao(args.revisao, temporario), "atual": RAIZ}
+
+    relatorio = {}
+    try:
+        for nome, raiz in arvores.items():
+            relatorio[nome] = {alvo: medir(raiz, alvo, args.repeticoes)
+                               for alvo in ALVOS if os.path.exists(os.path.join(raiz, alvo))}
+    finally:
+        if temporario:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+    print(f"{'página':<42}" + "".join(f"{nome:>14}" for nome in relatorio) + "   bibliotecas carregadas")
+    for alvo in ALVOS:
+        linha = f"{alvo:<42}"
+        carregadas = []
+        for nome, medidas in relatorio.items():
+            medida = medidas.get(alvo)
+            linha += f"{medida['segundos']:>13.2f}s" if medida else f"{'-':>14}"
+            carregadas.append(f"{nome}: {', '.join(medida['carregadas']) or 'nenhuma'}" if medida else "")
+        print(linha + "   " + " | ".join(carregadas))
+
+    falhas = [(nome, alvo, falha) for nome, medidas in relatorio.items()
+              for alvo, medida in medidas.items() for falha in medida["falhas"]]
+    if falhas:
+        print("\nImports que falharam neste ambiente (não entram no tempo):")
+        for nome, alvo, falha in falhas:
+            print(f"  [{nome}] {alvo}: {falha}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
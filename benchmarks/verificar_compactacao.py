@@ -0,0 +1,102 @@
+"""
+Confere que o armazenamento compacto do índice (float32/int32, currículos fora
+do DataFrame) não altera o ranking e mede a memória economizada.
+
+Ajusta o TF-IDF duas vezes sobre a mesma base: no formato antigo (float64,
+texto no DataFrame) e no compacto. Para cada vaga do vagas.json compara a ordem
+do top-k; diferenças só são aceitas entre candidatos empatados (scores iguais
+até ``--tolerancia``), cuja ordem depende do arredondamento.
+
+    python benchmarks/verificar_compactacao.py
+    python benchmarks/verificar_compactacao.py --sintetico 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from busca_topk import topk_similaridade
+from indice_candidatos import criar_vetorizador, compactar_matriz, separar_curriculos
+from preprocessamento import preprocessar_lote, preprocessar_texto, garantir_recursos_nltk
+
+
+def _mb(n_bytes):
+    return n_bytes / 2**20
+
+
+def _memoria_matriz(matriz):
+    return matriz.data.nbytes + matriz.indices.nbytes + matriz.indptr.nbytes
+
+
+def _carregar_bases(args):
+    if args.sintetico:
+        from bench_recomendador import gerar_candidatos, gerar_textos
+        return gerar_candidatos(args.sintetico), gerar_textos(args.vagas, 60, semente=10**6)
+    from base_dados import carregar_candidatos_internos, carregar_vagas_sistema
+    vagas = carregar_vagas_sistema()['descricao'].head(args.vagas).tolist()
+    return carregar_candidatos_internos(), vagas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sintetico", type=int, default=0,
+                        help="Usa N candidatos sintéticos em vez da base interna.")
+    parser.add_argument("--vagas", type=int, default=500, help="Vagas consultadas.")
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--tolerancia", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    garantir_recursos_nltk()
+    df_candidatos, vagas = _carregar_bases(args)
+    print(f"{len(df_candidatos)} candidatos, {len(vagas)} vagas")
+
+    inicio = time.time()
+    textos_cv = preprocessar_lote(df_candidatos['curriculo'])
+    print(f"Pré-processamento em {time.time() - inicio:.1f}s")
+
+    original = criar_vetorizador().set_params(dtype=np.float64)
+    matriz_original = original.fit_transform(textos_cv).tocsr()
+    compacto = criar_vetorizador()
+    matriz_compacta = compactar_matriz(compacto.fit_transform(textos_cv))
+    candidatos, curriculos = separar_curriculos(df_candidatos)
+
+    # Aberto do disco, o buffer dos currículos fica mapeado em memória e só as
+    # páginas dos resultados são lidas: ele não entra na memória residente.
+    memoria_original = _memoria_matriz(matriz_original) + df_candidatos.memory_usage(deep=True).sum()
+    memoria_compacta = _memoria_matriz(matriz_compacta) + candidatos.memory_usage(deep=True).sum()
+    print(f"Matriz: {_mb(_memoria_matriz(matriz_original)):.1f} MB ({matriz_original.dtype}/"
+          f"{matriz_original.indices.dtype}) -> {_mb(_memoria_matriz(matriz_compacta)):.1f} MB "
+          f"({matriz_compacta.dtype}/{matriz_compacta.indices.dtype})")
+    print(f"Candidatos: {_mb(df_candidatos.memory_usage(deep=True).sum()):.1f} MB -> "
+          f"{_mb(candidatos.memory_usage(deep=True).sum()):.1f} MB "
+          f"(+ {_mb(curriculos.buffer.nbytes):.1f} MB de currículos mapeados do disco)")
+    print(f"Total residente: {_mb(memoria_original):.1f} MB -> {_mb(memoria_compacta):.1f} MB "
+          f"({memoria_compacta / memoria_original:.0%})")
+
+    identicas, empates, divergentes = 0, 0, []
+    for i, vaga in enumerate(vagas):
+        texto = preprocessar_texto(vaga)
+        posicoes_a, scores_a = topk_similaridade(matriz_original, original.transform([texto]), args.k)
+        posicoes_b, _ = topk_similaridade(matriz_compacta, compacto.transform([texto]), args.k)
+        if np.array_equal(posicoes_a, posicoes_b):
+            identicas += 1
+            continue
+        # Mesmo conjunto, ordem trocada só entre scores empatados: o ranking é equivalente.
+        scores_b = matriz_original[posicoes_b] @ original.transform([texto]).toarray().ravel()
+        if len(posicoes_a) == len(posicoes_b) and np.allclose(scores_a, scores_b, rtol=0, atol=args.tolerancia):
+            empates += 1
+        else:
+            divergentes.append(i)
+
+    print(f"Top-{args.k}: {identicas} vagas idênticas, {empates} com empates reordenados, "
+          f"{len(divergentes)} divergentes")
+    if divergentes:
+        print(f"Vagas divergentes (posição no catálogo): {divergentes[:20]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Mede o efeito da deduplicação MinHash/LSH no índice: linhas e memória da
+matriz, tempo de consulta e, na base sintética, quantas duplicatas plantadas
+foram agrupadas.
+
+Na base sintética uma fração dos candidatos é reenviada com pequenas edições
+(algumas palavras trocadas), simulando currículos reenviados.
+
+    python benchmarks/verificar_deduplicacao.py
+    python benchmarks/verificar_deduplicacao.py --sintetico 20000 --fracao-duplicatas 0.3
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from busca_topk import topk_similaridade
+from deduplicacao import LIMIAR_DUPLICATAS_PADRAO
+from indice_candidatos import ajustar_indice
+from preprocessamento import preprocessar_texto, garantir_recursos_nltk
+
+
+def _mb(matriz):
+    return (matriz.data.nbytes + matriz.indices.nbytes + matriz.indptr.nbytes) / 2**20
+
+
+def _plantar_duplicatas(df, fracao, semente=0):
+    """
+    Reenvia ``fracao`` dos candidatos com ~5% das palavras do currículo trocadas.
+    """
+    aleatorio = np.random.default_rng(semente)
+    origens = aleatorio.choice(len(df), size=int(fracao * len(df)), replace=True)
+    copias = df.iloc[origens].copy()
+    vocabulario = ' '.join(df['curriculo'].head(200)).split()
+    textos = []
+    for texto in copias['curriculo']:
+        palavras = texto.split()
+        for posicao in aleatorio.choice(len(palavras), size=max(1, len(palavras) // 20), replace=False):
+            palavras[posicao] = vocabulario[aleatorio.integers(len(vocabulario))]
+        textos.append(' '.join(palavras))
+    copias['curriculo'] = textos
+    copias['id_candidato'] = np.arange(len(df), len(df) + len(copias))
+    return pd.concat([df, copias], ignore_index=True), dict(zip(copias['id_candidato'], df['id_candidato'].iloc[origens]))
+
+
+def _tempo_consultas(indice, consultas, k):
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        topk_similaridade(indice.matriz, indice.transformar([consulta]), k)
+    return (time.perf_counter() - inicio) / len(consultas) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sintetico", type=int, default=0,
+                        help="Usa N candidatos sintéticos (com duplicatas plantadas) em vez da base interna.")
+    parser.add_argument("--fracao-duplicatas", type=float, default=0.3)
+    parser.add_argument("--limiar", type=float, default=LIMIAR_DUPLICATAS_PADRAO)
+    parser.add_argument("--vagas", type=int, default=200, help="Vagas consultadas.")
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    garantir_recursos_nltk()
+    plantadas = None
+    if args.sintetico:
+        from bench_recomendador import gerar_candidatos, gerar_textos
+        df_candidatos, plantadas = _plantar_duplicatas(gerar_candidatos(args.sintetico), args.fracao_duplicatas)
+        vagas = gerar_textos(args.vagas, 60, semente=10**6)
+    else:
+        from base_dados import carregar_candidatos_internos, carregar_vagas_sistema
+        df_candidatos = carregar_candidatos_internos()
+        vagas = carregar_vagas_sistema()['descricao'].head(args.vagas).tolist()
+    print(f"{len(df_candidatos)} candidatos, {len(vagas)} vagas")
+
+    inicio = time.time()
+    completo = ajustar_indice(df_candidatos)
+    print(f"Sem deduplicação: {time.time() - inicio:.1f}s")
+    inicio = time.time()
+    deduplicado = ajustar_indice(df_candidatos, limiar_duplicatas=args.limiar)
+    print(f"Com deduplicação (limiar {args.limiar}): {time.time() - inicio:.1f}s")
+
+    consultas = [preprocessar_texto(vaga) for vaga in vagas]
+    tempo_completo = _tempo_consultas(completo, consultas, args.k)
+    tempo_deduplicado = _tempo_consultas(deduplicado, consultas, args.k)
+
+    print(f"Linhas: {len(completo)} -> {len(deduplicado)} ({1 - len(deduplicado) / len(completo):.1%} menor), "
+          f"{len(deduplicado.duplicatas)} grupos de duplicatas")
+    print(f"Matriz: {_mb(completo.matriz):.1f} MB -> {_mb(deduplicado.matriz):.1f} MB")
+    print(f"Consulta top-{args.k}: {tempo_completo:.2f} ms -> {tempo_deduplicado:.2f} ms "
+          f"({tempo_completo / tempo_deduplicado:.2f}x)")
+
+    if plantadas:
+        # Uma duplicata plantada foi encontrada se caiu no grupo do seu original.
+        grupo_de = {id_candidato: grupo[0] for grupo in deduplicado.duplicatas for id_candidato in grupo}
+        encontradas = sum(grupo_de.get(copia, copia) == grupo_de.get(original, original)
+                          for copia, original in plantadas.items())
+        print(f"Duplicatas plantadas agrupadas: {encontradas}/{len(plantadas)} ({encontradas / len(plantadas):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import numpy as np
+from scipy import sparse
+
+
+# Linhas da matriz de candidatos processadas por vez. Com 5000 termos e ~100
+# termos por currículo, um bloco ocupa poucos MB independentemente da base.
+TAMANHO_BLOCO_PADRAO = 65536
+
+
+def _vetor_consulta(consulta, n_termos, dtype=np.float64):
+    # A consulta deve ter o dtype da matriz: com tipos diferentes o produto
+    # esparso do scipy converte (copia) os valores da matriz a cada chamada.
+    if sparse.issparse(consulta):
+        return np.asarray(consulta.toarray(), dtype=dtype).reshape(-1)
+    vetor = np.asarray(consulta, dtype=dtype).reshape(-1)
+    if vetor.shape[0] != n_termos:
+        raise ValueError(f"Consulta com {vetor.shape[0]} termos; a matriz tem {n_termos}.")
+    return vetor
+
+
+def _bloco_linhas(matriz, inicio, fim):
+    """
+    Fatia de linhas de uma CSR sem copiar ``data``/``indices`` (funciona também
+    com arrays mapeados em memória).
+    """
+    indptr = matriz.indptr[inicio:fim + 1]
+    a, b = indptr[0], indptr[-1]
+    # Os atributos são atribuídos diretamente: o construtor do scipy "poda" e
+    # copia fatias pequenas de arrays grandes, o que anularia o ganho do bloco.
+    bloco = sparse.csr_matrix((fim - inicio, matriz.shape[1]), dtype=matriz.dtype)
+    bloco.data = matriz.data[a:b]
+    bloco.indices = matriz.indices[a:b]
+    bloco.indptr = (indptr - a).astype(matriz.indices.dtype)
+    return bloco
+
+
+def ordenar_resultados(indices, scores):
+    """
+    Ordena por score decrescente; empates ficam na ordem da posição na base.
+    """
+    ordem = np.lexsort((indices, -scores))
+    return indices[ordem], scores[ordem]
+
+
+def selecionar_topk(scores, k, deslocamento=0):
+    """
+    Retorna as posições (somadas a ``deslocamento``) e os valores dos ``k``
+    maiores scores, sem ordenar o vetor inteiro.
+    """
+    if k >= scores.shape[0]:
+        posicoes = np.arange(scores.shape[0])
+    else:
+        posicoes = np.argpartition(-scores, k - 1)[:k]
+    return posicoes + deslocamento, scores[posicoes]
+
+
+def mesclar_topk(indices_a, scores_a, indices_b, scores_b, k):
+    """
+    Mescla duas listas parciais de top-k em uma só.
+    """
+    indices = np.concatenate([indices_a, indices_b])
+    scores = np.concatenate([scores_a, scores_b])
+    posicoes, scores = selecionar_topk(scores, k)
+    return indices[posicoes], scores
+
+
+def topk_similaridade(matriz, consulta, k, tamanho_bloco=TAMANHO_BLOCO_PADRAO, mascara_excluidos=None):
+    """
+    Top-k por similaridade de cosseno entre uma consulta e as linhas de ``matriz``.
+
+    As linhas do índice e a consulta já são normalizadas (L2) pelo TF-IDF, então o
+    cosseno é o produto escalar esparso. A matriz é percorrida em blocos de
+    linhas; de cada bloco só os ``k`` melhores (``argpartition``) entram no
+    acumulador, de modo que a memória de pico fica limitada a um bloco e o custo
+    cresce com o nnz da matriz em vez de ``n log n``.
+
+    Args:
+        matriz (csr_matrix): Matriz TF-IDF dos candidatos (n_candidatos, n_termos).
+        consulta (csr_matrix ou np.ndarray): Vetor TF-IDF da vaga.
+        k (int): Quantidade de resultados.
+        tamanho_bloco (int): Linhas processadas por bloco.
+        mascara_excluidos (np.ndarray de bool, opcional): Posições que não podem ser retornadas.
+
+    Returns:
+        tuple: (posições, scores) ordenados do maior para o menor score.
+    """
+    n_linhas = matriz.shape[0]
+    k = min(int(k), n_linhas)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    vetor = _vetor_consulta(consulta, matriz.shape[1], matriz.dtype)
+    melhores_indices = np.empty(0, dtype=np.int64)
+    melhores_scores = np.empty(0, dtype=np.float64)
+
+    for inicio in range(0, n_linhas, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_linhas)
+        scores = _bloco_linhas(matriz, inicio, fim) @ vetor
+        if mascara_excluidos is not None:
+            scores[mascara_excluidos[inicio:fim]] = -np.inf
+        indices, scores = selecionar_topk(scores, k, deslocamento=inicio)
+        melhores_indices, melhores_scores = mesclar_topk(
+            melhores_indices, melhores_scores, indices, scores, k
+        )
+
+    validos = np.isfinite(melhores_scores)
+    return ordenar_resultados(melhores_indices[validos], melhores_scores[validos])
+
+
+def _selecionar_topk_linhas(scores, k, deslocamento=0):
+    if k >= scores.shape[1]:
+        posicoes = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    else:
+        posicoes = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return posicoes + deslocamento, np.take_along_axis(scores, posicoes, axis=1)
+
+
+def topk_similaridade_lote(matriz, consultas, k, tamanho_bloco=TAMANHO_BLOCO_PADRAO // 4, mascara_excluidos=None):
+    """
+    Versão de ``topk_similaridade`` para várias consultas de uma vez (uma por
+    linha de ``consultas``): cada bloco de candidatos é pontuado contra todas as
+    consultas com um único produto esparso x denso.
+
+    Returns:
+        tuple: (posições, scores), arrays (n_consultas, k) ordenados por linha do
+        maior para o menor score; posições sem candidato válido valem -1.
+    """
+    n_linhas = matriz.shape[0]
+    n_consultas = consultas.shape[0]
+    k = min(int(k), n_linhas)
+    consultas_densas = np.asarray(consultas.toarray() if sparse.issparse(consultas) else consultas,
+                                  dtype=matriz.dtype)
+
+    melhores_indices = np.empty((n_consultas, 0), dtype=np.int64)
+    melhores_scores = np.empty((n_consultas, 0), dtype=np.float64)
+    for inicio in range(0, n_linhas, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_linhas)
+        scores = np.ascontiguousarray((_bloco_linhas(matriz, inicio, fim) @ consultas_densas.T).T)
+        if mascara_excluidos is not None:
+            scores[:, mascara_excluidos[inicio:fim]] = -np.inf
+        indices, scores = _selecionar_topk_linhas(scores, k, deslocamento=inicio)
+        indices = np.concatenate([melhores_indices, indices], axis=1)
+        scores = np.concatenate([melhores_scores, scores], axis=1)
+        posicoes, melhores_scores = _selecionar_topk_linhas(scores, k)
+        melhores_indices = np.take_along_axis(indices, posicoes, axis=1)
+
+    ordem = np.argsort(-melhores_scores, axis=1, kind='stable')
+    melhores_indices = np.take_along_axis(melhores_indices, ordem, axis=1)
+    melhores_scores = np.take_along_axis(melhores_scores, ordem, axis=1)
+    melhores_indices[~np.isfinite(melhores_scores)] = -1
+    return melhores_indices, melhores_scores
@@ -0,0 +1,170 @@
+"""
+Cache colunar, em disco, das bases já processadas (applicants.json e vagas.json).
+
+O ``st.cache_data`` só vive na memória do processo: todo reinício do servidor
+refazia o parse completo dos JSONs. Aqui o DataFrame resultante é gravado uma
+vez em Arrow IPC (Feather v2, sem compressão) e, nas cargas seguintes, lido
+direto dele, sem passar pelo JSON. A conversão para pandas copia as colunas
+(os textos viram objetos ``str``); para o pico não dobrar, cada coluna do Arrow
+é liberada assim que convertida.
+
+Cada entrada é identificada pelo tamanho e pelo SHA-256 do arquivo de origem
+(mais um rótulo com os parâmetros da carga). Um manifesto guarda também o
+mtime do arquivo: enquanto tamanho e mtime não mudam, o hash gravado é reusado
+e o arquivo de origem não precisa ser relido; se mudarem, o hash é recalculado
+e, se diferente, a entrada é refeita. Por padrão o cache fica em
+``<diretório da origem>/.cache`` (ex.: ``dataset/.cache``); a variável de
+ambiente ``DATASET_CACHE_DIR`` muda o local.
+
+    python cache_dataset.py            # gera o cache das duas bases
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from importacao_tardia import modulo_tardio
+
+feather = modulo_tardio("pyarrow.feather")
+
+DIRETORIO_CACHE_PADRAO = os.environ.get("DATASET_CACHE_DIR")
+NOME_DIRETORIO_CACHE = ".cache"
+ARQUIVO_MANIFESTO = "manifesto.json"
+TAMANHO_BLOCO_HASH = 8 << 20
+
+
+def diretorio_cache(caminho_origem, diretorio=None):
+    """
+    Diretório do cache de um arquivo de origem.
+    """
+    diretorio = diretorio or DIRETORIO_CACHE_PADRAO
+    if diretorio:
+        return diretorio
+    return os.path.join(os.path.dirname(os.path.abspath(caminho_origem)), NOME_DIRETORIO_CACHE)
+
+
+def hash_arquivo(caminho):
+    """
+    SHA-256 (hexadecimal) do conteúdo de um arquivo, lido em blocos.
+    """
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_atomico(diretorio, destino, gravar):
+    # Grava em um temporário do mesmo diretório e renomeia: leitores nunca veem um arquivo pela metade.
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=diretorio)
+    os.close(descritor)
+    try:
+        gravar(temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def _gravar_json(caminho, conteudo):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, indent=2)
+
+
+def _registrar(diretorio, rotulo, chave, arquivo, caminho_origem):
+    """
+    Grava a entrada ``rotulo`` no manifesto e retorna o arquivo que ela apontava antes.
+    """
+    # Relê o manifesto: outra entrada pode ter sido gravada enquanto esta carregava.
+    manifesto = _ler_manifesto(diretorio)
+    anterior = manifesto.get(rotulo, {}).get("arquivo")
+    manifesto[rotulo] = {**chave, "arquivo": os.path.basename(arquivo), "origem": os.path.abspath(caminho_origem)}
+    _gravar_atomico(diretorio, os.path.join(diretorio, ARQUIVO_MANIFESTO),
+                    lambda temporario: _gravar_json(temporario, manifesto))
+    return anterior
+
+
+def chave_origem(caminho_origem, manifesto=None):
+    """
+    Identificação do arquivo de origem: tamanho e SHA-256.
+
+    Args:
+        caminho_origem (str): Arquivo JSON de origem.
+        manifesto (dict, opcional): Entrada anterior do manifesto; se tamanho e
+            mtime coincidirem, o hash dela é reusado sem reler o arquivo.
+
+    Returns:
+        dict: 'tamanho', 'mtime_ns' e 'sha256'.
+    """
+    estado = os.stat(caminho_origem)
+    if manifesto and manifesto.get("tamanho") == estado.st_size and manifesto.get("mtime_ns") == estado.st_mtime_ns:
+        return {"tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns, "sha256": manifesto["sha256"]}
+    return {"tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns, "sha256": hash_arquivo(caminho_origem)}
+
+
+def carregar_com_cache(caminho_origem, rotulo, carregar, diretorio=None):
+    """
+    Retorna o DataFrame de ``carregar()`` a partir do cache colunar, gerando-o
+    na primeira vez (ou quando o arquivo de origem muda).
+
+    Args:
+        caminho_origem (str): Arquivo JSON lido por ``carregar``.
+        rotulo (str): Nome da entrada; deve distinguir cargas diferentes do
+            mesmo arquivo (ex.: 'candidatos-campos').
+        carregar (callable): Sem argumentos; faz a carga completa a partir do JSON.
+        diretorio (str, opcional): Diretório do cache (padrão: ``diretorio_cache``).
+
+    Returns:
+        DataFrame: O mesmo conteúdo de ``carregar()``.
+    """
+    diretorio = diretorio_cache(caminho_origem, diretorio)
+    entrada = _ler_manifesto(diretorio).get(rotulo)
+    chave = chave_origem(caminho_origem, entrada)
+    arquivo = os.path.join(diretorio, f"{rotulo}-{chave['tamanho']}-{chave['sha256'][:16]}.arrow")
+
+    if entrada and entrada.get("sha256") == chave["sha256"] and os.path.exists(arquivo):
+        try:
+            # Sem memory-map: o to_pandas copia tudo de qualquer forma, e com a tabela em
+            # memória o self_destruct devolve cada coluna do Arrow logo após convertê-la.
+            df = feather.read_table(arquivo).to_pandas(self_destruct=True)
+        except Exception as e:
+            print(f"Cache de '{rotulo}' ilegível ({e}); refazendo a partir de {caminho_origem}.")
+        else:
+            if entrada.get("mtime_ns") != chave["mtime_ns"]:
+                # Mesmo conteúdo com outro mtime (ex.: arquivo copiado): evita refazer o hash na próxima carga.
+                _registrar(diretorio, rotulo, chave, arquivo, caminho_origem)
+            return df
+
+    df = carregar()
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        _gravar_atomico(diretorio, arquivo,
+                        lambda temporario: feather.write_feather(df, temporario, compression='uncompressed'))
+        anterior = _registrar(diretorio, rotulo, chave, arquivo, caminho_origem)
+        if anterior and anterior != os.path.basename(arquivo) and os.path.exists(os.path.join(diretorio, anterior)):
+            os.remove(os.path.join(diretorio, anterior))
+    except Exception as e:
+        # Sem cache (diretório somente leitura, coluna que o Arrow não representa...) a carga segue normal.
+        print(f"Não foi possível gravar o cache de '{rotulo}' em {diretorio}: {e}")
+    return df
+
+
+def main():
+    from base_dados import carregar_candidatos_internos, carregar_vagas_sistema
+    for nome, carregar in (("candidatos", carregar_candidatos_internos), ("vagas", carregar_vagas_sistema)):
+        inicio = time.time()
+        df = carregar()
+        print(f"{nome}: {len(df)} linhas em {time.time() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Cache dos rankings já calculados, consultado antes do refinamento da descrição
+pelo Gemini e de ``recomendar_candidatos``.
+
+A chave combina o hash da descrição normalizada, ``top_n``, os demais
+parâmetros do ranking e a versão da base de candidatos consultada. Quando o
+índice é reconstruído (ou recebe segmentos/lápides) a versão muda e as
+entradas antigas deixam de ser encontradas, expirando pelo LRU/TTL.
+
+A camada em memória é um ``TTLCache`` (LRU com tempo de vida); a camada em
+disco, opcional, guarda cada ranking como um pickle e sobrevive a reinícios
+do servidor.
+"""
+import os
+import re
+import time
+import json
+import pickle
+import hashlib
+import tempfile
+import threading
+import unicodedata
+
+from cachetools import TTLCache
+
+
+CAPACIDADE_PADRAO = 256
+TTL_PADRAO_S = 6 * 60 * 60
+
+# Diretório da camada em disco; sem ele o cache fica só em memória.
+DIRETORIO_CACHE_PADRAO = os.environ.get("CACHE_RESULTADOS_DIR")
+
+_ESPACOS = re.compile(r'\s+')
+
+
+def normalizar_descricao(texto):
+    """
+    Normaliza a descrição para que variações de caixa, acentuação composta e
+    espaços em branco produzam a mesma chave.
+    """
+    texto = unicodedata.normalize("NFC", texto or "")
+    return _ESPACOS.sub(' ', texto).strip().lower()
+
+
+def chave_resultado(descricao_vaga, top_n, versao_candidatos, **parametros):
+    """
+    Chave do cache para um ranking.
+
+    Args:
+        descricao_vaga (str): Descrição digitada/selecionada (antes do refinamento).
+        top_n (int): Quantidade de candidatos pedida.
+        versao_candidatos (str): Versão da base consultada (``SistemaRecomendacao.versao_candidatos``).
+        **parametros: Demais parâmetros que alteram o ranking (modo, modelo, K...).
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal.
+    """
+    conteudo = json.dumps({
+        "descricao": hashlib.sha256(normalizar_descricao(descricao_vaga).encode("utf-8")).hexdigest(),
+        "top_n": int(top_n),
+        "versao": str(versao_candidatos),
+        "parametros": parametros,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+
+class CacheResultados:
+    """
+    Cache de rankings (DataFrames) em duas camadas: memória (LRU + TTL) e,
+    opcionalmente, disco.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, ttl=TTL_PADRAO_S, diretorio=DIRETORIO_CACHE_PADRAO):
+        self.ttl = ttl
+        self.diretorio = diretorio
+        self._memoria = TTLCache(maxsize=capacidade, ttl=ttl)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.pkl")
+
+    def _ler_disco(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            if time.time() - os.path.getmtime(caminho) > self.ttl:
+                os.remove(caminho)
+                return None
+            with open(caminho, 'rb') as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _gravar_disco(self, chave, resultados):
+        descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=self.diretorio)
+        with os.fdopen(descritor, 'wb') as f:
+            pickle.dump(resultados, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, self._caminho(chave))
+
+    def _remover_expirados_disco(self):
+        limite = time.time() - self.ttl
+        for nome in os.listdir(self.diretorio):
+            caminho = os.path.join(self.diretorio, nome)
+            try:
+                if nome.endswith(".pkl") and os.path.getmtime(caminho) < limite:
+                    os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+    def obter(self, chave):
+        """
+        Retorna uma cópia do ranking guardado em ``chave`` ou None.
+        """
+        with self._trava:
+            resultados = self._memoria.get(chave)
+        if resultados is None and self.diretorio:
+            resultados = self._ler_disco(chave)
+            if resultados is not None:
+                with self._trava:
+                    self._memoria[chave] = resultados
+        with self._trava:
+            if resultados is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+        # Quem consome o ranking pode alterá-lo (fillna inplace, seleção de colunas).
+        return resultados.copy()
+
+    def guardar(self, chave, resultados):
+        resultados = resultados.copy()
+        with self._trava:
+            self._memoria[chave] = resultados
+        if self.diretorio:
+            self._gravar_disco(chave, resultados)
+            self._remover_expirados_disco()
+
+    def limpar(self):
+        with self._trava:
+            self._memoria.clear()
+        if self.diretorio:
+            for nome in os.listdir(self.diretorio):
+                if nome.endswith(".pkl"):
+                    os.remove(os.path.join(self.diretorio, nome))
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "entradas": len(self._memoria),
+            }
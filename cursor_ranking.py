@@ -0,0 +1,120 @@
+"""
+Cursor sobre o ranking de uma vaga, para paginar e exportar sem refazer o fluxo.
+
+O cursor guarda, no servidor, o prefixo do ranking já calculado. Pedir uma
+página além dele estende o prefixo com uma nova busca (dobrando o ``k``),
+sem repetir o refinamento pelo Gemini nem a vetorização da vaga; páginas já
+calculadas são só fatias. O prefixo já servido nunca muda: candidatos que
+reaparecem em uma extensão são descartados, de modo que as páginas não se
+sobrepõem.
+
+No modo em duas etapas o ranking é definido sobre os ``k_pre_selecao``
+candidatos pré-selecionados; ele é calculado por inteiro na primeira
+extensão e o cursor termina nele.
+"""
+import threading
+
+import pandas as pd
+
+
+TAMANHO_INICIAL_PADRAO = 50
+TAMANHO_LOTE_EXPORTACAO = 1000
+
+
+class CursorRanking:
+    """
+    Ranking calculado sob demanda, do melhor para o pior candidato.
+
+    Args:
+        buscar (callable): Recebe ``k`` e devolve o DataFrame com os ``k``
+            melhores candidatos, em ordem (``SistemaRecomendacao.abrir_cursor``).
+        tamanho_inicial (int): ``k`` da primeira extensão.
+        limite (int, opcional): Tamanho máximo do ranking (None = toda a base).
+        resultados_iniciais (DataFrame, opcional): Prefixo já calculado (ex.: a
+            primeira página vinda do cache de resultados).
+    """
+
+    def __init__(self, buscar, tamanho_inicial=TAMANHO_INICIAL_PADRAO, limite=None, resultados_iniciais=None):
+        self._buscar = buscar
+        self.tamanho_inicial = tamanho_inicial
+        self.limite = limite
+        self._resultados = resultados_iniciais.reset_index(drop=True) if resultados_iniciais is not None else None
+        self._k = 0
+        self.esgotado = False
+        self._trava = threading.Lock()
+
+    @property
+    def calculados(self):
+        """
+        Quantidade de candidatos já ranqueados (disponíveis sem nova busca).
+        """
+        return 0 if self._resultados is None else len(self._resultados)
+
+    def _estender(self, ate):
+        k = max(ate, 2 * self._k, self.tamanho_inicial)
+        if self.limite is not None:
+            k = min(k, self.limite)
+        novos = self._buscar(k).reset_index(drop=True)
+        self._k = k
+        self.esgotado = len(novos) < k or (self.limite is not None and k >= self.limite)
+        if self._resultados is None:
+            self._resultados = novos
+            return
+        # Mantém o prefixo já servido e acrescenta só quem ainda não apareceu.
+        ineditos = novos[~novos['id_candidato'].isin(self._resultados['id_candidato'])]
+        self._resultados = pd.concat([self._resultados, ineditos], ignore_index=True)
+
+    def fatia(self, inicio, fim):
+        """
+        Candidatos nas posições ``inicio:fim`` do ranking (cópia).
+        """
+        with self._trava:
+            while self.calculados < fim and not self.esgotado:
+                self._estender(fim)
+            return self._resultados.iloc[inicio:fim].copy()
+
+    def pagina(self, numero, tamanho):
+        """
+        Página ``numero`` (a partir de 0) com ``tamanho`` candidatos.
+        """
+        return self.fatia(numero * tamanho, (numero + 1) * tamanho)
+
+    def ha_mais(self, posicao):
+        """
+        True se existe (ou pode existir) candidato na posição ``posicao``.
+        """
+        return posicao < self.calculados or not self.esgotado
+
+    def lotes(self, total, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+        """
+        Gera os ``total`` primeiros candidatos em DataFrames de até
+        ``tamanho_lote`` linhas, estendendo o ranking conforme o consumo.
+        """
+        for inicio in range(0, total, tamanho_lote):
+            lote = self.fatia(inicio, min(inicio + tamanho_lote, total))
+            if lote.empty:
+                break
+            yield lote
+            if len(lote) < tamanho_lote:
+                break
+
+    def exportar_csv(self, destino, total, colunas=None, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+        """
+        Grava os ``total`` primeiros candidatos em CSV, lote a lote.
+
+        Args:
+            destino (str ou arquivo): Caminho ou objeto de arquivo (texto ou binário).
+            total (int): Quantidade de candidatos exportados.
+            colunas (list, opcional): Colunas exportadas (padrão: todas).
+            tamanho_lote (int): Linhas buscadas e gravadas por vez.
+
+        Returns:
+            int: Linhas gravadas.
+        """
+        gravadas = 0
+        for lote in self.lotes(total, tamanho_lote):
+            if colunas is not None:
+                lote = lote[[coluna for coluna in colunas if coluna in lote.columns]]
+            lote.to_csv(destino, header=gravadas == 0, index=False, mode='a' if gravadas else 'w')
+            gravadas += len(lote)
+        return gravadas
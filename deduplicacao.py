@@ -0,0 +1,149 @@
+"""
+Detecção de currículos quase duplicados com MinHash + LSH.
+
+A base interna tem muitos currículos reenviados ou praticamente idênticos;
+eles ocupam linhas da matriz TF-IDF e enchem o top-N com a mesma pessoa.
+Na construção do índice (``indice_candidatos.ajustar_indice``) cada
+currículo pré-processado vira um conjunto de shingles (sequências de
+``TAMANHO_SHINGLE`` palavras) resumido por uma assinatura MinHash; o LSH por
+bandas propõe pares com assinaturas parecidas, que só são agrupados se a
+similaridade de Jaccard estimada passar do limiar. Fica um representante por
+grupo (a primeira linha dele na base).
+"""
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+
+LIMIAR_DUPLICATAS_PADRAO = 0.7
+TAMANHO_SHINGLE = 3
+N_PERMUTACOES = 128
+N_BANDAS = 32
+
+# Cada permutação é um hash multiply-shift: os 32 bits altos de (a * x + b) mod 2^64.
+_DESLOCAMENTO = np.uint64(32)
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+_MULTIPLICADORES_SHINGLE = np.array([0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F, 0x165667B1],
+                                    dtype=np.uint64)
+
+
+def _hashes_shingles(tokens, vocabulario, tamanho_shingle):
+    ids = np.fromiter((vocabulario.setdefault(token, len(vocabulario)) for token in tokens),
+                      dtype=np.uint64, count=len(tokens))
+    tamanho = min(tamanho_shingle, ids.shape[0])
+    if tamanho == 0:
+        return ids
+    # Combina os ids das palavras de cada janela em um único hash.
+    hashes = np.zeros(ids.shape[0] - tamanho + 1, dtype=np.uint64)
+    for deslocamento in range(tamanho):
+        hashes ^= ids[deslocamento:deslocamento + hashes.shape[0]] * _MULTIPLICADORES_SHINGLE[deslocamento]
+    return np.unique(hashes & _MASCARA_32)
+
+
+def assinaturas_minhash(textos, n_permutacoes=N_PERMUTACOES, tamanho_shingle=TAMANHO_SHINGLE, semente=0):
+    """
+    Assinatura MinHash de cada texto.
+
+    Args:
+        textos (iterável de str): Textos já pré-processados (palavras separadas por espaço).
+        n_permutacoes (int): Tamanho da assinatura.
+        tamanho_shingle (int): Palavras por shingle.
+        semente (int): Semente das funções de hash.
+
+    Returns:
+        tuple: (np.ndarray (n_textos, n_permutacoes) uint32, np.ndarray bool com
+        False para textos vazios, que nunca são agrupados).
+    """
+    aleatorio = np.random.default_rng(semente)
+    a = aleatorio.integers(0, 2**63, size=(n_permutacoes, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = aleatorio.integers(0, 2**63, size=(n_permutacoes, 1), dtype=np.uint64)
+
+    vocabulario = {}
+    textos = list(textos)
+    assinaturas = np.full((len(textos), n_permutacoes), np.iinfo(np.uint32).max, dtype=np.uint32)
+    validos = np.zeros(len(textos), dtype=bool)
+    for i, texto in enumerate(textos):
+        hashes = _hashes_shingles(str(texto).split(), vocabulario, tamanho_shingle)
+        if hashes.shape[0]:
+            # Os produtos estouram de propósito: a aritmética é módulo 2^64.
+            assinaturas[i] = ((a * hashes + b) >> _DESLOCAMENTO).min(axis=1)
+            validos[i] = True
+    return assinaturas, validos
+
+
+def pares_candidatos(assinaturas, validos, n_bandas=N_BANDAS):
+    """
+    Pares (i, j) com ao menos uma banda da assinatura idêntica.
+
+    Em cada banda, as linhas com o mesmo valor formam um balde; cada linha é
+    pareada com a primeira do seu balde (o agrupamento final é transitivo).
+    """
+    linhas_por_banda = assinaturas.shape[1] // n_bandas
+    posicoes = np.flatnonzero(validos)
+    origens, destinos = [], []
+    for banda in range(n_bandas):
+        trecho = assinaturas[posicoes, banda * linhas_por_banda:(banda + 1) * linhas_por_banda]
+        _, primeiras, baldes = np.unique(trecho, axis=0, return_index=True, return_inverse=True)
+        lideres = posicoes[primeiras[baldes.reshape(-1)]]
+        repetidos = lideres != posicoes
+        origens.append(posicoes[repetidos])
+        destinos.append(lideres[repetidos])
+    if not origens:
+        return np.empty((0, 2), dtype=np.int64)
+    pares = np.stack([np.concatenate(origens), np.concatenate(destinos)], axis=1)
+    return np.unique(pares, axis=0)
+
+
+def deduplicar(textos, limiar=LIMIAR_DUPLICATAS_PADRAO, n_permutacoes=N_PERMUTACOES, n_bandas=N_BANDAS,
+               tamanho_shingle=TAMANHO_SHINGLE):
+    """
+    Agrupa os textos quase duplicados.
+
+    Args:
+        textos (iterável de str): Currículos já pré-processados.
+        limiar (float): Similaridade de Jaccard estimada mínima para agrupar um par.
+        n_permutacoes (int): Tamanho da assinatura MinHash.
+        n_bandas (int): Bandas do LSH (``n_permutacoes`` deve ser múltiplo).
+        tamanho_shingle (int): Palavras por shingle.
+
+    Returns:
+        tuple: (np.ndarray com as linhas representantes, em ordem crescente;
+        np.ndarray com, para cada linha, a posição do seu representante no
+        primeiro array).
+    """
+    if n_permutacoes % n_bandas:
+        raise ValueError("n_permutacoes deve ser múltiplo de n_bandas.")
+    assinaturas, validos = assinaturas_minhash(textos, n_permutacoes, tamanho_shingle)
+    n_linhas = assinaturas.shape[0]
+    pares = pares_candidatos(assinaturas, validos, n_bandas)
+    # Confirma cada par pela fração de posições iguais das assinaturas (Jaccard estimado).
+    similaridades = (assinaturas[pares[:, 0]] == assinaturas[pares[:, 1]]).mean(axis=1)
+    pares = pares[similaridades >= limiar]
+
+    grafo = sparse.coo_matrix((np.ones(pares.shape[0], dtype=np.int8), (pares[:, 0], pares[:, 1])),
+                              shape=(n_linhas, n_linhas))
+    _, componentes = connected_components(grafo, directed=False)
+    # Representante de cada componente: a menor linha dele.
+    primeira_linha = np.full(componentes.max() + 1 if n_linhas else 0, n_linhas, dtype=np.int64)
+    np.minimum.at(primeira_linha, componentes, np.arange(n_linhas))
+    representantes = np.sort(primeira_linha)
+    grupo = np.searchsorted(representantes, primeira_linha[componentes])
+    return representantes, grupo
+
+
+def grupos_por_representante(ids, representantes, grupo):
+    """
+    Lista de ids de cada grupo com mais de um membro, começando pelo representante.
+
+    Args:
+        ids (sequência): ``id_candidato`` de cada linha original.
+        representantes, grupo: Saída de ``deduplicar``.
+
+    Returns:
+        list: Uma lista de ids por grupo de duplicatas.
+    """
+    ids = np.asarray(ids, dtype=object)
+    ordem = np.argsort(grupo, kind='stable')
+    cortes = np.flatnonzero(np.diff(grupo[ordem])) + 1
+    return [[i.item() if hasattr(i, 'item') else i for i in ids[membros]]
+            for membros in np.split(ordem, cortes) if membros.shape[0] > 1]
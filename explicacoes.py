@@ -0,0 +1,62 @@
+"""
+Explicação da similaridade de cada candidato retornado.
+
+O cosseno entre a vaga e um currículo é a soma, termo a termo, do produto dos
+pesos TF-IDF dos dois vetores (ambos normalizados). Os termos com maior
+produto são os que mais pesaram na similaridade; ``termos_relevantes`` os
+calcula para todas as linhas do resultado de uma vez, sobre os arrays da CSR,
+sem laço por candidato no cálculo.
+"""
+import numpy as np
+
+from busca_topk import _vetor_consulta
+
+
+N_TERMOS_EXPLICACAO_PADRAO = 5
+
+
+def vocabulario_por_coluna(vectorizer):
+    """
+    Array com o termo de cada coluna do vetorizador (inverso de ``vocabulary_``).
+    """
+    vocabulario = vectorizer.vocabulary_
+    termos = np.empty(len(vocabulario), dtype=object)
+    termos[np.fromiter(vocabulario.values(), dtype=np.int64, count=len(vocabulario))] = list(vocabulario)
+    return termos
+
+
+def termos_relevantes(linhas, consulta, termos, n_termos=N_TERMOS_EXPLICACAO_PADRAO):
+    """
+    Termos que mais contribuíram para a similaridade de cada linha.
+
+    Args:
+        linhas (csr_matrix): Vetores TF-IDF dos candidatos retornados (n, n_termos).
+        consulta (csr_matrix ou np.ndarray): Vetor TF-IDF da vaga.
+        termos (np.ndarray): Termo de cada coluna (``vocabulario_por_coluna``).
+        n_termos (int): Termos listados por candidato.
+
+    Returns:
+        list: Para cada linha, texto como "python 41%, sap 22%" (parcela do cosseno).
+    """
+    linhas = linhas.tocsr()
+    n_linhas = linhas.shape[0]
+    vetor = _vetor_consulta(consulta, linhas.shape[1], linhas.dtype)
+
+    # Produto elemento a elemento de cada linha com a consulta, direto sobre ``data``.
+    contribuicoes = linhas.data * vetor[linhas.indices]
+    numero_linha = np.repeat(np.arange(n_linhas), np.diff(linhas.indptr))
+    totais = np.bincount(numero_linha, weights=contribuicoes, minlength=n_linhas)
+
+    ativos = contribuicoes > 0
+    contribuicoes, colunas, numero_linha = contribuicoes[ativos], linhas.indices[ativos], numero_linha[ativos]
+    # Ordena por linha e, dentro dela, por contribuição decrescente; fica com as n primeiras.
+    ordem = np.lexsort((-contribuicoes, numero_linha))
+    contribuicoes, colunas, numero_linha = contribuicoes[ordem], colunas[ordem], numero_linha[ordem]
+    posto = np.arange(numero_linha.shape[0]) - np.searchsorted(numero_linha, numero_linha)
+    manter = posto < n_termos
+    contribuicoes, colunas, numero_linha = contribuicoes[manter], colunas[manter], numero_linha[manter]
+
+    parcelas = np.rint(100 * contribuicoes / totais[numero_linha]).astype(np.int64)
+    rotulos = [f"{termo} {parcela}%" for termo, parcela in zip(termos[colunas], parcelas)]
+    cortes = np.searchsorted(numero_linha, np.arange(n_linhas + 1))
+    return [', '.join(rotulos[cortes[i]:cortes[i + 1]]) for i in range(n_linhas)]
@@ -0,0 +1,249 @@
+import os
+import re
+import string
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from unidecode import unidecode
+
+from base_dados import COLUNAS_TRECHOS_MODELO
+from importacao_tardia import modulo_tardio
+
+# Importados só quando o extrator é carregado (primeira pontuação pelo modelo).
+joblib = modulo_tardio("joblib")
+preprocessamento_sklearn = modulo_tardio("sklearn.preprocessing")
+texto_sklearn = modulo_tardio("sklearn.feature_extraction.text")
+corpus_nltk = modulo_tardio("nltk.corpus")
+tokenize_nltk = modulo_tardio("nltk.tokenize")
+
+
+ARQUIVO_VETORIZADOR_MODELO = "tfidf_vectorizer.pkl"
+ARQUIVO_COLUNAS_FINAIS = "colunas_categoricas_final.pkl"
+ARQUIVO_COLUNAS_ORIGINAIS = "colunas_categoricas_originais.pkl"
+
+VALOR_CATEGORICO_AUSENTE = "Desconhecido_NA"
+# Colunas categóricas do candidato no notebook; as demais descrevem a vaga.
+PREFIXO_CANDIDATO = "applicant_"
+# Campos da vaga (catálogo de base_dados.carregar_vagas_sistema) somados à descrição no
+# texto do modelo, como titulo_vaga_detalhado e observacoes_vaga no notebook.
+CAMPOS_TEXTO_VAGA = ("titulo", "observacoes")
+
+_ESPACOS = re.compile(r'\s+')
+_PONTUACAO = re.compile(r'[' + re.escape(string.punctuation) + r']')
+
+
+def limpar_texto(texto):
+    """
+    Limpeza de texto idêntica à usada no treino do modelo (modeloRanking.ipynb).
+    """
+    # verifica se é uma string
+    if not isinstance(texto, str):
+        return ""
+    texto = texto.lower()
+    # remover espaços/quebras de linha
+    texto = _ESPACOS.sub(' ', texto).strip()
+    # remover pontuação
+    texto = _PONTUACAO.sub('', texto)
+    # remover espaços inicio e fim
+    texto = texto.strip()
+    # remover acentos
+    return unidecode(texto)
+
+
+class ExtratorFeaturesModelo:
+    """
+    Monta a matriz de entrada do ``modelo_final.keras`` da mesma forma que o
+    notebook de treino: TF-IDF (vetorizador salvo) sobre o texto combinado
+    candidato + vaga, seguido do bloco one-hot das colunas categóricas do
+    candidato e da vaga.
+
+    O texto usa as mesmas colunas do treino: do candidato, o CV em português,
+    os conhecimentos técnicos e as certificações (``textos_candidatos``); da
+    vaga, atividades e competências (a 'descricao'), título e observações
+    (``texto_vaga``). O comentário da candidatura, que também entrava no
+    treino, não existe antes da candidatura e fica de fora.
+    """
+
+    def __init__(self, vectorizer, colunas_finais, colunas_originais):
+        self.vectorizer = vectorizer
+        self.colunas_finais = list(colunas_finais)
+        self.colunas_originais = list(colunas_originais)
+        self._tokenizer = tokenize_nltk.WordPunctTokenizer()
+        self._stopwords = frozenset(corpus_nltk.stopwords.words('portuguese'))
+
+    @classmethod
+    def carregar(cls, diretorio):
+        """
+        Carrega os artefatos salvos pelo notebook de treino.
+
+        Args:
+            diretorio (str): Diretório com tfidf_vectorizer.pkl e os .pkl das colunas categóricas.
+
+        Returns:
+            ExtratorFeaturesModelo: Extrator pronto para uso.
+        """
+        caminhos = [os.path.join(diretorio, nome) for nome in
+                    (ARQUIVO_VETORIZADOR_MODELO, ARQUIVO_COLUNAS_FINAIS, ARQUIVO_COLUNAS_ORIGINAIS)]
+        faltantes = [caminho for caminho in caminhos if not os.path.exists(caminho)]
+        if faltantes:
+            raise FileNotFoundError(
+                f"Artefatos do modelo não encontrados: {', '.join(faltantes)}. "
+                "Exporte-os com o notebook modeloRanking.ipynb."
+            )
+        return cls(*(joblib.load(caminho) for caminho in caminhos))
+
+    @property
+    def n_features(self):
+        return len(self.vectorizer.vocabulary_) + len(self.colunas_finais)
+
+    def preprocessar(self, texto):
+        tokens = self._tokenizer.tokenize(limpar_texto(texto))
+        return ' '.join(t for t in tokens if t not in self._stopwords and len(t) > 1)
+
+    def textos_candidatos(self, candidatos):
+        """
+        Texto de cada candidato nas colunas do treino.
+
+        São os trechos do 'curriculo' indicados nas colunas de posição
+        (``base_dados.COLUNAS_TRECHOS_MODELO``: CV em português e o bloco
+        conhecimentos técnicos + certificações), unidos por espaço. Bases sem
+        essas colunas (planilhas externas, índices antigos) ou linhas sem os
+        valores usam o 'curriculo' inteiro.
+
+        Args:
+            candidatos (DataFrame): Coluna 'curriculo' e, opcionalmente, as de posição.
+
+        Returns:
+            list: Um texto por linha de ``candidatos``.
+        """
+        curriculos = candidatos['curriculo'].fillna('').astype(str).tolist()
+        colunas = [coluna for par in COLUNAS_TRECHOS_MODELO for coluna in par]
+        if not set(colunas) <= set(candidatos.columns):
+            return curriculos
+        textos = []
+        for curriculo, posicoes in zip(curriculos, candidatos[colunas].itertuples(index=False, name=None)):
+            if any(pd.isna(posicao) for posicao in posicoes):
+                textos.append(curriculo)
+            else:
+                textos.append(' '.join(curriculo[int(inicio):int(fim)]
+                                       for inicio, fim in zip(posicoes[::2], posicoes[1::2])))
+        return textos
+
+    def texto_vaga(self, descricao, dados_vaga=None):
+        """
+        Texto da vaga nas colunas do treino: a descrição seguida dos ``CAMPOS_TEXTO_VAGA``
+        de ``dados_vaga`` (vagas digitadas, sem ``dados_vaga``, usam só a descrição).
+        """
+        partes = [descricao]
+        if dados_vaga is not None:
+            partes += [dados_vaga.get(campo) for campo in CAMPOS_TEXTO_VAGA]
+        return ' '.join(parte for parte in partes if isinstance(parte, str))
+
+    def contagens(self, textos):
+        """
+        Conta os termos do vocabulário do modelo em cada texto (sem IDF/normalização).
+
+        Como o vetorizador do treino usa apenas unigramas, as contagens de
+        "currículo + vaga" são a soma das contagens de cada parte, o que permite
+        calcular a parte do currículo uma vez e reaproveitá-la entre vagas.
+        """
+        processados = [self.preprocessar(texto) for texto in textos]
+        # transform de CountVectorizer: contagens brutas no vocabulário ajustado.
+        return texto_sklearn.CountVectorizer.transform(self.vectorizer, processados).tocsr()
+
+    def _tfidf_de_contagens(self, contagens):
+        tfidf = contagens.astype(np.float64)
+        if self.vectorizer.sublinear_tf:
+            tfidf.data = np.log(tfidf.data) + 1
+        if self.vectorizer.use_idf:
+            tfidf = tfidf @ sparse.diags(self.vectorizer.idf_)
+        if self.vectorizer.norm:
+            tfidf = preprocessamento_sklearn.normalize(tfidf, norm=self.vectorizer.norm, copy=False)
+        return tfidf.tocsr()
+
+    @property
+    def colunas_candidato(self):
+        return [coluna for coluna in self.colunas_originais if coluna.startswith(PREFIXO_CANDIDATO)]
+
+    @property
+    def colunas_vaga(self):
+        return [coluna for coluna in self.colunas_originais if not coluna.startswith(PREFIXO_CANDIDATO)]
+
+    def bloco_categorico(self, registros, colunas=None):
+        """
+        Bloco one-hot alinhado às colunas do treino (``get_dummies`` do notebook).
+
+        Cada coluna original em ``colunas`` é lida de ``registros``; valores nulos
+        ou colunas ausentes viram ``Desconhecido_NA``, como no preenchimento do
+        notebook, e categorias que não existiam no treino ficam zeradas.
+
+        Args:
+            registros (DataFrame): Linhas com (parte das) colunas categóricas originais.
+            colunas (list, opcional): Colunas originais a codificar; padrão: todas.
+
+        Returns:
+            csr_matrix: Matriz (len(registros), len(colunas_finais)).
+        """
+        posicoes = pd.Series(np.arange(len(self.colunas_finais)), index=self.colunas_finais)
+        n_linhas = len(registros)
+        linhas, colunas_ativas = [], []
+        for coluna in (self.colunas_originais if colunas is None else colunas):
+            if coluna in registros.columns:
+                valores = registros[coluna].fillna(VALOR_CATEGORICO_AUSENTE).astype(str)
+            else:
+                valores = pd.Series(VALOR_CATEGORICO_AUSENTE, index=range(n_linhas))
+            indices = (coluna + "_" + valores).map(posicoes).to_numpy()
+            conhecidas = ~pd.isna(indices)
+            linhas.append(np.flatnonzero(conhecidas))
+            colunas_ativas.append(indices[conhecidas].astype(np.int64))
+        linhas = np.concatenate(linhas) if linhas else np.empty(0, dtype=np.int64)
+        colunas_ativas = np.concatenate(colunas_ativas) if colunas_ativas else np.empty(0, dtype=np.int64)
+        return sparse.csr_matrix(
+            (np.ones(linhas.shape[0]), (linhas, colunas_ativas)),
+            shape=(n_linhas, len(self.colunas_finais))
+        )
+
+    def bloco_candidatos(self, candidatos):
+        """
+        Parte do bloco categórico que depende só do candidato (colunas applicant_*).
+        Calculada uma vez por base e reaproveitada entre vagas.
+        """
+        return self.bloco_categorico(candidatos, self.colunas_candidato)
+
+    def bloco_vaga(self, dados_vaga=None):
+        """
+        Parte do bloco categórico que depende só da vaga (linha única).
+
+        Args:
+            dados_vaga (dict ou Series, opcional): Campos categóricos da vaga; sem
+                eles todas as colunas da vaga ficam como ``Desconhecido_NA``.
+        """
+        registros = pd.DataFrame([dict(dados_vaga)] if dados_vaga is not None else [{}], index=[0])
+        return self.bloco_categorico(registros, self.colunas_vaga)
+
+    def matriz(self, contagens_candidatos, texto_vaga, categorico_candidatos=None, dados_vaga=None):
+        """
+        Monta a matriz de features de um lote de candidatos para uma vaga.
+
+        Args:
+            contagens_candidatos (csr_matrix): Saída de ``contagens`` para os
+                ``textos_candidatos`` do lote.
+            texto_vaga (str): Descrição da vaga (completada por ``texto_vaga``).
+            categorico_candidatos (csr_matrix, opcional): Saída de ``bloco_candidatos`` para o lote;
+                sem ele as colunas do candidato ficam como ``Desconhecido_NA``.
+            dados_vaga (dict ou Series, opcional): Campos categóricos e de texto da vaga.
+
+        Returns:
+            csr_matrix: Matriz (n_candidatos, n_features) pronta para ``model.predict``.
+        """
+        n_candidatos = contagens_candidatos.shape[0]
+        contagens_vaga = self.contagens([self.texto_vaga(texto_vaga, dados_vaga)])
+        # Replica a linha da vaga para todos os candidatos (produto externo com um vetor de uns).
+        uns = sparse.csr_matrix(np.ones((n_candidatos, 1)))
+        combinadas = contagens_candidatos + uns @ contagens_vaga
+        if categorico_candidatos is None:
+            categorico_candidatos = self.bloco_candidatos(pd.DataFrame(index=range(n_candidatos)))
+        # Colunas de candidato e de vaga são disjuntas: a soma monta o bloco completo.
+        categorico = categorico_candidatos + uns @ self.bloco_vaga(dados_vaga)
+        return sparse.hstack([self._tfidf_de_contagens(combinadas), categorico], format='csr')
@@ -0,0 +1,66 @@
+"""
+Importação tardia das bibliotecas pesadas (TensorFlow, scikit-learn, NLTK).
+
+``modulo_tardio("tensorflow")`` devolve um substituto que só importa o módulo
+no primeiro acesso a um atributo. Assim os módulos do recomendador podem ser
+importados por qualquer página (constantes, registro, cache...) sem pagar
+segundos de import: o custo fica para a primeira recomendação.
+
+    tf = modulo_tardio("tensorflow")
+    ...
+    modelo = tf.keras.models.load_model(caminho)  # o import acontece aqui
+"""
+import importlib
+import sys
+import threading
+
+
+class ModuloTardio:
+    """
+    Substituto de um módulo que o importa no primeiro acesso a um atributo.
+    """
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+        self._trava = threading.Lock()
+
+    @property
+    def carregado(self):
+        return self._modulo is not None or self._nome in sys.modules
+
+    def carregar(self):
+        """
+        Importa o módulo (uma única vez) e o retorna.
+        """
+        if self._modulo is None:
+            with self._trava:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        # Atributos internos ausentes (cópia/pickle do substituto) não disparam o import.
+        if atributo.startswith('__') or atributo in ('_nome', '_modulo', '_trava'):
+            raise AttributeError(atributo)
+        return getattr(self.carregar(), atributo)
+
+    def __repr__(self):
+        estado = "carregado" if self.carregado else "não carregado"
+        return f"<módulo tardio '{self._nome}' ({estado})>"
+
+
+def modulo_tardio(nome):
+    """
+    Retorna o módulo ``nome`` se ele já foi importado; caso contrário, um
+    ``ModuloTardio`` que o importa no primeiro uso.
+
+    Args:
+        nome (str): Nome completo do módulo (ex.: 'sklearn.feature_extraction.text').
+
+    Returns:
+        module ou ModuloTardio: Objeto com os mesmos atributos do módulo.
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    return ModuloTardio(nome)
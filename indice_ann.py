@@ -0,0 +1,412 @@
+"""
+Busca aproximada (ANN) sobre embeddings LSA da base de candidatos.
+
+A matriz TF-IDF do índice é projetada em poucas dimensões (128 a 256) com SVD
+truncado. Os embeddings são agrupados por k-means esférico (centroides
+"grossos") e gravados ordenados por grupo, formando listas invertidas
+contíguas no estilo IVF. Uma consulta compara o vetor da vaga com os
+centroides, percorre só as ``n_sondas`` listas mais próximas e reordena os
+melhores pelo cosseno TF-IDF exato.
+
+Os arquivos ficam em ``<índice>/ann`` e são ligados à versão do índice base.
+O ANN é opcional mesmo quando construído: o IndiceIncremental só o usa para o
+segmento base com ``usar_ann=True`` ou a variável de ambiente ``BUSCA_ANN=1``
+(o recall@10 nos parâmetros padrão fica em torno de 0,74, e a paginação por
+cursor se esgota antes da busca exata). Sem isso a busca continua exata.
+
+    python indice_ann.py construir --dimensoes 128
+    python indice_ann.py avaliar --k 10 --sondas 1 4 16 64 --fatores-reordenacao 5 20 50
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+from scipy import sparse
+from busca_topk import topk_similaridade, selecionar_topk, ordenar_resultados, _vetor_consulta
+from indice_candidatos import DIRETORIO_INDICE_PADRAO, carregar_indice
+from importacao_tardia import modulo_tardio
+
+# A SVD só é necessária para construir o índice, nunca para consultá-lo.
+decomposicao_sklearn = modulo_tardio("sklearn.decomposition")
+
+
+DIRETORIO_ANN = "ann"
+
+ARQUIVO_METADADOS_ANN = "metadados.json"
+ARQUIVO_COMPONENTES = "componentes.npy"
+ARQUIVO_CENTROIDES = "centroides.npy"
+ARQUIVO_EMBEDDINGS = "embeddings.npy"
+ARQUIVO_POSICOES = "posicoes.npy"
+ARQUIVO_INICIO_LISTAS = "inicio_listas.npy"
+
+# O ANN troca recall por latência: só é usado quando pedido explicitamente.
+USAR_ANN_PADRAO = os.environ.get("BUSCA_ANN", "0") == "1"
+
+DIMENSOES_PADRAO = 128
+N_SONDAS_PADRAO = 16
+# Quantos candidatos por resultado pedido saem da etapa aproximada para a reordenação exata.
+FATOR_REORDENACAO_PADRAO = 20
+
+# Amostra máxima usada para ajustar o SVD e o k-means.
+AMOSTRA_AJUSTE = 200000
+ITERACOES_KMEANS = 20
+TAMANHO_BLOCO_ATRIBUICAO = 65536
+
+
+def _normalizar_linhas(matriz):
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    normas[normas == 0] = 1.0
+    return matriz / normas
+
+
+def _atribuir_grupos(embeddings, centroides):
+    """
+    Grupo (centroide de maior cosseno) de cada embedding, em blocos de linhas.
+    """
+    grupos = np.empty(embeddings.shape[0], dtype=np.int32)
+    for inicio in range(0, embeddings.shape[0], TAMANHO_BLOCO_ATRIBUICAO):
+        bloco = np.asarray(embeddings[inicio:inicio + TAMANHO_BLOCO_ATRIBUICAO], dtype=np.float32)
+        grupos[inicio:inicio + bloco.shape[0]] = np.argmax(bloco @ centroides.T, axis=1)
+    return grupos
+
+
+def kmeans_esferico(embeddings, n_grupos, iteracoes=ITERACOES_KMEANS, semente=0):
+    """
+    K-means sobre vetores normalizados usando o cosseno como similaridade.
+
+    Args:
+        embeddings (np.ndarray): Vetores (n, d) com norma 1.
+        n_grupos (int): Quantidade de centroides.
+        iteracoes (int): Iterações de Lloyd.
+        semente (int): Semente da inicialização.
+
+    Returns:
+        np.ndarray: Centroides (n_grupos, d) normalizados, em float32.
+    """
+    rng = np.random.default_rng(semente)
+    centroides = np.array(embeddings[rng.choice(embeddings.shape[0], n_grupos, replace=False)], dtype=np.float32)
+    for _ in range(iteracoes):
+        grupos = _atribuir_grupos(embeddings, centroides)
+        # Soma dos membros de cada grupo como produto esparso (one-hot dos grupos x embeddings).
+        pertinencia = sparse.csr_matrix(
+            (np.ones(grupos.shape[0], dtype=np.float32), (grupos, np.arange(grupos.shape[0]))),
+            shape=(n_grupos, grupos.shape[0])
+        )
+        somas = np.asarray(pertinencia @ embeddings, dtype=np.float32)
+        vazios = ~somas.any(axis=1)
+        # Grupos que ficaram vazios são reiniciados em pontos aleatórios.
+        somas[vazios] = embeddings[rng.choice(embeddings.shape[0], int(vazios.sum()), replace=False)]
+        centroides = _normalizar_linhas(somas).astype(np.float32)
+    return centroides
+
+
+class IndiceANN:
+    """
+    Projeção LSA, centroides e listas invertidas de um índice de candidatos.
+
+    ``embeddings`` fica ordenado por lista: a lista ``g`` ocupa as linhas
+    ``inicio_listas[g]:inicio_listas[g + 1]`` e ``posicoes`` traz a linha
+    correspondente na matriz TF-IDF do índice base.
+    """
+
+    def __init__(self, componentes, centroides, embeddings, posicoes, inicio_listas, metadados, matriz=None):
+        self.componentes = componentes
+        self.centroides = centroides
+        self.embeddings = embeddings
+        self.posicoes = posicoes
+        self.inicio_listas = inicio_listas
+        self.metadados = metadados
+        self.matriz = matriz
+
+    @property
+    def versao_indice(self):
+        return self.metadados.get("versao_indice")
+
+    def projetar(self, consulta):
+        vetor = self.componentes @ _vetor_consulta(consulta, self.componentes.shape[1]).astype(np.float32)
+        norma = np.linalg.norm(vetor)
+        return vetor / norma if norma > 0 else vetor
+
+    def candidatos_aproximados(self, consulta, k, n_sondas=N_SONDAS_PADRAO, mascara_excluidos=None):
+        """
+        Etapa aproximada: top-k pelo cosseno LSA dentro das ``n_sondas`` listas
+        mais próximas da consulta.
+
+        Returns:
+            tuple: (posições na matriz base, scores LSA), sem ordem garantida.
+        """
+        vetor = self.projetar(consulta)
+        n_sondas = min(n_sondas, self.centroides.shape[0])
+        listas = np.argpartition(-(self.centroides @ vetor), n_sondas - 1)[:n_sondas]
+        linhas = np.concatenate([
+            np.arange(self.inicio_listas[g], self.inicio_listas[g + 1]) for g in np.sort(listas)
+        ])
+        posicoes = np.asarray(self.posicoes[linhas])
+        if mascara_excluidos is not None:
+            manter = ~mascara_excluidos[posicoes]
+            linhas, posicoes = linhas[manter], posicoes[manter]
+        if linhas.shape[0] == 0:
+            return posicoes.astype(np.int64), np.empty(0, dtype=np.float32)
+        scores = np.asarray(self.embeddings[linhas], dtype=np.float32) @ vetor
+        if k < scores.shape[0]:
+            melhores = np.argpartition(-scores, k - 1)[:k]
+            posicoes, scores = posicoes[melhores], scores[melhores]
+        return posicoes.astype(np.int64), scores
+
+    def buscar(self, consulta, k, n_sondas=N_SONDAS_PADRAO, fator_reordenacao=FATOR_REORDENACAO_PADRAO,
+               mascara_excluidos=None):
+        """
+        Top-k aproximado, com os scores recalculados pelo cosseno TF-IDF exato.
+
+        Args:
+            consulta (csr_matrix): Vetor TF-IDF da vaga.
+            k (int): Quantidade de resultados.
+            n_sondas (int): Listas invertidas percorridas (mais sondas = mais recall, mais tempo).
+            fator_reordenacao (int): Candidatos aproximados por resultado levados à reordenação exata.
+            mascara_excluidos (np.ndarray de bool, opcional): Posições que não podem ser retornadas.
+
+        Returns:
+            tuple: (posições, similaridades) do maior para o menor, como ``topk_similaridade``.
+        """
+        posicoes, _ = self.candidatos_aproximados(
+            consulta, max(k, k * fator_reordenacao), n_sondas, mascara_excluidos
+        )
+        if self.matriz is None:
+            raise ValueError("IndiceANN sem a matriz TF-IDF do índice base para a reordenação exata.")
+        posicoes = np.sort(posicoes)
+        scores = self.matriz[posicoes] @ _vetor_consulta(consulta, self.matriz.shape[1], self.matriz.dtype)
+        selecionadas, scores = selecionar_topk(scores, k)
+        return ordenar_resultados(posicoes[selecionadas], scores)
+
+
+def construir_indice_ann(indice, diretorio_indice=DIRETORIO_INDICE_PADRAO, dimensoes=DIMENSOES_PADRAO,
+                         n_listas=None, tipo='float32', semente=0):
+    """
+    Ajusta o SVD e o k-means sobre a matriz do índice e grava o ANN em ``<diretorio_indice>/ann``.
+
+    Args:
+        indice (IndiceCandidatos): Índice base já persistido em ``diretorio_indice``.
+        diretorio_indice (str): Diretório do índice base.
+        dimensoes (int): Dimensões dos embeddings LSA.
+        n_listas (int, opcional): Listas invertidas; padrão ~ 4 * sqrt(n_candidatos).
+        tipo (str): 'float32' ou 'float16' para os embeddings gravados.
+        semente (int): Semente das amostragens.
+
+    Returns:
+        IndiceANN: O índice ANN construído.
+    """
+    matriz = indice.matriz
+    n_linhas = matriz.shape[0]
+    n_listas = min(n_listas or int(4 * np.sqrt(n_linhas)), n_linhas)
+    rng = np.random.default_rng(semente)
+    amostra = np.sort(rng.choice(n_linhas, min(n_linhas, AMOSTRA_AJUSTE), replace=False))
+
+    inicio = time.time()
+    svd = decomposicao_sklearn.TruncatedSVD(n_components=dimensoes, algorithm='randomized', random_state=semente)
+    svd.fit(matriz[amostra])
+    componentes = svd.components_.astype(np.float32)
+    embeddings = np.empty((n_linhas, dimensoes), dtype=np.float32)
+    for bloco in range(0, n_linhas, TAMANHO_BLOCO_ATRIBUICAO):
+        fim = min(bloco + TAMANHO_BLOCO_ATRIBUICAO, n_linhas)
+        embeddings[bloco:fim] = _normalizar_linhas(np.asarray(matriz[bloco:fim] @ componentes.T))
+    print(f"SVD ({dimensoes} dimensões) em {time.time() - inicio:.1f}s; "
+          f"variância explicada {svd.explained_variance_ratio_.sum():.1%}")
+
+    inicio = time.time()
+    centroides = kmeans_esferico(embeddings[amostra], n_listas, semente=semente)
+    grupos = _atribuir_grupos(embeddings, centroides)
+    ordem = np.argsort(grupos, kind='stable')
+    inicio_listas = np.searchsorted(grupos[ordem], np.arange(n_listas + 1)).astype(np.int64)
+    print(f"k-means ({n_listas} listas) em {time.time() - inicio:.1f}s")
+
+    metadados = {
+        "versao_indice": indice.versao,
+        "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "dimensoes": int(dimensoes),
+        "n_listas": int(n_listas),
+        "n_candidatos": int(n_linhas),
+        "tipo": tipo,
+        "variancia_explicada": float(svd.explained_variance_ratio_.sum()),
+    }
+    ann = IndiceANN(componentes, centroides, embeddings[ordem].astype(tipo),
+                    ordem.astype(np.int64), inicio_listas, metadados, matriz=matriz)
+    salvar_indice_ann(ann, diretorio_indice)
+    return ann
+
+
+def salvar_indice_ann(ann, diretorio_indice=DIRETORIO_INDICE_PADRAO):
+    """
+    Grava o ANN em ``<diretorio_indice>/ann``, trocando o anterior de forma atômica.
+    """
+    destino = os.path.join(diretorio_indice, DIRETORIO_ANN)
+    temporario = tempfile.mkdtemp(prefix=".ann-", dir=diretorio_indice)
+    try:
+        np.save(os.path.join(temporario, ARQUIVO_COMPONENTES), ann.componentes)
+        np.save(os.path.join(temporario, ARQUIVO_CENTROIDES), ann.centroides)
+        np.save(os.path.join(temporario, ARQUIVO_EMBEDDINGS), ann.embeddings)
+        np.save(os.path.join(temporario, ARQUIVO_POSICOES), ann.posicoes)
+        np.save(os.path.join(temporario, ARQUIVO_INICIO_LISTAS), ann.inicio_listas)
+        with open(os.path.join(temporario, ARQUIVO_METADADOS_ANN), 'w', encoding='utf-8') as f:
+            json.dump(ann.metadados, f, ensure_ascii=False, indent=2)
+
+        antigo = None
+        if os.path.exists(destino):
+            antigo = destino + ".antigo-" + uuid.uuid4().hex[:8]
+            os.rename(destino, antigo)
+        os.rename(temporario, destino)
+        if antigo:
+            shutil.rmtree(antigo, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    return destino
+
+
+def indice_ann_disponivel(diretorio_indice=DIRETORIO_INDICE_PADRAO, versao_indice=None):
+    """
+    Indica se há um ANN em ``diretorio_indice`` (e, se informada, para a versão do índice base).
+    """
+    caminho = os.path.join(diretorio_indice, DIRETORIO_ANN, ARQUIVO_METADADOS_ANN)
+    if not os.path.isfile(caminho):
+        return False
+    if versao_indice is None:
+        return True
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f).get("versao_indice") == versao_indice
+
+
+def carregar_indice_ann(diretorio_indice=DIRETORIO_INDICE_PADRAO, matriz=None):
+    """
+    Abre o ANN gravado por ``construir_indice_ann`` (embeddings mapeados em memória).
+
+    Args:
+        diretorio_indice (str): Diretório do índice base.
+        matriz (csr_matrix, opcional): Matriz TF-IDF do índice base, usada na reordenação exata.
+
+    Returns:
+        IndiceANN: Índice pronto para consulta.
+    """
+    diretorio = os.path.join(diretorio_indice, DIRETORIO_ANN)
+    with open(os.path.join(diretorio, ARQUIVO_METADADOS_ANN), 'r', encoding='utf-8') as f:
+        metadados = json.load(f)
+    return IndiceANN(
+        np.load(os.path.join(diretorio, ARQUIVO_COMPONENTES)),
+        np.load(os.path.join(diretorio, ARQUIVO_CENTROIDES)),
+        np.load(os.path.join(diretorio, ARQUIVO_EMBEDDINGS), mmap_mode='r'),
+        np.load(os.path.join(diretorio, ARQUIVO_POSICOES), mmap_mode='r'),
+        np.load(os.path.join(diretorio, ARQUIVO_INICIO_LISTAS)),
+        metadados,
+        matriz=matriz,
+    )
+
+
+def avaliar_recall(indice, ann, consultas, k=10, sondas=(1, 2, 4, 8, 16, 32, 64),
+                   fatores_reordenacao=(FATOR_REORDENACAO_PADRAO,)):
+    """
+    Recall@k do ANN contra o motor exato (``topk_similaridade``) e latência por consulta.
+
+    Args:
+        indice (IndiceCandidatos): Índice base.
+        ann (IndiceANN): ANN do mesmo índice.
+        consultas (csr_matrix): Vetores TF-IDF das consultas, um por linha.
+        k (int): Tamanho do top-k comparado.
+        sondas (iterable of int): Valores de ``n_sondas`` avaliados.
+        fatores_reordenacao (iterable of int): Valores de ``fator_reordenacao`` avaliados.
+
+    Returns:
+        list[dict]: Uma linha por combinação (n_sondas, fator) com recall e latências (ms).
+    """
+    exatos, tempos_exatos = [], []
+    for i in range(consultas.shape[0]):
+        inicio = time.perf_counter()
+        posicoes, _ = topk_similaridade(indice.matriz, consultas[i], k)
+        tempos_exatos.append(time.perf_counter() - inicio)
+        exatos.append(set(posicoes.tolist()))
+
+    relatorio = [{
+        "motor": "exato",
+        "n_sondas": None,
+        "fator_reordenacao": None,
+        "recall": 1.0,
+        "p50_ms": float(np.percentile(tempos_exatos, 50) * 1000),
+        "p95_ms": float(np.percentile(tempos_exatos, 95) * 1000),
+    }]
+    for fator in fatores_reordenacao:
+        for n_sondas in sondas:
+            acertos, total, tempos = 0, 0, []
+            for i, esperado in enumerate(exatos):
+                inicio = time.perf_counter()
+                posicoes, _ = ann.buscar(consultas[i], k, n_sondas=n_sondas, fator_reordenacao=fator)
+                tempos.append(time.perf_counter() - inicio)
+                acertos += len(esperado & set(posicoes.tolist()))
+                total += len(esperado)
+            relatorio.append({
+                "motor": "ann",
+                "n_sondas": int(n_sondas),
+                "fator_reordenacao": int(fator),
+                "recall": acertos / total if total else 1.0,
+                "p50_ms": float(np.percentile(tempos, 50) * 1000),
+                "p95_ms": float(np.percentile(tempos, 95) * 1000),
+            })
+    return relatorio
+
+
+def _consultas_avaliacao(indice, origem, n_consultas, semente=0):
+    if origem == "vagas":
+        from base_dados import carregar_vagas_sistema
+        from preprocessamento import preprocessar_lote
+        vagas = carregar_vagas_sistema()
+        vagas = vagas.sample(min(n_consultas, len(vagas)), random_state=semente)
+        return indice.vectorizer.transform(preprocessar_lote(vagas['descricao'])).tocsr()
+    rng = np.random.default_rng(semente)
+    return indice.matriz[np.sort(rng.choice(indice.matriz.shape[0], min(n_consultas, len(indice)), replace=False))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice ANN (LSA + IVF) dos candidatos.")
+    parser.add_argument("--indice", default=DIRETORIO_INDICE_PADRAO, help="Diretório do índice base.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    construir = subcomandos.add_parser("construir", help="Ajusta o SVD e as listas invertidas.")
+    construir.add_argument("--dimensoes", type=int, default=DIMENSOES_PADRAO)
+    construir.add_argument("--listas", type=int, default=None, help="Padrão: ~4 * sqrt(n_candidatos).")
+    construir.add_argument("--tipo", choices=["float32", "float16"], default="float32")
+    avaliar = subcomandos.add_parser("avaliar", help="Relatório de recall@k contra o motor exato.")
+    avaliar.add_argument("--k", type=int, default=10)
+    avaliar.add_argument("--sondas", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    avaliar.add_argument("--fatores-reordenacao", type=int, nargs="+", default=[1, 5, FATOR_REORDENACAO_PADRAO, 50])
+    avaliar.add_argument("--consultas", choices=["vagas", "candidatos"], default="vagas",
+                         help="Descrições de vagas.json ou currículos sorteados da base.")
+    avaliar.add_argument("--n-consultas", type=int, default=200)
+    avaliar.add_argument("--saida", default=None, help="Grava o relatório em JSON.")
+    args = parser.parse_args()
+
+    indice = carregar_indice(args.indice)
+    if args.comando == "construir":
+        ann = construir_indice_ann(indice, args.indice, args.dimensoes, args.listas, args.tipo)
+        print(f"ANN gravado em {os.path.join(args.indice, DIRETORIO_ANN)} "
+              f"({ann.metadados['n_listas']} listas, {ann.metadados['dimensoes']} dimensões)")
+        return
+
+    if not indice_ann_disponivel(args.indice, indice.versao):
+        raise SystemExit("ANN ausente ou desatualizado; rode 'python indice_ann.py construir'.")
+    ann = carregar_indice_ann(args.indice, matriz=indice.matriz)
+    consultas = _consultas_avaliacao(indice, args.consultas, args.n_consultas)
+    relatorio = avaliar_recall(indice, ann, consultas, args.k, args.sondas, args.fatores_reordenacao)
+
+    print(f"{'motor':>6} {'sondas':>7} {'fator':>6} {f'recall@{args.k}':>10} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for linha in relatorio:
+        print(f"{linha['motor']:>6} {str(linha['n_sondas'] or '-'):>7} {str(linha['fator_reordenacao'] or '-'):>6} "
+              f"{linha['recall']:>10.3f} "
+              f"{linha['p50_ms']:>9.2f} {linha['p95_ms']:>9.2f}")
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({"k": args.k, "consultas": int(consultas.shape[0]), "resultados": relatorio}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Motor de busca BM25F: cada campo do currículo é indexado separadamente.
+
+O 'curriculo' do índice TF-IDF é a junção de 16 colunas do applicants.json,
+o que apaga a fronteira entre, por exemplo, o texto livre do CV e a lista de
+conhecimentos técnicos. Aqui as colunas são agrupadas em campos
+(``CAMPOS_BM25F``); para cada campo ficam gravadas a matriz esparsa de
+frequências e o comprimento de cada documento, e para a base o IDF de cada
+termo. O score de um candidato é
+
+    tf~(t) = soma_f peso_f * tf_f(t) / (1 - b_f + b_f * comprimento_f / comprimento_medio_f)
+    score  = soma_t qtf(t) * idf(t) * tf~(t) / (k1 + tf~(t))
+
+Pesos, ``b`` e ``k1`` são configuráveis sem reconstruir nada. Para cada
+combinação de pesos e ``k1`` a matriz saturada tf~ / (k1 + tf~) é montada uma
+vez; a partir dela o score é um produto esparso pelo vetor qtf * idf da vaga,
+percorrido em blocos por ``topk_similaridade`` exatamente como o cosseno do
+índice TF-IDF, com o mesmo custo por consulta.
+
+Os arquivos ficam em ``<índice>/bm25f``, alinhados linha a linha com o índice
+base (e ligados à versão dele), usando o mesmo vocabulário.
+
+    python indice_bm25f.py construir --candidatos dataset/applicants.json
+    python indice_bm25f.py medir --n-consultas 200
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from base_dados import CAMPOS_CATEGORICOS_CANDIDATO, concatenar_colunas
+from busca_topk import topk_similaridade
+from indice_candidatos import DIRETORIO_INDICE_PADRAO, PARAMETROS_VETORIZADOR, carregar_indice, compactar_matriz
+from importacao_tardia import modulo_tardio
+from preprocessamento import preprocessar_lote
+
+# O scikit-learn só é importado ao criar o contador de termos.
+texto_sklearn = modulo_tardio("sklearn.feature_extraction.text")
+
+
+DIRETORIO_BM25F = "bm25f"
+
+ARQUIVO_METADADOS_BM25F = "metadados.json"
+ARQUIVO_IDF_BM25F = "idf.npy"
+ARQUIVO_COMPRIMENTOS = "comprimentos.npy"
+
+# Campos do BM25F: grupos das colunas que formam o 'curriculo' (base_dados.COLUNAS_IMPORTANTES).
+CAMPOS_BM25F = {
+    "cv": ["cv_pt", "cv_en"],
+    "conhecimentos": ["informacoes_profissionais_titulo_profissional",
+                      "informacoes_profissionais_area_atuacao",
+                      "informacoes_profissionais_conhecimentos_tecnicos"],
+    "certificacoes": ["informacoes_profissionais_certificacoes",
+                      "informacoes_profissionais_outras_certificacoes"],
+    "experiencia": ["informacoes_profissionais_nivel_profissional",
+                    "informacoes_profissionais_qualificacoes",
+                    "informacoes_profissionais_experiencias"],
+    "formacao": ["formacao_e_idiomas_nivel_academico", "formacao_e_idiomas_nivel_ingles",
+                 "formacao_e_idiomas_nivel_espanhol", "formacao_e_idiomas_outro_idioma",
+                 "formacao_e_idiomas_cursos", "formacao_e_idiomas_outro_curso"],
+}
+# Campo único usado quando a base só tem o 'curriculo' já consolidado (ex.: planilha externa).
+CAMPO_CURRICULO = "curriculo"
+
+PESOS_CAMPOS_PADRAO = {"cv": 1.0, "conhecimentos": 3.0, "certificacoes": 2.0, "experiencia": 1.5,
+                       "formacao": 1.0, CAMPO_CURRICULO: 1.0}
+B_PADRAO = 0.75
+K1_PADRAO = 1.2
+
+
+def textos_por_campo(df_candidatos, campos=CAMPOS_BM25F):
+    """
+    Texto de cada campo do BM25F (colunas do grupo unidas por espaço).
+
+    Colunas ausentes são ignoradas; sem nenhuma delas, usa a coluna 'curriculo'
+    como campo único.
+
+    Returns:
+        dict: Nome do campo -> lista de textos (um por linha de ``df_candidatos``).
+    """
+    textos = {}
+    for nome, colunas in campos.items():
+        # Os campos categóricos chegam renomeados por carregar_candidatos_internos.
+        colunas = [CAMPOS_CATEGORICOS_CANDIDATO.get(coluna, coluna) if coluna not in df_candidatos.columns else coluna
+                   for coluna in colunas]
+        presentes = [coluna for coluna in colunas if coluna in df_candidatos.columns]
+        if presentes:
+            textos[nome] = concatenar_colunas(df_candidatos, presentes).tolist()
+    if not textos:
+        textos[CAMPO_CURRICULO] = df_candidatos['curriculo'].fillna('').astype(str).tolist()
+    return textos
+
+
+def criar_contador(vocabulario):
+    """
+    Contador de termos com o vocabulário e os n-gramas do índice TF-IDF.
+    """
+    return texto_sklearn.CountVectorizer(
+        ngram_range=PARAMETROS_VETORIZADOR["ngram_range"],
+        lowercase=False,
+        vocabulary=vocabulario,
+        dtype=np.float32
+    )
+
+
+def idf_bm25(frequencias, n_documentos):
+    """
+    IDF do BM25 (sempre positivo): log(1 + (N - df + 0.5) / (df + 0.5)), com
+    ``df`` contado em qualquer campo.
+    """
+    presenca = None
+    for matriz in frequencias.values():
+        campo = matriz.astype(bool)
+        presenca = campo if presenca is None else presenca + campo
+    df = np.diff(presenca.tocsc().indptr)
+    return np.log1p((n_documentos - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+
+class IndiceBM25F:
+    """
+    Frequências por campo, comprimentos e IDF de um índice de candidatos.
+
+    Args:
+        contador (CountVectorizer): Vetorizador de contagens (vocabulário do índice base).
+        frequencias (dict): Campo -> csr_matrix (n_candidatos, n_termos) de frequências.
+        comprimentos (np.ndarray): Comprimento (em termos) de cada candidato em cada campo.
+        idf (np.ndarray): IDF BM25 de cada termo.
+        metadados (dict): Metadados gravados (campos, versão do índice base...).
+        b (float ou dict, opcional): Normalização por comprimento, global ou por campo.
+    """
+
+    def __init__(self, contador, frequencias, comprimentos, idf, metadados, b=B_PADRAO):
+        self.contador = contador
+        self.campos = list(frequencias)
+        self.frequencias = frequencias
+        self.comprimentos = comprimentos
+        self.idf = idf
+        self.metadados = metadados
+        self._divisores = self._divisores_comprimento(b)
+        self._saturadas = {}
+
+    @property
+    def versao(self):
+        return self.metadados.get("versao_indice")
+
+    def __len__(self):
+        return self.comprimentos.shape[0]
+
+    def _divisores_comprimento(self, b):
+        # 1 - b_f + b_f * comprimento / médio, para cada candidato em cada campo.
+        divisores = {}
+        for i, campo in enumerate(self.campos):
+            b_campo = b.get(campo, B_PADRAO) if isinstance(b, dict) else b
+            comprimentos = self.comprimentos[:, i].astype(np.float32)
+            medio = comprimentos.mean() if comprimentos.shape[0] else 0.0
+            medio = medio if medio > 0 else 1.0
+            divisores[campo] = (1 - b_campo) + b_campo * comprimentos / medio
+        return divisores
+
+    def saturada(self, pesos=None, k1=K1_PADRAO):
+        """
+        Matriz tf~ / (k1 + tf~), com tf~ = soma_f peso_f * tf_f / divisor_f.
+
+        Montada uma vez para cada combinação de pesos e ``k1``; depois dela uma
+        consulta é um único produto esparso.
+        """
+        pesos = dict(PESOS_CAMPOS_PADRAO, **(pesos or {}))
+        chave = tuple(float(pesos.get(campo, 1.0)) for campo in self.campos) + (float(k1),)
+        if chave not in self._saturadas:
+            combinada = None
+            for campo, peso in zip(self.campos, chave):
+                matriz = self.frequencias[campo]
+                linhas = np.repeat(np.arange(matriz.shape[0]), np.diff(matriz.indptr))
+                valores = matriz.data * (np.float32(peso) / self._divisores[campo][linhas])
+                parcela = sparse.csr_matrix((valores.astype(np.float32), matriz.indices, matriz.indptr),
+                                            shape=matriz.shape)
+                combinada = parcela if combinada is None else combinada + parcela
+            combinada.data = combinada.data / (np.float32(k1) + combinada.data)
+            self._saturadas[chave] = compactar_matriz(combinada)
+        return self._saturadas[chave]
+
+    def vetor_consulta(self, consulta):
+        """
+        Vetor denso qtf * idf dos termos da vaga.
+        """
+        consulta = sparse.csr_matrix(consulta)
+        vetor = np.zeros(self.idf.shape[0], dtype=np.float32)
+        vetor[consulta.indices] = consulta.data * self.idf[consulta.indices]
+        return vetor
+
+    def transformar(self, textos_preprocessados):
+        """
+        Contagens dos termos de textos já pré-processados (consultas).
+        """
+        return self.contador.transform(textos_preprocessados)
+
+    def pontuar(self, consulta, pesos=None, k1=K1_PADRAO):
+        """
+        Score BM25F de todos os candidatos para uma consulta.
+
+        Args:
+            consulta (csr_matrix): Contagens dos termos da vaga (``transformar``).
+            pesos (dict, opcional): Peso de cada campo (padrão: ``PESOS_CAMPOS_PADRAO``).
+            k1 (float): Saturação da frequência.
+
+        Returns:
+            np.ndarray: Score de cada candidato (float32).
+        """
+        return self.saturada(pesos, k1) @ self.vetor_consulta(consulta)
+
+    def buscar(self, consulta, k, pesos=None, k1=K1_PADRAO, mascara_excluidos=None):
+        """
+        Top-k por score BM25F.
+
+        Returns:
+            tuple: (posições, scores) ordenados do maior para o menor score.
+        """
+        return topk_similaridade(self.saturada(pesos, k1), self.vetor_consulta(consulta), k,
+                                 mascara_excluidos=mascara_excluidos)
+
+
+def construir_indice_bm25f(df_candidatos, indice, diretorio_indice=DIRETORIO_INDICE_PADRAO,
+                           campos=CAMPOS_BM25F, n_processos=None):
+    """
+    Conta os termos de cada campo dos candidatos do índice base e grava o BM25F.
+
+    Args:
+        df_candidatos (DataFrame): Base com 'id_candidato' e as colunas dos campos
+            (ou só 'curriculo'); as linhas são alinhadas ao índice pelo id.
+        indice (IndiceCandidatos): Índice base já construído.
+        diretorio_indice (str): Diretório do índice base.
+        campos (dict): Campo -> colunas de ``df_candidatos``.
+        n_processos (int, opcional): Processos usados no pré-processamento.
+
+    Returns:
+        IndiceBM25F: O índice construído.
+    """
+    # Mesma ordem de linhas do índice base (que pode ter sido deduplicado).
+    posicoes = pd.Index(df_candidatos['id_candidato']).get_indexer(indice.candidatos['id_candidato'])
+    alinhado = df_candidatos.iloc[np.maximum(posicoes, 0)].reset_index(drop=True)
+    textos = textos_por_campo(alinhado, campos)
+    ausentes = posicoes < 0
+    n_linhas = len(indice)
+
+    # Todos os campos passam por um único pool de pré-processamento.
+    processados = preprocessar_lote([texto for lista in textos.values() for texto in lista],
+                                    n_processos=n_processos)
+    contador = criar_contador(indice.vectorizer.vocabulary_)
+    frequencias = {}
+    comprimentos = np.zeros((n_linhas, len(textos)), dtype=np.int32)
+    for i, campo in enumerate(textos):
+        matriz = contador.transform(processados[i * n_linhas:(i + 1) * n_linhas]).tocsr()
+        if ausentes.any():
+            # Candidatos do índice sem linha em ``df_candidatos`` ficam sem termos.
+            matriz = sparse.csr_matrix(sparse.diags((~ausentes).astype(np.float32)) @ matriz)
+            matriz.eliminate_zeros()
+        frequencias[campo] = matriz
+        comprimentos[:, i] = np.asarray(matriz.sum(axis=1)).ravel()
+
+    idf = idf_bm25(frequencias, n_linhas)
+    metadados = {
+        "versao_indice": indice.versao,
+        "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "campos": {campo: campos.get(campo, [CAMPO_CURRICULO]) for campo in frequencias},
+        "n_candidatos": n_linhas,
+        "n_termos": int(idf.shape[0]),
+        "candidatos_sem_campos": int(ausentes.sum()),
+    }
+    bm25f = IndiceBM25F(contador, frequencias, comprimentos, idf, metadados)
+    salvar_indice_bm25f(bm25f, diretorio_indice)
+    return bm25f
+
+
+def salvar_indice_bm25f(bm25f, diretorio_indice=DIRETORIO_INDICE_PADRAO):
+    """
+    Grava o BM25F em ``<diretorio_indice>/bm25f``, trocando o anterior de forma atômica.
+    """
+    destino = os.path.join(diretorio_indice, DIRETORIO_BM25F)
+    temporario = tempfile.mkdtemp(prefix=".bm25f-", dir=diretorio_indice)
+    try:
+        for campo, matriz in bm25f.frequencias.items():
+            matriz = compactar_matriz(matriz)
+            np.save(os.path.join(temporario, f"{campo}_dados.npy"), matriz.data)
+            np.save(os.path.join(temporario, f"{campo}_indices.npy"), matriz.indices)
+            np.save(os.path.join(temporario, f"{campo}_indptr.npy"), matriz.indptr)
+        np.save(os.path.join(temporario, ARQUIVO_COMPRIMENTOS), bm25f.comprimentos)
+        np.save(os.path.join(temporario, ARQUIVO_IDF_BM25F), bm25f.idf)
+        with open(os.path.join(temporario, ARQUIVO_METADADOS_BM25F), 'w', encoding='utf-8') as f:
+            json.dump(bm25f.metadados, f, ensure_ascii=False, indent=2)
+
+        antigo = None
+        if os.path.exists(destino):
+            antigo = destino + ".antigo-" + uuid.uuid4().hex[:8]
+            os.rename(destino, antigo)
+        os.rename(temporario, destino)
+        if antigo:
+            shutil.rmtree(antigo, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    return destino
+
+
+def indice_bm25f_disponivel(diretorio_indice=DIRETORIO_INDICE_PADRAO, versao_indice=None):
+    """
+    Indica se há um BM25F em ``diretorio_indice`` (e, se informada, para a versão do índice base).
+    """
+    caminho = os.path.join(diretorio_indice, DIRETORIO_BM25F, ARQUIVO_METADADOS_BM25F)
+    if not os.path.isfile(caminho):
+        return False
+    if versao_indice is None:
+        return True
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f).get("versao_indice") == versao_indice
+
+
+def carregar_indice_bm25f(diretorio_indice=DIRETORIO_INDICE_PADRAO, vocabulario=None, b=B_PADRAO):
+    """
+    Abre o BM25F gravado por ``construir_indice_bm25f``.
+
+    Args:
+        diretorio_indice (str): Diretório do índice base.
+        vocabulario (dict, opcional): ``vocabulary_`` do índice base (lido do
+            disco quando não informado).
+        b (float ou dict): Normalização por comprimento, global ou por campo.
+
+    Returns:
+        IndiceBM25F: Índice pronto para consulta.
+    """
+    diretorio = os.path.join(diretorio_indice, DIRETORIO_BM25F)
+    with open(os.path.join(diretorio, ARQUIVO_METADADOS_BM25F), 'r', encoding='utf-8') as f:
+        metadados = json.load(f)
+    if vocabulario is None:
+        vocabulario = carregar_indice(diretorio_indice).vectorizer.vocabulary_
+    forma = (metadados["n_candidatos"], metadados["n_termos"])
+    frequencias = {
+        campo: sparse.csr_matrix(
+            (np.load(os.path.join(diretorio, f"{campo}_dados.npy"), mmap_mode='r'),
+             np.load(os.path.join(diretorio, f"{campo}_indices.npy"), mmap_mode='r'),
+             np.load(os.path.join(diretorio, f"{campo}_indptr.npy"))),
+            shape=forma, copy=False
+        )
+        for campo in metadados["campos"]
+    }
+    return IndiceBM25F(
+        criar_contador(vocabulario),
+        frequencias,
+        np.load(os.path.join(diretorio, ARQUIVO_COMPRIMENTOS)),
+        np.load(os.path.join(diretorio, ARQUIVO_IDF_BM25F)),
+        metadados,
+        b=b,
+    )
+
+
+def medir_latencia(indice, bm25f, textos_preprocessados, k=10):
+    """
+    Latência por consulta (p50/p95, em ms) do cosseno TF-IDF e do BM25F,
+    ambos incluindo a vetorização da vaga.
+    """
+    motores = {
+        "tfidf": lambda texto: topk_similaridade(indice.matriz, indice.transformar([texto]), k),
+        "bm25f": lambda texto: bm25f.buscar(bm25f.transformar([texto]), k),
+    }
+    relatorio = {}
+    for nome, buscar in motores.items():
+        buscar(textos_preprocessados[0])
+        tempos = []
+        for texto in textos_preprocessados:
+            inicio = time.perf_counter()
+            buscar(texto)
+            tempos.append(time.perf_counter() - inicio)
+        relatorio[nome] = {f"p{p}_ms": float(np.percentile(tempos, p) * 1000) for p in (50, 95)}
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice BM25F (campos do currículo) dos candidatos.")
+    parser.add_argument("--indice", default=DIRETORIO_INDICE_PADRAO, help="Diretório do índice base.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    construir = subcomandos.add_parser("construir", help="Conta os termos de cada campo e grava o BM25F.")
+    construir.add_argument("--candidatos", default=None, help="Padrão: dataset/applicants.json.")
+    construir.add_argument("--processos", type=int, default=None)
+    medir = subcomandos.add_parser("medir", help="Latência do BM25F contra o cosseno TF-IDF.")
+    medir.add_argument("--k", type=int, default=10)
+    medir.add_argument("--n-consultas", type=int, default=200)
+    args = parser.parse_args()
+
+    from preprocessamento import garantir_recursos_nltk
+    garantir_recursos_nltk()
+    indice = carregar_indice(args.indice)
+    if args.comando == "construir":
+        from base_dados import CAMINHO_APPLICANTS, carregar_candidatos_internos
+        df_candidatos = carregar_candidatos_internos(args.candidatos or CAMINHO_APPLICANTS, manter_campos=True)
+        inicio = time.time()
+        bm25f = construir_indice_bm25f(df_candidatos, indice, args.indice, n_processos=args.processos)
+        print(f"BM25F gravado em {os.path.join(args.indice, DIRETORIO_BM25F)} em {time.time() - inicio:.1f}s "
+              f"({len(bm25f.campos)} campos: {', '.join(bm25f.campos)})")
+        return
+
+    if not indice_bm25f_disponivel(args.indice, indice.versao):
+        raise SystemExit("BM25F ausente ou desatualizado; rode 'python indice_bm25f.py construir'.")
+    bm25f = carregar_indice_bm25f(args.indice, indice.vectorizer.vocabulary_)
+    from base_dados import carregar_vagas_sistema
+    vagas = carregar_vagas_sistema()['descricao'].head(args.n_consultas)
+    relatorio = medir_latencia(indice, bm25f, preprocessar_lote(vagas), args.k)
+    for nome, medidas in relatorio.items():
+        print(f"{nome:>6}: p50 {medidas['p50_ms']:.2f} ms, p95 {medidas['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""
+Índice TF-IDF da base de candidatos construído offline e persistido em disco.
+
+O vetorizador é ajustado uma única vez (``construir_indice``) e salvo como
+vocabulário + IDF, junto com a matriz CSR dos currículos. Em tempo de consulta
+o índice é aberto com ``carregar_indice`` (arrays mapeados em memória), de modo
+que uma recomendação só precisa transformar a descrição da vaga e executar um
+produto esparso.
+
+A matriz é guardada em formato compacto (valores float32, índices int32) e o
+texto dos currículos sai do DataFrame de candidatos depois de vetorizado: fica
+em um buffer UTF-8 à parte (``TextosCurriculos``), do qual só os currículos dos
+resultados são decodificados.
+
+Com ``limiar_duplicatas`` os currículos quase idênticos (deduplicacao.py) são
+indexados uma única vez; ``duplicatas.json`` guarda, para cada representante,
+todos os ``id_candidato`` do seu grupo, e ``candidatos_duplicados.pkl`` os
+dados dos demais membros. Nos resultados, a linha de um grupo traz os outros
+ids na coluna 'ids_duplicados'; se o representante for excluído, o primeiro
+membro ainda vivo passa a representá-lo.
+
+Uso pela linha de comando:
+
+    python indice_candidatos.py --saida indice_candidatos
+    python indice_candidatos.py --candidatos planilha.xlsx --saida indice_externo
+    python indice_candidatos.py --limiar-duplicatas 0   # sem deduplicação
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from explicacoes import vocabulario_por_coluna
+from deduplicacao import LIMIAR_DUPLICATAS_PADRAO, deduplicar, grupos_por_representante
+from importacao_tardia import modulo_tardio
+from preprocessamento import preprocessar_lote, garantir_recursos_nltk
+
+# O scikit-learn só é importado ao criar um vetorizador.
+texto_sklearn = modulo_tardio("sklearn.feature_extraction.text")
+
+
+DIRETORIO_INDICE_PADRAO = "indice_candidatos"
+
+ARQUIVO_METADADOS = "metadados.json"
+ARQUIVO_VOCABULARIO = "vocabulario.json"
+ARQUIVO_IDF = "idf.npy"
+ARQUIVO_DADOS = "matriz_dados.npy"
+ARQUIVO_INDICES = "matriz_indices.npy"
+ARQUIVO_INDPTR = "matriz_indptr.npy"
+ARQUIVO_CANDIDATOS = "candidatos.pkl"
+ARQUIVO_CURRICULOS = "curriculos.bin"
+ARQUIVO_CURRICULOS_POSICOES = "curriculos_posicoes.npy"
+ARQUIVO_DUPLICATAS = "duplicatas.json"
+ARQUIVO_CANDIDATOS_DUPLICADOS = "candidatos_duplicados.pkl"
+
+# Precisão de sobra para ordenar por cosseno: float32 reduz a matriz à metade.
+TIPO_VALORES = np.float32
+
+PARAMETROS_VETORIZADOR = {
+    "max_features": 5000,
+    "ngram_range": (1, 2),
+}
+
+
+def criar_vetorizador(vocabulario=None, idf=None):
+    """
+    Cria o TfidfVectorizer usado pelo sistema de recomendação.
+
+    Args:
+        vocabulario (dict, opcional): Vocabulário fixo (termo -> coluna) de um índice salvo.
+        idf (np.ndarray, opcional): Pesos IDF correspondentes ao vocabulário.
+
+    Returns:
+        TfidfVectorizer: Vetorizador novo (para ajuste) ou já pronto para ``transform``.
+    """
+    # Os textos chegam já pré-processados (preprocessar_lote/preprocessar_texto),
+    # então o vetorizador não aplica nenhum pré-processamento próprio.
+    vectorizer = texto_sklearn.TfidfVectorizer(
+        max_features=PARAMETROS_VETORIZADOR["max_features"],
+        ngram_range=PARAMETROS_VETORIZADOR["ngram_range"],
+        lowercase=False,
+        vocabulary=vocabulario,
+        dtype=TIPO_VALORES
+    )
+    if idf is not None:
+        vectorizer.idf_ = np.asarray(idf, dtype=np.float64)
+    return vectorizer
+
+
+def compactar_matriz(matriz):
+    """
+    Converte a matriz TF-IDF para valores ``TIPO_VALORES`` e índices int32
+    (int64 só quando o nnz não cabe em int32), sem copiar o que já está no formato.
+    """
+    matriz = matriz.tocsr()
+    tipo_indices = np.int32 if matriz.nnz < np.iinfo(np.int32).max else np.int64
+    return sparse.csr_matrix(
+        (matriz.data.astype(TIPO_VALORES, copy=False),
+         matriz.indices.astype(tipo_indices, copy=False),
+         matriz.indptr.astype(tipo_indices, copy=False)),
+        shape=matriz.shape,
+        copy=False
+    )
+
+
+class TextosCurriculos:
+    """
+    Currículos codificados em UTF-8 e concatenados em um único buffer, com a
+    posição inicial de cada um. Ocupa cerca de 1 byte por caractere (um ``str``
+    do pandas custa dezenas de bytes de cabeçalho e até 4 bytes por caractere)
+    e, aberto de um índice salvo, fica mapeado em memória.
+    """
+
+    def __init__(self, buffer, posicoes):
+        self.buffer = buffer
+        self.posicoes = posicoes
+
+    @classmethod
+    def de_textos(cls, textos):
+        codificados = [str(texto).encode('utf-8') for texto in textos]
+        posicoes = np.zeros(len(codificados) + 1, dtype=np.int64)
+        np.cumsum([len(texto) for texto in codificados], out=posicoes[1:])
+        return cls(np.frombuffer(b''.join(codificados), dtype=np.uint8), posicoes)
+
+    def __len__(self):
+        return self.posicoes.shape[0] - 1
+
+    def __getitem__(self, linhas):
+        """
+        Decodifica os currículos das ``linhas`` informadas (lista de str).
+        """
+        return [bytes(self.buffer[self.posicoes[i]:self.posicoes[i + 1]]).decode('utf-8')
+                for i in np.asarray(linhas, dtype=np.int64).reshape(-1)]
+
+    def salvar(self, diretorio):
+        # O buffer vai cru (sem cabeçalho .npy) para poder ser mapeado mesmo vazio.
+        with open(os.path.join(diretorio, ARQUIVO_CURRICULOS), 'wb') as f:
+            f.write(self.buffer.tobytes())
+        np.save(os.path.join(diretorio, ARQUIVO_CURRICULOS_POSICOES), self.posicoes)
+
+    @classmethod
+    def carregar(cls, diretorio, mmap=True):
+        """
+        Abre os currículos salvos em ``diretorio`` (None para índices gravados
+        antes da separação, que guardam o texto no DataFrame de candidatos).
+        """
+        caminho = os.path.join(diretorio, ARQUIVO_CURRICULOS)
+        if not os.path.exists(caminho):
+            return None
+        posicoes = np.load(os.path.join(diretorio, ARQUIVO_CURRICULOS_POSICOES))
+        if mmap and posicoes[-1] > 0:
+            buffer = np.memmap(caminho, dtype=np.uint8, mode='r')
+        else:
+            buffer = np.fromfile(caminho, dtype=np.uint8)
+        return cls(buffer, posicoes)
+
+
+def separar_curriculos(df_candidatos):
+    """
+    Retira a coluna 'curriculo' do DataFrame e a guarda em ``TextosCurriculos``.
+
+    Returns:
+        tuple: (DataFrame sem a coluna 'curriculo', TextosCurriculos).
+    """
+    curriculos = TextosCurriculos.de_textos(df_candidatos['curriculo'])
+    return df_candidatos.drop(columns=['curriculo']).reset_index(drop=True), curriculos
+
+
+def linhas_candidatos(candidatos, curriculos, posicoes):
+    """
+    Cópia das linhas ``posicoes`` dos candidatos com a coluna 'curriculo'
+    reconstituída (quando o texto está guardado à parte).
+    """
+    linhas = candidatos.iloc[posicoes].copy()
+    if curriculos is not None:
+        linhas['curriculo'] = curriculos[posicoes]
+    return linhas
+
+
+class IndiceCandidatos:
+    """
+    Vetorizador ajustado, matriz TF-IDF dos currículos e dados dos candidatos
+    alinhados linha a linha com a matriz.
+
+    ``candidatos`` não traz a coluna 'curriculo': o texto fica em ``curriculos``
+    e volta só nas linhas pedidas a ``linhas``.
+
+    ``duplicatas`` (índices deduplicados) lista os grupos de currículos quase
+    idênticos; só o primeiro id de cada grupo está na matriz. Os dados dos
+    demais membros (sem o currículo) ficam em ``candidatos_duplicados``.
+    """
+
+    def __init__(self, vectorizer, matriz, candidatos, metadados, curriculos=None, duplicatas=None,
+                 candidatos_duplicados=None):
+        self.vectorizer = vectorizer
+        self.matriz = matriz
+        self.candidatos = candidatos
+        self.metadados = metadados
+        self.curriculos = curriculos
+        self.duplicatas = duplicatas or []
+        self.candidatos_duplicados = candidatos_duplicados
+        self._termos = None
+        self._grupos = None
+
+    @property
+    def versao(self):
+        return self.metadados.get("versao")
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    def transformar(self, textos_preprocessados):
+        """
+        Vetoriza textos já pré-processados no espaço do índice.
+        """
+        return self.vectorizer.transform(textos_preprocessados)
+
+    def linhas(self, posicoes, exclusoes=frozenset()):
+        """
+        Candidatos nas ``posicoes`` da matriz, com a coluna 'curriculo' (e, em
+        índices deduplicados, com os grupos resolvidos por ``resolver_grupos``).
+        """
+        return self.resolver_grupos(linhas_candidatos(self.candidatos, self.curriculos, posicoes), exclusoes)
+
+    @property
+    def termos(self):
+        """
+        Termo de cada coluna da matriz (calculado no primeiro uso).
+        """
+        if self._termos is None:
+            self._termos = vocabulario_por_coluna(self.vectorizer)
+        return self._termos
+
+    def ids_agrupados(self, id_candidato):
+        """
+        Todos os ``id_candidato`` representados por ``id_candidato`` (ele
+        mesmo primeiro); só ele quando não tem duplicatas.
+        """
+        if self._grupos is None:
+            self._grupos = {grupo[0]: grupo for grupo in self.duplicatas}
+        return self._grupos.get(id_candidato, [id_candidato])
+
+    @property
+    def ids_em_grupos(self):
+        """
+        Todos os ids que pertencem a algum grupo de duplicatas.
+        """
+        return frozenset(membro for grupo in self.duplicatas for membro in grupo)
+
+    def exclusoes_efetivas(self, exclusoes):
+        """
+        Ids das linhas da matriz a descartar dadas as lápides ``exclusoes``: a
+        linha de um grupo só sai quando todos os membros dele foram excluídos.
+        """
+        if not self.duplicatas or not exclusoes:
+            return exclusoes
+        return frozenset(i for i in exclusoes
+                         if all(membro in exclusoes for membro in self.ids_agrupados(i)))
+
+    def resolver_grupos(self, linhas, exclusoes=frozenset()):
+        """
+        Resolve as linhas de grupos de duplicatas: 'ids_duplicados' recebe os
+        demais membros vivos e, se o representante foi excluído, os dados da
+        linha passam a ser os do primeiro membro vivo (o currículo, quase
+        idêntico, continua o do representante).
+
+        Args:
+            linhas (DataFrame): Linhas devolvidas por ``linhas_candidatos``.
+            exclusoes (set): Ids com lápide.
+
+        Returns:
+            DataFrame: As mesmas linhas, com a coluna 'ids_duplicados' (só em índices deduplicados).
+        """
+        if not self.duplicatas:
+            return linhas
+        duplicados = []
+        for rotulo, id_candidato in zip(linhas.index, linhas['id_candidato'].tolist()):
+            vivos = [membro for membro in self.ids_agrupados(id_candidato) if membro not in exclusoes]
+            if vivos and vivos[0] != id_candidato and self.candidatos_duplicados is not None:
+                membro = self.candidatos_duplicados.loc[vivos[0]]
+                for coluna, valor in membro.items():
+                    if coluna in linhas.columns:
+                        linhas.at[rotulo, coluna] = valor
+                linhas.at[rotulo, 'id_candidato'] = vivos[0]
+            duplicados.append(vivos[1:])
+        linhas['ids_duplicados'] = duplicados
+        return linhas
+
+
+def ajustar_indice(df_candidatos, n_processos=None, limiar_duplicatas=None):
+    """
+    Ajusta o vetorizador sobre a coluna 'curriculo' e monta o índice em memória.
+
+    Args:
+        df_candidatos (DataFrame): Base de candidatos com a coluna 'curriculo'.
+        n_processos (int, opcional): Processos usados no pré-processamento dos currículos.
+        limiar_duplicatas (float, opcional): Se informado, currículos com
+            similaridade de Jaccard estimada acima dele são indexados uma só vez.
+
+    Returns:
+        IndiceCandidatos: Índice pronto para consulta (ainda não persistido).
+    """
+    vectorizer = criar_vetorizador()
+    textos_cv = preprocessar_lote(df_candidatos['curriculo'], n_processos=n_processos)
+    duplicatas, deduplicacao, candidatos_duplicados = [], None, None
+    if limiar_duplicatas:
+        representantes, grupo = deduplicar(textos_cv, limiar=limiar_duplicatas)
+        duplicatas = grupos_por_representante(df_candidatos['id_candidato'], representantes, grupo)
+        deduplicacao = {
+            "limiar": limiar_duplicatas,
+            "n_candidatos_originais": len(df_candidatos),
+            "n_grupos_duplicatas": len(duplicatas),
+        }
+        membros = np.ones(len(df_candidatos), dtype=bool)
+        membros[representantes] = False
+        # Dados dos membros não representantes, para resolver um grupo cujo representante foi excluído.
+        candidatos_duplicados = (df_candidatos[membros].drop(columns=['curriculo'], errors='ignore')
+                                 .set_index('id_candidato', drop=False))
+        df_candidatos = df_candidatos.iloc[representantes]
+        textos_cv = [textos_cv[i] for i in representantes]
+    matriz = compactar_matriz(vectorizer.fit_transform(textos_cv))
+    candidatos, curriculos = separar_curriculos(df_candidatos)
+    metadados = {
+        "versao": uuid.uuid4().hex,
+        "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "n_candidatos": int(matriz.shape[0]),
+        "n_termos": int(matriz.shape[1]),
+        "nnz": int(matriz.nnz),
+        "parametros": {
+            "max_features": PARAMETROS_VETORIZADOR["max_features"],
+            "ngram_range": list(PARAMETROS_VETORIZADOR["ngram_range"]),
+        },
+    }
+    if deduplicacao:
+        metadados["deduplicacao"] = deduplicacao
+    return IndiceCandidatos(vectorizer, matriz, candidatos, metadados, curriculos, duplicatas, candidatos_duplicados)
+
+
+def salvar_indice(indice, diretorio=DIRETORIO_INDICE_PADRAO):
+    """
+    Persiste o índice em ``diretorio``.
+
+    Os arquivos são gravados em um diretório temporário e movidos no final, de
+    modo que um leitor nunca encontra um índice pela metade.
+    """
+    diretorio = os.path.abspath(diretorio)
+    pai = os.path.dirname(diretorio)
+    os.makedirs(pai, exist_ok=True)
+    temporario = tempfile.mkdtemp(prefix=".indice-", dir=pai)
+    try:
+        vocabulario = {termo: int(coluna) for termo, coluna in indice.vectorizer.vocabulary_.items()}
+        with open(os.path.join(temporario, ARQUIVO_VOCABULARIO), 'w', encoding='utf-8') as f:
+            json.dump(vocabulario, f, ensure_ascii=False)
+        np.save(os.path.join(temporario, ARQUIVO_IDF), indice.vectorizer.idf_)
+
+        matriz = compactar_matriz(indice.matriz)
+        np.save(os.path.join(temporario, ARQUIVO_DADOS), matriz.data)
+        np.save(os.path.join(temporario, ARQUIVO_INDICES), matriz.indices)
+        np.save(os.path.join(temporario, ARQUIVO_INDPTR), matriz.indptr)
+
+        indice.candidatos.to_pickle(os.path.join(temporario, ARQUIVO_CANDIDATOS))
+        if indice.curriculos is not None:
+            indice.curriculos.salvar(temporario)
+        if indice.duplicatas:
+            with open(os.path.join(temporario, ARQUIVO_DUPLICATAS), 'w', encoding='utf-8') as f:
+                json.dump(indice.duplicatas, f, ensure_ascii=False)
+        if indice.candidatos_duplicados is not None:
+            indice.candidatos_duplicados.to_pickle(os.path.join(temporario, ARQUIVO_CANDIDATOS_DUPLICADOS))
+
+        metadados = dict(indice.metadados, tipo_valores=str(matriz.dtype))
+        with open(os.path.join(temporario, ARQUIVO_METADADOS), 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, ensure_ascii=False, indent=2)
+
+        antigo = None
+        if os.path.exists(diretorio):
+            antigo = diretorio + ".antigo-" + uuid.uuid4().hex[:8]
+            os.rename(diretorio, antigo)
+        os.rename(temporario, diretorio)
+        if antigo:
+            shutil.rmtree(antigo, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+    return diretorio
+
+
+def construir_indice(df_candidatos, diretorio=DIRETORIO_INDICE_PADRAO, n_processos=None, limiar_duplicatas=None):
+    """
+    Ajusta e persiste o índice TF-IDF da base de candidatos.
+
+    Args:
+        df_candidatos (DataFrame): Base de candidatos com a coluna 'curriculo'.
+        diretorio (str): Diretório de destino do índice.
+        n_processos (int, opcional): Processos usados no pré-processamento dos currículos.
+        limiar_duplicatas (float, opcional): Limiar da deduplicação (None = sem deduplicação).
+
+    Returns:
+        IndiceCandidatos: O índice construído.
+    """
+    indice = ajustar_indice(df_candidatos, n_processos=n_processos, limiar_duplicatas=limiar_duplicatas)
+    salvar_indice(indice, diretorio)
+    return indice
+
+
+def indice_disponivel(diretorio=DIRETORIO_INDICE_PADRAO):
+    return os.path.isfile(os.path.join(diretorio, ARQUIVO_METADADOS))
+
+
+def carregar_matriz(diretorio=DIRETORIO_INDICE_PADRAO, mmap=True):
+    """
+    Abre só os metadados e a matriz CSR de um índice salvo, sem vocabulário nem candidatos.
+
+    Returns:
+        tuple: (dict de metadados, csr_matrix).
+    """
+    with open(os.path.join(diretorio, ARQUIVO_METADADOS), 'r', encoding='utf-8') as f:
+        metadados = json.load(f)
+    modo = 'r' if mmap else None
+    dados = np.load(os.path.join(diretorio, ARQUIVO_DADOS), mmap_mode=modo)
+    indices = np.load(os.path.join(diretorio, ARQUIVO_INDICES), mmap_mode=modo)
+    indptr = np.load(os.path.join(diretorio, ARQUIVO_INDPTR), mmap_mode=modo)
+    matriz = sparse.csr_matrix(
+        (dados, indices, indptr),
+        shape=(metadados["n_candidatos"], metadados["n_termos"]),
+        copy=False
+    )
+    return metadados, matriz
+
+
+def carregar_indice(diretorio=DIRETORIO_INDICE_PADRAO, mmap=True):
+    """
+    Abre um índice salvo por ``construir_indice``.
+
+    Args:
+        diretorio (str): Diretório do índice.
+        mmap (bool): Se True, a matriz CSR é mapeada em memória em vez de lida por inteiro.
+
+    Returns:
+        IndiceCandidatos: Índice pronto para consulta.
+    """
+    metadados, matriz = carregar_matriz(diretorio, mmap=mmap)
+    with open(os.path.join(diretorio, ARQUIVO_VOCABULARIO), 'r', encoding='utf-8') as f:
+        vocabulario = json.load(f)
+    idf = np.load(os.path.join(diretorio, ARQUIVO_IDF))
+
+    candidatos = pd.read_pickle(os.path.join(diretorio, ARQUIVO_CANDIDATOS))
+    curriculos = TextosCurriculos.carregar(diretorio, mmap=mmap)
+    duplicatas = None
+    caminho_duplicatas = os.path.join(diretorio, ARQUIVO_DUPLICATAS)
+    if os.path.exists(caminho_duplicatas):
+        with open(caminho_duplicatas, 'r', encoding='utf-8') as f:
+            duplicatas = json.load(f)
+    candidatos_duplicados = None
+    caminho_duplicados = os.path.join(diretorio, ARQUIVO_CANDIDATOS_DUPLICADOS)
+    if os.path.exists(caminho_duplicados):
+        candidatos_duplicados = pd.read_pickle(caminho_duplicados)
+    vectorizer = criar_vetorizador(vocabulario=vocabulario, idf=idf)
+    return IndiceCandidatos(vectorizer, matriz, candidatos, metadados, curriculos, duplicatas,
+                            candidatos_duplicados)
+
+
+def _ler_candidatos(caminho):
+    if caminho.endswith(".json"):
+        from base_dados import carregar_candidatos_internos
+        return carregar_candidatos_internos(caminho)
+    if caminho.endswith(".xlsx"):
+        return pd.read_excel(caminho)
+    if caminho.endswith(".csv"):
+        return pd.read_csv(caminho)
+    raise ValueError(f"Formato de arquivo de candidatos não suportado: {caminho}")
+
+
+def main():
+    from base_dados import CAMINHO_APPLICANTS
+
+    parser = argparse.ArgumentParser(description="Constrói o índice TF-IDF persistido da base de candidatos.")
+    parser.add_argument("--candidatos", default=CAMINHO_APPLICANTS,
+                        help="applicants.json (base interna), .xlsx no formato do template ou .csv com a coluna 'curriculo'.")
+    parser.add_argument("--saida", default=DIRETORIO_INDICE_PADRAO, help="Diretório de destino do índice.")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos para o pré-processamento (padrão: número de CPUs).")
+    parser.add_argument("--limiar-duplicatas", type=float, default=LIMIAR_DUPLICATAS_PADRAO,
+                        help="Jaccard estimado a partir do qual currículos são tratados como duplicatas (0 desativa).")
+    args = parser.parse_args()
+
+    garantir_recursos_nltk()
+    inicio = time.time()
+    df_candidatos = _ler_candidatos(args.candidatos)
+    print(f"{len(df_candidatos)} candidatos carregados em {time.time() - inicio:.1f}s")
+
+    inicio = time.time()
+    indice = construir_indice(df_candidatos, args.saida, n_processos=args.processos,
+                              limiar_duplicatas=args.limiar_duplicatas or None)
+    print(f"Índice construído em {time.time() - inicio:.1f}s: "
+          f"{indice.metadados['n_candidatos']} candidatos x {indice.metadados['n_termos']} termos "
+          f"(versão {indice.versao}) -> {args.saida}")
+    deduplicacao = indice.metadados.get("deduplicacao")
+    if deduplicacao:
+        originais = deduplicacao["n_candidatos_originais"]
+        removidos = originais - indice.metadados["n_candidatos"]
+        print(f"Deduplicação (limiar {deduplicacao['limiar']}): {deduplicacao['n_grupos_duplicatas']} grupos, "
+              f"{removidos} currículos a menos no índice ({100 * removidos / max(originais, 1):.1f}% menor)")
+
+
+if __name__ == "__main__":
+    main()
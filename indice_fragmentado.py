@@ -0,0 +1,153 @@
+"""
+Consulta do índice de candidatos dividida em fragmentos, um por processo.
+
+A matriz TF-IDF persistida é repartida em ``n_fragmentos`` faixas contíguas de
+linhas. Cada faixa fica com um processo trabalhador, que abre os arquivos do
+índice mapeados em memória e só toca as páginas da sua faixa. Uma consulta é
+enviada a todos os trabalhadores ao mesmo tempo; cada um devolve o seu top-k
+local e o coordenador mescla os resultados. Assim uma consulta usa vários
+núcleos e nenhum processo precisa manter a base inteira.
+
+O modo é ativado pela variável de ambiente ``INDICE_FRAGMENTOS`` (número de
+processos) ou pelo parâmetro ``n_fragmentos`` do IndiceIncremental.
+"""
+import os
+import atexit
+import threading
+import multiprocessing
+
+import numpy as np
+
+from busca_topk import topk_similaridade, mesclar_topk, ordenar_resultados, _bloco_linhas, _vetor_consulta
+from indice_candidatos import DIRETORIO_INDICE_PADRAO, carregar_matriz
+
+
+# 0 ou 1 desativa a fragmentação (consulta no próprio processo).
+N_FRAGMENTOS_PADRAO = int(os.environ.get("INDICE_FRAGMENTOS", "0"))
+
+
+def _faixas(n_linhas, n_fragmentos):
+    limites = np.linspace(0, n_linhas, n_fragmentos + 1).astype(np.int64)
+    return [(int(inicio), int(fim)) for inicio, fim in zip(limites[:-1], limites[1:])]
+
+
+def _trabalhador_fragmento(diretorio, inicio, fim, conexao):
+    """
+    Laço de um processo trabalhador: recebe (vetor da consulta, k, posições
+    excluídas) e responde com (posições globais, scores) do seu fragmento.
+    """
+    _, matriz = carregar_matriz(diretorio)
+    fragmento = _bloco_linhas(matriz, inicio, fim)
+    while True:
+        mensagem = conexao.recv()
+        if mensagem is None:
+            break
+        vetor, k, excluidos = mensagem
+        mascara = None
+        if excluidos is not None and excluidos.shape[0]:
+            mascara = np.zeros(fim - inicio, dtype=bool)
+            mascara[excluidos] = True
+        try:
+            posicoes, scores = topk_similaridade(fragmento, vetor, k, mascara_excluidos=mascara)
+            conexao.send((posicoes + inicio, scores))
+        except Exception as e:
+            conexao.send(e)
+    conexao.close()
+
+
+class IndiceFragmentadoFechado(RuntimeError):
+    """
+    Consulta a um índice fragmentado cujos processos já foram encerrados por ``fechar``.
+    """
+
+
+class IndiceFragmentado:
+    """
+    Coordenador dos processos trabalhadores de um índice persistido.
+
+    Tem a mesma interface de consulta de ``topk_similaridade`` sobre a matriz
+    do índice base: posições e scores globais, do maior para o menor.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_INDICE_PADRAO, n_fragmentos=None):
+        metadados, _ = carregar_matriz(diretorio)
+        self.n_linhas = metadados["n_candidatos"]
+        self.n_termos = metadados["n_termos"]
+        self.tipo_valores = np.dtype(metadados.get("tipo_valores", "float64"))
+        n_fragmentos = max(1, min(n_fragmentos or os.cpu_count() or 1, self.n_linhas))
+        self.faixas = _faixas(self.n_linhas, n_fragmentos)
+        self._trava = threading.Lock()
+
+        # "spawn" evita herdar threads e estado do Streamlit/TensorFlow do processo pai.
+        contexto = multiprocessing.get_context("spawn")
+        self._conexoes, self._processos = [], []
+        for inicio, fim in self.faixas:
+            conexao, conexao_trabalhador = contexto.Pipe()
+            processo = contexto.Process(
+                target=_trabalhador_fragmento, args=(diretorio, inicio, fim, conexao_trabalhador),
+                name=f"fragmento-{inicio}-{fim}", daemon=True
+            )
+            processo.start()
+            conexao_trabalhador.close()
+            self._conexoes.append(conexao)
+            self._processos.append(processo)
+        atexit.register(self.fechar)
+
+    @property
+    def n_fragmentos(self):
+        return len(self.faixas)
+
+    def buscar(self, consulta, k, mascara_excluidos=None):
+        """
+        Top-k sobre todos os fragmentos em paralelo.
+
+        Args:
+            consulta (csr_matrix ou np.ndarray): Vetor TF-IDF da vaga.
+            k (int): Quantidade de resultados.
+            mascara_excluidos (np.ndarray de bool, opcional): Posições que não podem ser retornadas.
+
+        Returns:
+            tuple: (posições, scores) ordenados do maior para o menor score.
+
+        Raises:
+            IndiceFragmentadoFechado: Se ``fechar`` já encerrou os processos.
+        """
+        vetor = _vetor_consulta(consulta, self.n_termos, self.tipo_valores)
+        excluidos = np.flatnonzero(mascara_excluidos) if mascara_excluidos is not None else None
+
+        melhores_indices = np.empty(0, dtype=np.int64)
+        melhores_scores = np.empty(0, dtype=np.float64)
+        # Os pipes não aceitam consultas intercaladas: uma consulta por vez percorre os fragmentos.
+        with self._trava:
+            # Sem conexões o laço abaixo não consultaria nada e o resultado viria vazio.
+            if not self._conexoes:
+                raise IndiceFragmentadoFechado("O índice fragmentado foi fechado.")
+            for (inicio, fim), conexao in zip(self.faixas, self._conexoes):
+                locais = None
+                if excluidos is not None:
+                    locais = excluidos[(excluidos >= inicio) & (excluidos < fim)] - inicio
+                conexao.send((vetor, k, locais))
+            try:
+                respostas = [conexao.recv() for conexao in self._conexoes]
+            except (EOFError, OSError) as e:
+                raise RuntimeError("Um processo do índice fragmentado terminou inesperadamente.") from e
+
+        for resposta in respostas:
+            if isinstance(resposta, Exception):
+                raise resposta
+            indices, scores = resposta
+            melhores_indices, melhores_scores = mesclar_topk(melhores_indices, melhores_scores, indices, scores, k)
+        return ordenar_resultados(melhores_indices, melhores_scores)
+
+    def fechar(self):
+        with self._trava:
+            for conexao, processo in zip(self._conexoes, self._processos):
+                if processo.is_alive():
+                    try:
+                        conexao.send(None)
+                    except (BrokenPipeError, OSError):
+                        pass
+                conexao.close()
+            for processo in self._processos:
+                processo.join(timeout=5)
+            self._conexoes, self._processos = [], []
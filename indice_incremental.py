@@ -0,0 +1,563 @@
+"""
+Índice incremental de candidatos: o índice base (indice_candidatos.py) mais
+segmentos somente-anexo com os candidatos que chegaram depois dele.
+
+Novos candidatos são vetorizados com o vocabulário/IDF fixos do índice base e
+gravados em um segmento pequeno; exclusões são registradas como "lápides" por
+``id_candidato``. Um candidato reenviado substitui o anterior: as linhas antigas
+com o mesmo id recebem uma lápide restrita ao segmento delas (``substituidos.json``),
+de modo que só a linha mais nova fica viva. As consultas percorrem todos os segmentos vivos e mesclam os
+top-k de cada um. Uma compactação (sob demanda ou em uma thread de fundo) junta
+os segmentos em um só, descartando as linhas excluídas.
+
+Uso pela linha de comando:
+
+    python indice_incremental.py adicionar --candidatos novos.xlsx
+    python indice_incremental.py remover --ids 31000 31001
+    python indice_incremental.py compactar
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import shutil
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from busca_topk import topk_similaridade, ordenar_resultados, mesclar_topk
+from indice_ann import USAR_ANN_PADRAO, indice_ann_disponivel, carregar_indice_ann
+from indice_fragmentado import IndiceFragmentado, IndiceFragmentadoFechado, N_FRAGMENTOS_PADRAO
+from indice_candidatos import (
+    DIRETORIO_INDICE_PADRAO, ARQUIVO_DADOS, ARQUIVO_INDICES, ARQUIVO_INDPTR,
+    ARQUIVO_CANDIDATOS, ARQUIVO_METADADOS, TextosCurriculos, carregar_indice, compactar_matriz,
+    separar_curriculos, linhas_candidatos
+)
+from preprocessamento import preprocessar_lote, garantir_recursos_nltk
+
+
+DIRETORIO_SEGMENTOS = "segmentos"
+ARQUIVO_MANIFESTO = "segmentos.json"
+ARQUIVO_EXCLUSOES = "exclusoes.json"
+ARQUIVO_SUBSTITUIDOS = "substituidos.json"
+ARQUIVO_TRAVA = ".trava"
+
+# Uma trava mais antiga que isso foi deixada por um processo que morreu.
+TRAVA_EXPIRADA_S = 120
+
+# Número de segmentos a partir do qual a compactação em segundo plano atua.
+MINIMO_SEGMENTOS_COMPACTACAO = 4
+
+
+def _gravar_json_atomico(caminho, conteudo):
+    diretorio = os.path.dirname(caminho)
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=diretorio)
+    with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _ler_json(caminho, padrao):
+    if not os.path.exists(caminho):
+        return padrao
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class Segmento:
+    """
+    Bloco imutável de candidatos: matriz TF-IDF e dados alinhados linha a linha
+    (com o texto dos currículos à parte, como no índice base).
+    """
+
+    def __init__(self, nome, matriz, candidatos, curriculos=None):
+        self.nome = nome
+        self.matriz = matriz
+        self.candidatos = candidatos
+        self.curriculos = curriculos
+        self._ids = candidatos['id_candidato'].to_numpy()
+        self._mascara = (None, None)
+
+    def __len__(self):
+        return self.matriz.shape[0]
+
+    def linhas(self, posicoes):
+        return linhas_candidatos(self.candidatos, self.curriculos, posicoes)
+
+    def textos(self, posicoes):
+        """
+        Currículos das ``posicoes`` (lista de str).
+        """
+        if self.curriculos is not None:
+            return self.curriculos[posicoes]
+        return self.candidatos['curriculo'].iloc[posicoes].tolist()
+
+    def mascara_exclusoes(self, exclusoes, versao):
+        # A máscara só é recalculada quando o conjunto de exclusões muda.
+        versao_cache, mascara = self._mascara
+        if versao_cache != versao:
+            mascara = np.isin(self._ids, list(exclusoes)) if exclusoes else None
+            self._mascara = (versao, mascara)
+        return mascara
+
+    @classmethod
+    def carregar(cls, diretorio, nome):
+        caminho = os.path.join(diretorio, nome)
+        metadados = _ler_json(os.path.join(caminho, ARQUIVO_METADADOS), {})
+        matriz = sparse.csr_matrix(
+            (np.load(os.path.join(caminho, ARQUIVO_DADOS), mmap_mode='r'),
+             np.load(os.path.join(caminho, ARQUIVO_INDICES), mmap_mode='r'),
+             np.load(os.path.join(caminho, ARQUIVO_INDPTR), mmap_mode='r')),
+            shape=(metadados["n_candidatos"], metadados["n_termos"]),
+            copy=False
+        )
+        return cls(nome, matriz, pd.read_pickle(os.path.join(caminho, ARQUIVO_CANDIDATOS)),
+                   TextosCurriculos.carregar(caminho))
+
+    def salvar(self, diretorio):
+        """
+        Grava o segmento em ``diretorio/<nome>`` de forma atômica.
+        """
+        temporario = tempfile.mkdtemp(prefix=".segmento-", dir=diretorio)
+        matriz = compactar_matriz(self.matriz)
+        np.save(os.path.join(temporario, ARQUIVO_DADOS), matriz.data)
+        np.save(os.path.join(temporario, ARQUIVO_INDICES), matriz.indices)
+        np.save(os.path.join(temporario, ARQUIVO_INDPTR), matriz.indptr)
+        self.candidatos.to_pickle(os.path.join(temporario, ARQUIVO_CANDIDATOS))
+        if self.curriculos is not None:
+            self.curriculos.salvar(temporario)
+        with open(os.path.join(temporario, ARQUIVO_METADADOS), 'w', encoding='utf-8') as f:
+            json.dump({"n_candidatos": int(matriz.shape[0]), "n_termos": int(matriz.shape[1])}, f)
+        os.rename(temporario, os.path.join(diretorio, self.nome))
+
+
+class IndiceIncremental:
+    """
+    Índice base + segmentos anexados + lápides, consultável sem bloquear a ingestão.
+
+    A lista de segmentos é trocada por inteiro (copy-on-write) a cada alteração;
+    uma consulta trabalha sobre a lista que leu no início e nunca espera por
+    ``adicionar``, ``remover`` ou ``compactar``.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_INDICE_PADRAO, n_fragmentos=N_FRAGMENTOS_PADRAO, usar_ann=USAR_ANN_PADRAO):
+        self.diretorio = diretorio
+        self.diretorio_segmentos = os.path.join(diretorio, DIRETORIO_SEGMENTOS)
+        os.makedirs(self.diretorio_segmentos, exist_ok=True)
+        self.base = carregar_indice(diretorio)
+        # O nome inclui a versão: lápides de substituição de uma base anterior não valem para esta.
+        self._segmento_base = Segmento(f"base-{self.base.versao}", self.base.matriz, self.base.candidatos,
+                                       self.base.curriculos)
+        # Com ``usar_ann`` e um ANN construído para esta versão do índice, o segmento base é
+        # consultado por ele; por padrão a busca é exata.
+        self.ann = None
+        if usar_ann and indice_ann_disponivel(diretorio, self.base.versao):
+            self.ann = carregar_indice_ann(diretorio, matriz=self.base.matriz)
+        # Sem ANN, o segmento base pode ser consultado em paralelo por processos trabalhadores.
+        self.fragmentos = None
+        if self.ann is None and n_fragmentos and n_fragmentos > 1:
+            self.fragmentos = IndiceFragmentado(diretorio, n_fragmentos)
+        self._trava = threading.Lock()
+        self._trava_compactacao = threading.Lock()
+        self._segmentos = []
+        self._exclusoes = frozenset()
+        self._substituidos = {}
+        self._versao_exclusoes = 0
+        self._versao_conteudo = (None, None)
+        self._assinatura_disco = None
+        self._thread_compactacao = None
+        self._parar_compactacao = threading.Event()
+        self.recarregar()
+
+    @property
+    def vectorizer(self):
+        return self.base.vectorizer
+
+    @property
+    def segmentos(self):
+        return self._segmentos
+
+    @property
+    def versao(self):
+        """
+        Identifica o conteúdo consultável: muda quando o índice base é
+        reconstruído, quando segmentos entram ou saem e quando as lápides mudam.
+        """
+        self.recarregar()
+        estado = (tuple(segmento.nome for segmento in self._segmentos), self._versao_exclusoes)
+        if self._versao_conteudo[0] != estado:
+            hasher = hashlib.sha256(str(self.base.versao).encode("utf-8"))
+            for nome in estado[0]:
+                hasher.update(nome.encode("utf-8"))
+            hasher.update(json.dumps(sorted(map(str, self._exclusoes))).encode("utf-8"))
+            hasher.update(json.dumps({nome: sorted(map(str, ids)) for nome, ids in self._substituidos.items()},
+                                     sort_keys=True).encode("utf-8"))
+            self._versao_conteudo = (estado, hasher.hexdigest()[:16])
+        return self._versao_conteudo[1]
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _assinatura(self):
+        assinatura = []
+        for nome in (ARQUIVO_MANIFESTO, ARQUIVO_EXCLUSOES, ARQUIVO_SUBSTITUIDOS):
+            try:
+                assinatura.append(os.stat(self._caminho(nome)).st_mtime_ns)
+            except FileNotFoundError:
+                assinatura.append(None)
+        return tuple(assinatura)
+
+    def _sincronizar(self):
+        assinatura = self._assinatura()
+        if assinatura == self._assinatura_disco:
+            return
+        nomes = _ler_json(self._caminho(ARQUIVO_MANIFESTO), [])
+        atuais = {segmento.nome: segmento for segmento in self._segmentos}
+        self._segmentos = [atuais.get(nome) or Segmento.carregar(self.diretorio_segmentos, nome)
+                           for nome in nomes]
+        exclusoes = frozenset(_ler_json(self._caminho(ARQUIVO_EXCLUSOES), []))
+        substituidos = {nome: frozenset(ids)
+                        for nome, ids in _ler_json(self._caminho(ARQUIVO_SUBSTITUIDOS), {}).items()}
+        if exclusoes != self._exclusoes or substituidos != self._substituidos:
+            self._exclusoes = exclusoes
+            self._substituidos = substituidos
+            self._versao_exclusoes += 1
+        self._assinatura_disco = assinatura
+
+    def recarregar(self):
+        """
+        Relê manifesto e lápides do disco (alterações feitas por outro processo).
+        """
+        with self._trava:
+            self._sincronizar()
+
+    @contextmanager
+    def _trava_diretorio(self, timeout=60):
+        # Trava entre processos (servidor e linha de comando) baseada em criação
+        # exclusiva de arquivo, que funciona em qualquer sistema operacional.
+        caminho = self._caminho(ARQUIVO_TRAVA)
+        limite = time.time() + timeout
+        while True:
+            try:
+                os.close(os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(caminho) > TRAVA_EXPIRADA_S:
+                        os.remove(caminho)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > limite:
+                    raise TimeoutError(f"Não foi possível obter a trava do índice em {self.diretorio}.")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def _alterar(self):
+        """
+        Seção crítica de escrita: trava local e entre processos, com o estado
+        ressincronizado do disco antes da alteração.
+        """
+        with self._trava, self._trava_diretorio():
+            self._sincronizar()
+            yield
+            self._assinatura_disco = self._assinatura()
+
+    def _gravar_manifesto(self, segmentos):
+        _gravar_json_atomico(self._caminho(ARQUIVO_MANIFESTO), [segmento.nome for segmento in segmentos])
+        self._segmentos = segmentos
+
+    def _normalizar_ids(self, ids):
+        # As lápides são gravadas em JSON; ids numéricos voltam como int.
+        return [i.item() if hasattr(i, 'item') else i for i in ids]
+
+    def adicionar(self, df_novos, n_processos=None):
+        """
+        Vetoriza novos candidatos com o vocabulário do índice base e os grava em
+        um novo segmento. Ids já presentes no índice (mesmo com lápide) têm as
+        linhas anteriores substituídas; só a nova fica viva.
+
+        Args:
+            df_novos (DataFrame): Candidatos com 'id_candidato' e 'curriculo'.
+            n_processos (int, opcional): Processos usados no pré-processamento.
+
+        Returns:
+            str: Nome do segmento criado.
+        """
+        # Um id repetido no próprio lote vale pela última ocorrência.
+        df_novos = df_novos.drop_duplicates('id_candidato', keep='last')
+        textos = preprocessar_lote(df_novos['curriculo'], n_processos=n_processos)
+        matriz = compactar_matriz(self.vectorizer.transform(textos))
+        nome = f"seg-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        segmento = Segmento(nome, matriz, *separar_curriculos(df_novos))
+        segmento.salvar(self.diretorio_segmentos)
+
+        with self._alterar():
+            ids = set(self._normalizar_ids(df_novos['id_candidato']))
+            # As linhas anteriores desses ids ganham lápide no próprio segmento...
+            substituidos = dict(self._substituidos)
+            for anterior in [self._segmento_base] + self._segmentos:
+                presentes = set(self._normalizar_ids(anterior._ids[np.isin(anterior._ids, list(ids))]))
+                if anterior is self._segmento_base:
+                    # Membros de grupos de duplicatas também estão no índice base.
+                    presentes |= ids & self.base.ids_em_grupos
+                if presentes:
+                    substituidos[anterior.nome] = substituidos.get(anterior.nome, frozenset()) | presentes
+            if substituidos != self._substituidos:
+                self._gravar_substituidos(substituidos)
+            # ...e a lápide global (remoção) deixa de valer, para a linha nova ficar viva.
+            if self._exclusoes & ids:
+                self._gravar_exclusoes(self._exclusoes - ids)
+            self._gravar_manifesto(self._segmentos + [segmento])
+        return nome
+
+    def _gravar_substituidos(self, substituidos):
+        _gravar_json_atomico(self._caminho(ARQUIVO_SUBSTITUIDOS),
+                             {nome: sorted(ids, key=str) for nome, ids in substituidos.items() if ids})
+        self._substituidos = {nome: frozenset(ids) for nome, ids in substituidos.items() if ids}
+        self._versao_exclusoes += 1
+
+    def _exclusoes_segmento(self, segmento):
+        # Lápides globais (remoções) mais as de substituição deste segmento.
+        substituidos = self._substituidos.get(segmento.nome)
+        return self._exclusoes | substituidos if substituidos else self._exclusoes
+
+    def _gravar_exclusoes(self, exclusoes):
+        _gravar_json_atomico(self._caminho(ARQUIVO_EXCLUSOES), sorted(exclusoes, key=str))
+        self._exclusoes = frozenset(exclusoes)
+        self._versao_exclusoes += 1
+
+    def remover(self, ids):
+        """
+        Registra lápides para os ``id_candidato`` informados.
+        """
+        with self._alterar():
+            self._gravar_exclusoes(self._exclusoes | set(self._normalizar_ids(ids)))
+
+    def instantaneo(self):
+        """
+        Estado atual para consulta: o segmento base seguido dos segmentos vivos,
+        a máscara de exclusões de cada um (None quando não há exclusões) e os
+        ids com lápide de cada um (para ``linhas``).
+        """
+        with self._trava:
+            self._sincronizar()
+            segmentos = [self._segmento_base] + self._segmentos
+            exclusoes = [self._exclusoes_segmento(segmento) for segmento in segmentos]
+            versao = self._versao_exclusoes
+        # No base, a linha de um grupo de duplicatas só sai com todos os membros excluídos.
+        mascaras = [segmentos[0].mascara_exclusoes(self.base.exclusoes_efetivas(exclusoes[0]), versao)]
+        mascaras += [segmento.mascara_exclusoes(excluidos, versao)
+                     for segmento, excluidos in zip(segmentos[1:], exclusoes[1:])]
+        return segmentos, mascaras, exclusoes
+
+    def linhas(self, segmento, posicoes, exclusoes):
+        """
+        Candidatos das ``posicoes`` de um segmento de ``instantaneo``; no
+        índice base, com os grupos de duplicatas resolvidos.
+        """
+        if segmento is self._segmento_base:
+            return self.base.linhas(posicoes, exclusoes)
+        return segmento.linhas(posicoes)
+
+    def buscar(self, consulta, k):
+        """
+        Top-k sobre o índice base e todos os segmentos vivos, ignorando excluídos.
+        O índice base usa a busca aproximada (indice_ann.py) quando ela foi
+        construída e habilitada (``usar_ann``), ou os processos de
+        indice_fragmentado.py quando configurados.
+
+        Args:
+            consulta (csr_matrix): Vetor TF-IDF da vaga.
+            k (int): Quantidade de resultados.
+
+        Returns:
+            tuple: (DataFrame com os candidatos, np.ndarray com as similaridades), do maior para o menor.
+        """
+        candidatos, similaridades, _ = self.buscar_com_vetores(consulta, k)
+        return candidatos, similaridades
+
+    def buscar_com_vetores(self, consulta, k):
+        """
+        Como ``buscar``, devolvendo também os vetores TF-IDF dos candidatos
+        retornados (csr_matrix alinhada com o DataFrame).
+        """
+        segmentos, mascaras, exclusoes = self.instantaneo()
+        # Uma leitura por consulta: ``fechar`` (despejo do registro, em outra sessão) zera o atributo.
+        fragmentos = self.fragmentos
+
+        melhores_globais = np.empty(0, dtype=np.int64)
+        melhores_scores = np.empty(0, dtype=np.float64)
+        deslocamentos = np.cumsum([0] + [len(segmento) for segmento in segmentos])
+        for segmento, mascara, deslocamento in zip(segmentos, mascaras, deslocamentos):
+            posicoes = None
+            if segmento is self._segmento_base and self.ann is not None:
+                posicoes, scores = self.ann.buscar(consulta, k, mascara_excluidos=mascara)
+            elif segmento is self._segmento_base and fragmentos is not None:
+                try:
+                    posicoes, scores = fragmentos.buscar(consulta, k, mascara_excluidos=mascara)
+                except IndiceFragmentadoFechado:
+                    # Fechado no meio da consulta: o segmento base é percorrido aqui mesmo.
+                    pass
+            if posicoes is None:
+                posicoes, scores = topk_similaridade(segmento.matriz, consulta, k, mascara_excluidos=mascara)
+            melhores_globais, melhores_scores = mesclar_topk(
+                melhores_globais, melhores_scores, posicoes + deslocamento, scores, k
+            )
+        melhores_globais, melhores_scores = ordenar_resultados(melhores_globais, melhores_scores)
+
+        if melhores_globais.shape[0] == 0:
+            return self.base.linhas([]), melhores_scores, self.base.matriz[[]]
+        # Uma leitura por segmento; depois as partes voltam à ordem do ranking.
+        origem = np.searchsorted(deslocamentos, melhores_globais, side='right') - 1
+        linhas, vetores, selecoes = [], [], []
+        for i in np.unique(origem):
+            selecao = np.flatnonzero(origem == i)
+            locais = melhores_globais[selecao] - deslocamentos[i]
+            linhas.append(self.linhas(segmentos[i], locais, exclusoes[i]))
+            vetores.append(segmentos[i].matriz[locais])
+            selecoes.append(selecao)
+        ordem = np.argsort(np.concatenate(selecoes))
+        resultado = pd.concat(linhas).iloc[ordem]
+        if 'ids_duplicados' in resultado.columns:
+            # Linhas vindas dos segmentos não têm grupos de duplicatas.
+            resultado['ids_duplicados'] = [ids if isinstance(ids, list) else [] for ids in resultado['ids_duplicados']]
+        return resultado, melhores_scores, sparse.vstack(vetores, format='csr')[ordem]
+
+    def compactar(self):
+        """
+        Junta todos os segmentos anexados em um único segmento, descartando as
+        linhas com lápide. Consultas em andamento continuam usando os segmentos
+        antigos até terminarem.
+
+        Returns:
+            str ou None: Nome do segmento compactado (None se não havia o que juntar).
+        """
+        with self._trava_compactacao:
+            return self._compactar()
+
+    def _compactar(self):
+        with self._trava:
+            self._sincronizar()
+            segmentos = self._segmentos
+            exclusoes = [self._exclusoes_segmento(segmento) for segmento in segmentos]
+            substituidos, versao = self._substituidos, self._versao_exclusoes
+        if len(segmentos) < 2 and not (segmentos and any(exclusoes)):
+            return None
+
+        matrizes, candidatos, textos = [], [], []
+        for segmento, excluidos in zip(segmentos, exclusoes):
+            mascara = segmento.mascara_exclusoes(excluidos, versao)
+            manter = np.flatnonzero(~mascara) if mascara is not None else np.arange(len(segmento))
+            matrizes.append(segmento.matriz[manter])
+            candidatos.append(segmento.candidatos.drop(columns=['curriculo'], errors='ignore').iloc[manter])
+            textos.extend(segmento.textos(manter))
+        nome = f"seg-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}-compactado"
+        compactado = Segmento(nome, compactar_matriz(sparse.vstack(matrizes, format='csr')),
+                              pd.concat(candidatos, ignore_index=True), TextosCurriculos.de_textos(textos))
+        compactado.salvar(self.diretorio_segmentos)
+
+        with self._alterar():
+            nomes_compactados = {segmento.nome for segmento in segmentos}
+            nomes_vivos = {segmento.nome for segmento in self._segmentos}
+            if not nomes_compactados <= nomes_vivos:
+                # Outro processo compactou estes segmentos enquanto este trabalhava.
+                shutil.rmtree(os.path.join(self.diretorio_segmentos, nome), ignore_errors=True)
+                return None
+            # Segmentos anexados durante a compactação são preservados.
+            restantes = [s for s in self._segmentos if s.nome not in nomes_compactados]
+            # As substituições já aplicadas somem com as linhas; as registradas durante a
+            # compactação passam a valer para o segmento compactado.
+            atuais = dict(self._substituidos)
+            pendentes = frozenset()
+            for nome_compactado in nomes_compactados:
+                pendentes |= atuais.pop(nome_compactado, frozenset()) - substituidos.get(nome_compactado, frozenset())
+            if pendentes:
+                atuais[nome] = pendentes
+            if atuais != self._substituidos:
+                self._gravar_substituidos(atuais)
+            self._gravar_manifesto([compactado] + restantes)
+
+        for segmento in segmentos:
+            shutil.rmtree(os.path.join(self.diretorio_segmentos, segmento.nome), ignore_errors=True)
+        return nome
+
+    def _laco_compactacao(self, intervalo, minimo_segmentos):
+        while not self._parar_compactacao.wait(intervalo):
+            try:
+                self.recarregar()
+                if len(self._segmentos) >= minimo_segmentos:
+                    nome = self.compactar()
+                    print(f"Compactação concluída: {nome}")
+            except Exception as e:
+                print(f"Erro na compactação do índice incremental: {e}")
+
+    def iniciar_compactacao(self, intervalo=300, minimo_segmentos=MINIMO_SEGMENTOS_COMPACTACAO):
+        """
+        Inicia uma thread de fundo que compacta os segmentos periodicamente.
+        """
+        if self._thread_compactacao and self._thread_compactacao.is_alive():
+            return
+        self._parar_compactacao.clear()
+        self._thread_compactacao = threading.Thread(
+            target=self._laco_compactacao, args=(intervalo, minimo_segmentos),
+            name="compactacao-indice", daemon=True
+        )
+        self._thread_compactacao.start()
+
+    def parar_compactacao(self):
+        self._parar_compactacao.set()
+
+    def fechar(self):
+        """
+        Para a compactação de fundo e encerra os processos do índice fragmentado.
+        Consultas posteriores ainda funcionam, percorrendo o segmento base no
+        próprio processo.
+        """
+        self.parar_compactacao()
+        fragmentos, self.fragmentos = self.fragmentos, None
+        if fragmentos is not None:
+            fragmentos.fechar()
+
+
+def main():
+    from indice_candidatos import _ler_candidatos
+
+    parser = argparse.ArgumentParser(description="Manutenção do índice incremental de candidatos.")
+    parser.add_argument("--indice", default=DIRETORIO_INDICE_PADRAO, help="Diretório do índice base.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    adicionar = subcomandos.add_parser("adicionar", help="Anexa novos candidatos em um segmento.")
+    adicionar.add_argument("--candidatos", required=True, help=".xlsx/.csv com 'id_candidato' e 'curriculo'.")
+    remover = subcomandos.add_parser("remover", help="Registra lápides por id_candidato.")
+    remover.add_argument("--ids", nargs="+", required=True)
+    subcomandos.add_parser("compactar", help="Junta os segmentos em um só.")
+    args = parser.parse_args()
+
+    indice = IndiceIncremental(args.indice)
+    if args.comando == "adicionar":
+        garantir_recursos_nltk()
+        df_novos = _ler_candidatos(args.candidatos)
+        print(f"Segmento {indice.adicionar(df_novos)} criado com {len(df_novos)} candidatos.")
+    elif args.comando == "remover":
+        ids = [int(i) if i.isdigit() else i for i in args.ids]
+        indice.remover(ids)
+        print(f"{len(ids)} candidatos marcados como excluídos.")
+    else:
+        print(f"Segmento compactado: {indice.compactar()}")
+
+
+if __name__ == "__main__":
+    main()
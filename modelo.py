@@ -1,53 +1,272 @@
-import nltk
-import tensorflow as tf
-import re
+import os
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from scipy import sparse
 
+from busca_topk import topk_similaridade
+from features_modelo import ExtratorFeaturesModelo
+from explicacoes import termos_relevantes, N_TERMOS_EXPLICACAO_PADRAO
+from cursor_ranking import CursorRanking, TAMANHO_INICIAL_PADRAO
+from modelo_numpy import ModeloNumpy, caminho_pesos, pesos_atualizados
+from preprocessamento import preprocessar_texto, garantir_recursos_nltk
+from indice_candidatos import ajustar_indice
+from indice_incremental import IndiceIncremental
+from armazem_candidatos import ArmazemCandidatos
+from rastreamento import etapa
+from importacao_tardia import modulo_tardio
+
+# O TensorFlow só é importado ao carregar o modelo Keras (sem os pesos exportados em .npz).
+tf = modulo_tardio("tensorflow")
+
+
+MODO_SIMILARIDADE = "similaridade"
+MODO_DUAS_ETAPAS = "duas_etapas"
+
+K_PRE_SELECAO_PADRAO = 500
+PESO_MODELO_PADRAO = 0.5
 
 
 class SistemaRecomendacao:
     def __init__(self):
-        nltk.download('punkt_tab')
-        nltk.download('stopwords')
-        nltk.download('punkt')        
+        garantir_recursos_nltk()
+        self.extrator_modelo = None
+        self.indice_incremental = None
+        self.armazem = None
+        self._contagens_modelo = {}
+        self._categorico_base = None
+
+    def _carregar_modelo(self, df_candidatos, model_path, caminho_indice=None, caminho_armazem=None):
+        """
+        Carrega o modelo e o índice TF-IDF dos candidatos.
+
+        Se houver pesos exportados por ``modelo_numpy.py`` a partir da versão
+        atual do ``model_path``, o modelo roda no runtime NumPy, sem importar o
+        TensorFlow; caso contrário é carregado pelo Keras.
+
+        Se ``caminho_indice`` apontar para um índice construído por
+        ``indice_candidatos.py``, ele é aberto do disco (com os segmentos
+        incrementais e exclusões registrados depois dele) e seus candidatos
+        substituem ``df_candidatos``; caso contrário o vetorizador é ajustado
+        sobre ``df_candidatos``.
 
-    def _carregar_modelo(self, df_candidatos, model_path):        
+        Se ``caminho_armazem`` apontar para um armazém SQLite/FTS5
+        (``armazem_candidatos.py``), ele tem precedência: a busca pré-filtra
+        os candidatos pelo FTS5 e calcula o cosseno só sobre esse subconjunto,
+        sem manter a base nem a matriz em memória.
+        """
         self.df_candidatos = df_candidatos        
-        self.model = tf.keras.models.load_model(model_path)
-        self.vectorizer, self.embeddings_cv = self._preparar_dados()
+        with etapa("carregar_modelo", model_path=model_path) as atributos:
+            if pesos_atualizados(model_path):
+                self.model = ModeloNumpy.carregar(caminho_pesos(model_path))
+                atributos["runtime"] = "numpy"
+            else:
+                self.model = tf.keras.models.load_model(model_path)
+                atributos["runtime"] = "tensorflow"
+        self.model_path = model_path
+        self.vectorizer, self.embeddings_cv = self._preparar_dados(caminho_indice, caminho_armazem)
     
+    @property
+    def versao_candidatos(self):
+        """
+        Versão da base consultada (índice persistido com segmentos e lápides, ou
+        o índice ajustado em memória), usada para invalidar resultados em cache.
+        """
+        if self.armazem is not None:
+            return self.armazem.versao
+        if self.indice_incremental is not None:
+            return self.indice_incremental.versao
+        return self.indice.versao
+
+    def fechar(self):
+        """
+        Libera os recursos do índice (thread de compactação e processos dos fragmentos).
+        """
+        if self.indice_incremental is not None:
+            self.indice_incremental.fechar()
+
     def _preprocessar_texto(self, text):
-        stop_words = stopwords.words('portuguese')
-        text = re.sub(r'\d+', '', str(text).lower())
-        text = re.sub(r'[^\w\s]', '', text)
-        tokens = word_tokenize(text)
-        return ' '.join([t for t in tokens if t not in stop_words and len(t) > 2])
+        return preprocessar_texto(text)
     
-    def _preparar_dados(self):
-        vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1,2),
-            preprocessor=self._preprocessar_texto
-        )
-
-        print(self.df_candidatos.columns)
-        textos_cv = self.df_candidatos['curriculo'].apply(self._preprocessar_texto)
-        embeddings = vectorizer.fit_transform(textos_cv)
-        return vectorizer, embeddings
+    def _preparar_dados(self, caminho_indice=None, caminho_armazem=None):
+        if caminho_armazem:
+            with etapa("abrir_armazem", caminho_armazem=caminho_armazem) as atributos:
+                self.armazem = ArmazemCandidatos(caminho_armazem)
+                atributos["candidatos"] = len(self.armazem)
+            print(f"Armazém de candidatos aberto de {caminho_armazem} (versão {self.armazem.versao})")
+            # Sem matriz: só os vetores do subconjunto pré-filtrado são lidos a cada busca.
+            # O armazém expõe 'termos' e 'versao' como o índice, usados nas explicações.
+            self.indice = self.armazem
+            self.df_candidatos = None
+            return self.armazem.vectorizer, None
+        if caminho_indice:
+            with etapa("abrir_indice", caminho_indice=caminho_indice) as atributos:
+                self.indice_incremental = IndiceIncremental(caminho_indice)
+                # Novos candidatos chegam em segmentos; a compactação roda em segundo plano.
+                self.indice_incremental.iniciar_compactacao()
+                indice = self.indice_incremental.base
+                atributos["candidatos"] = len(indice)
+            print(f"Índice carregado de {caminho_indice} (versão {indice.versao}, "
+                  f"{len(self.indice_incremental.segmentos)} segmentos incrementais)")
+        else:
+            print(self.df_candidatos.columns)
+            with etapa("ajustar_tfidf", candidatos=len(self.df_candidatos)):
+                indice = ajustar_indice(self.df_candidatos)
+        self.indice = indice
+        self.df_candidatos = indice.candidatos
+        return indice.vectorizer, indice.matriz
     
     def _processar_vaga(self, descricao_vaga):
         processed = self._preprocessar_texto(descricao_vaga)
         return self.vectorizer.transform([processed])
     
-    def recomendar_candidatos(self, descricao_vaga, top_n=5):
-        embedding_vaga = self._processar_vaga(descricao_vaga)
-        similaridades = cosine_similarity(embedding_vaga, self.embeddings_cv).flatten()
-        top_indices = similaridades.argsort()[-top_n:][::-1]
-        
-        resultados = self.df_candidatos.iloc[top_indices].copy()
-        resultados['similaridade'] = similaridades[top_indices]
-        return resultados.sort_values('similaridade', ascending=False)
\ No newline at end of file
+    def _carregar_extrator_modelo(self):
+        # Artefatos do notebook de treino ficam ao lado do modelo_final.keras.
+        if self.extrator_modelo is None:
+            diretorio = os.path.dirname(os.path.abspath(self.model_path))
+            self.extrator_modelo = ExtratorFeaturesModelo.carregar(diretorio)
+        return self.extrator_modelo
+
+    def _contagens_candidatos(self, candidatos):
+        # Cache por id_candidato: vale tanto para o índice base quanto para os segmentos.
+        extrator = self._carregar_extrator_modelo()
+        if self.armazem is not None:
+            # Com o armazém a base não fica em memória; o cache acabaria guardando as
+            # contagens de toda ela, K candidatos novos a cada consulta.
+            return extrator.contagens(extrator.textos_candidatos(candidatos))
+        ids = candidatos['id_candidato'].tolist()
+        faltantes = [i for i, id_candidato in enumerate(ids) if id_candidato not in self._contagens_modelo]
+        if faltantes:
+            textos = extrator.textos_candidatos(candidatos.iloc[faltantes])
+            for i, linha in zip(faltantes, extrator.contagens(textos)):
+                self._contagens_modelo[ids[i]] = linha
+        return sparse.vstack([self._contagens_modelo[id_candidato] for id_candidato in ids], format='csr')
+
+    def _categorico_candidatos(self, candidatos):
+        """
+        Bloco categórico dos ``candidatos``, recortado do bloco de toda a base
+        (calculado uma única vez); candidatos fora dela (segmentos) são codificados na hora.
+        """
+        extrator = self._carregar_extrator_modelo()
+        if self.armazem is not None:
+            return extrator.bloco_candidatos(candidatos)
+        if self._categorico_base is None:
+            base = self.indice.candidatos
+            ids = pd.Index(base['id_candidato'])
+            self._categorico_base = (ids if ids.is_unique else None, extrator.bloco_candidatos(base))
+        ids, bloco = self._categorico_base
+        if ids is not None:
+            posicoes = ids.get_indexer(candidatos['id_candidato'])
+            if (posicoes >= 0).all():
+                return bloco[posicoes]
+        return extrator.bloco_candidatos(candidatos)
+
+    def _pontuar_com_modelo(self, candidatos, descricao_vaga, dados_vaga=None):
+        """
+        Pontua os ``candidatos`` com o modelo treinado, em uma única chamada
+        batched de ``predict``.
+        """
+        extrator = self._carregar_extrator_modelo()
+        with etapa("montar_features_modelo", candidatos=len(candidatos)):
+            features = extrator.matriz(self._contagens_candidatos(candidatos), descricao_vaga,
+                                       self._categorico_candidatos(candidatos), dados_vaga)
+        with etapa("pontuar_modelo", candidatos=len(candidatos)):
+            return self.model.predict(features, batch_size=features.shape[0], verbose=0).ravel()
+
+    def _buscar(self, embedding_vaga, k):
+        """
+        Retorna os ``k`` candidatos mais similares à vaga, suas similaridades e
+        seus vetores TF-IDF.
+        """
+        with etapa("busca_similaridade", k=k):
+            if self.armazem is not None:
+                return self.armazem.buscar(embedding_vaga, k)
+            if self.indice_incremental is not None:
+                return self.indice_incremental.buscar_com_vetores(embedding_vaga, k)
+            posicoes, similaridades = topk_similaridade(self.embeddings_cv, embedding_vaga, k)
+            return self.indice.linhas(posicoes), similaridades, self.embeddings_cv[posicoes]
+
+    def _explicar(self, resultados, vetores, embedding_vaga, n_termos):
+        # Termos da vaga que mais pesaram no cosseno de cada candidato retornado.
+        if n_termos:
+            with etapa("explicar_similaridade", candidatos=len(resultados)):
+                resultados['termos_relevantes'] = termos_relevantes(
+                    vetores, embedding_vaga, self.indice.termos, n_termos
+                )
+        return resultados
+
+    def recomendar_candidatos(self, descricao_vaga, top_n=5, modo=MODO_SIMILARIDADE,
+                              k_pre_selecao=K_PRE_SELECAO_PADRAO, peso_modelo=PESO_MODELO_PADRAO,
+                              dados_vaga=None, n_termos_explicacao=N_TERMOS_EXPLICACAO_PADRAO):
+        """
+        Ranqueia os candidatos para a vaga.
+
+        No modo ``similaridade`` a ordem é dada só pelo cosseno TF-IDF. No modo
+        ``duas_etapas`` o cosseno pré-seleciona os ``k_pre_selecao`` melhores e o
+        modelo_final.keras pontua apenas essa lista; o score final é
+        ``(1 - peso_modelo) * similaridade + peso_modelo * score_modelo``.
+
+        ``dados_vaga`` (campos categóricos da vaga, como em
+        ``base_dados.carregar_vagas_sistema``) completa, junto com os campos
+        categóricos dos candidatos, o bloco estruturado da entrada do modelo.
+
+        A coluna ``termos_relevantes`` lista, para cada candidato, os
+        ``n_termos_explicacao`` termos que mais contribuíram para a similaridade
+        (0 desativa a explicação).
+        """
+        with etapa("vetorizar_vaga"):
+            embedding_vaga = self._processar_vaga(descricao_vaga)
+        return self._ranquear(embedding_vaga, descricao_vaga, top_n, modo, k_pre_selecao,
+                              peso_modelo, dados_vaga, n_termos_explicacao)
+
+    def abrir_cursor(self, descricao_vaga, modo=MODO_SIMILARIDADE, k_pre_selecao=K_PRE_SELECAO_PADRAO,
+                     peso_modelo=PESO_MODELO_PADRAO, dados_vaga=None,
+                     n_termos_explicacao=N_TERMOS_EXPLICACAO_PADRAO,
+                     tamanho_inicial=TAMANHO_INICIAL_PADRAO, resultados_iniciais=None):
+        """
+        Abre um ``CursorRanking`` sobre o ranking completo da vaga, para paginar
+        e exportar além do ``top_n`` de ``recomendar_candidatos``.
+
+        A vaga é vetorizada uma única vez; cada extensão do cursor refaz só a
+        busca (e, no modo ``duas_etapas``, a pontuação da pré-seleção). Nesse
+        modo o ranking se limita aos ``k_pre_selecao`` pré-selecionados.
+
+        Args:
+            descricao_vaga (str): Descrição (já refinada) da vaga.
+            tamanho_inicial (int): Candidatos ranqueados na primeira extensão.
+            resultados_iniciais (DataFrame, opcional): Primeira página já
+                calculada com os mesmos parâmetros (ex.: vinda do cache).
+            Demais argumentos: como em ``recomendar_candidatos``.
+
+        Returns:
+            CursorRanking: Cursor posicionado no início do ranking.
+        """
+        with etapa("vetorizar_vaga"):
+            embedding_vaga = self._processar_vaga(descricao_vaga)
+
+        def buscar(k):
+            return self._ranquear(embedding_vaga, descricao_vaga, k, modo, k_pre_selecao,
+                                  peso_modelo, dados_vaga, n_termos_explicacao)
+
+        if modo == MODO_DUAS_ETAPAS:
+            # A pré-seleção é fixa: pontua-se toda ela de uma vez.
+            return CursorRanking(buscar, k_pre_selecao, limite=k_pre_selecao,
+                                 resultados_iniciais=resultados_iniciais)
+        return CursorRanking(buscar, tamanho_inicial, resultados_iniciais=resultados_iniciais)
+
+    def _ranquear(self, embedding_vaga, descricao_vaga, top_n, modo, k_pre_selecao,
+                  peso_modelo, dados_vaga, n_termos_explicacao):
+        if modo == MODO_DUAS_ETAPAS:
+            pre_selecao, similaridades, vetores = self._buscar(embedding_vaga, max(top_n, k_pre_selecao))
+            scores_modelo = self._pontuar_com_modelo(pre_selecao, descricao_vaga, dados_vaga)
+            scores_finais = (1 - peso_modelo) * similaridades + peso_modelo * scores_modelo
+            ordem = np.argsort(-scores_finais, kind='stable')[:top_n]
+
+            resultados = pre_selecao.iloc[ordem].copy()
+            resultados['similaridade'] = similaridades[ordem]
+            resultados['score_modelo'] = scores_modelo[ordem]
+            resultados['score_final'] = scores_finais[ordem]
+            return self._explicar(resultados, vetores[ordem], embedding_vaga, n_termos_explicacao)
+
+        resultados, similaridades, vetores = self._buscar(embedding_vaga, top_n)
+        resultados['similaridade'] = similaridades
+        return self._explicar(resultados, vetores, embedding_vaga, n_termos_explicacao)
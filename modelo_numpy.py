@@ -0,0 +1,220 @@
+"""
+Inferência do modelo_final.keras só com NumPy/SciPy, sem importar o TensorFlow.
+
+O modelo do modeloRanking.ipynb é uma sequência de camadas densas
+(Dense 128 relu -> Dropout -> Dense 64 relu -> Dropout -> Dense 1 sigmoid);
+em inferência o Dropout é a identidade. ``exportar_pesos`` grava os pesos e
+as ativações de cada camada densa em um ``.npz`` ao lado do ``.keras`` (este
+passo ainda usa o TensorFlow), e ``ModeloNumpy`` refaz o forward a partir
+dele, aceitando diretamente a matriz CSR de features.
+
+    python modelo_numpy.py exportar --modelo modelo_final.keras
+    python modelo_numpy.py verificar --modelo modelo_final.keras --amostras 2000
+"""
+import os
+import sys
+import hashlib
+import argparse
+
+import numpy as np
+from scipy import sparse
+from scipy.special import expit
+
+
+# Tolerância da comparação com o TensorFlow (ambos calculam em float32).
+TOLERANCIA_PADRAO = 1e-5
+
+_ATIVACOES = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "sigmoid": lambda x: expit(x, out=x),
+    "tanh": lambda x: np.tanh(x, out=x),
+}
+
+
+def caminho_pesos(model_path):
+    """
+    Caminho do ``.npz`` exportado para o modelo ``model_path``.
+    """
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def _hash_arquivo(caminho):
+    hasher = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(bloco)
+    return hasher.hexdigest()
+
+
+class ModeloNumpy:
+    """
+    Forward de uma pilha de camadas densas a partir dos pesos exportados.
+
+    ``predict`` tem a mesma assinatura usada com o modelo Keras, de modo que
+    ``SistemaRecomendacao`` usa um ou outro indistintamente.
+    """
+
+    def __init__(self, pesos, vieses, ativacoes, origem_sha256=None):
+        for ativacao in ativacoes:
+            if ativacao not in _ATIVACOES:
+                raise ValueError(f"Ativação '{ativacao}' não suportada pelo runtime NumPy.")
+        self.pesos = [np.ascontiguousarray(p, dtype=np.float32) for p in pesos]
+        self.vieses = [np.asarray(v, dtype=np.float32) for v in vieses]
+        self.ativacoes = list(ativacoes)
+        self.origem_sha256 = origem_sha256
+
+    @property
+    def n_entradas(self):
+        return self.pesos[0].shape[0]
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho, allow_pickle=False) as arquivo:
+            n_camadas = int(arquivo["n_camadas"])
+            return cls(
+                [arquivo[f"pesos_{i}"] for i in range(n_camadas)],
+                [arquivo[f"vies_{i}"] for i in range(n_camadas)],
+                [str(ativacao) for ativacao in arquivo["ativacoes"]],
+                str(arquivo["origem_sha256"]) if "origem_sha256" in arquivo else None,
+            )
+
+    def salvar(self, caminho):
+        arrays = {"n_camadas": np.array(len(self.pesos)), "ativacoes": np.array(self.ativacoes)}
+        if self.origem_sha256:
+            arrays["origem_sha256"] = np.array(self.origem_sha256)
+        for i, (pesos, vies) in enumerate(zip(self.pesos, self.vieses)):
+            arrays[f"pesos_{i}"] = pesos
+            arrays[f"vies_{i}"] = vies
+        np.savez(caminho, **arrays)
+
+    def predict(self, features, batch_size=None, verbose=0):
+        """
+        Pontua as linhas de ``features``.
+
+        Args:
+            features (csr_matrix ou np.ndarray): Matriz (n_amostras, n_entradas).
+            batch_size (int, opcional): Linhas por bloco; padrão é tudo de uma vez.
+            verbose: Ignorado (compatibilidade com ``keras.Model.predict``).
+
+        Returns:
+            np.ndarray: Scores (n_amostras, unidades da última camada) em float32.
+        """
+        if features.shape[1] != self.n_entradas:
+            raise ValueError(f"Entrada com {features.shape[1]} features; o modelo espera {self.n_entradas}.")
+        if sparse.issparse(features):
+            features = features.tocsr().astype(np.float32, copy=False)
+        else:
+            features = np.asarray(features, dtype=np.float32)
+        n_amostras = features.shape[0]
+        batch_size = batch_size or max(n_amostras, 1)
+        saidas = [self._forward(features[inicio:inicio + batch_size])
+                  for inicio in range(0, n_amostras, batch_size)]
+        if not saidas:
+            return np.empty((0, self.vieses[-1].shape[0]), dtype=np.float32)
+        return np.concatenate(saidas)
+
+    def _forward(self, bloco):
+        # Primeira camada: produto esparso x denso direto sobre a CSR.
+        ativacao = np.asarray(bloco @ self.pesos[0], dtype=np.float32)
+        for i, (pesos, vies, nome) in enumerate(zip(self.pesos, self.vieses, self.ativacoes)):
+            if i > 0:
+                ativacao = ativacao @ pesos
+            ativacao += vies
+            ativacao = _ATIVACOES[nome](ativacao)
+        return ativacao
+
+
+def pesos_atualizados(model_path):
+    """
+    True se existe um ``.npz`` exportado a partir da versão atual de ``model_path``.
+    """
+    caminho = caminho_pesos(model_path)
+    if not os.path.exists(caminho):
+        return False
+    if not os.path.exists(model_path):
+        # Implantação só com os pesos exportados.
+        return True
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        origem = str(arquivo["origem_sha256"]) if "origem_sha256" in arquivo else None
+    return origem == _hash_arquivo(model_path)
+
+
+def _carregar_keras(model_path):
+    import tensorflow as tf
+    return tf.keras.models.load_model(model_path)
+
+
+def exportar_pesos(model_path, destino=None):
+    """
+    Extrai os pesos das camadas densas de um modelo Keras sequencial.
+
+    Args:
+        model_path (str): Caminho do ``.keras``.
+        destino (str, opcional): Arquivo ``.npz`` de saída (padrão: ao lado do modelo).
+
+    Returns:
+        ModeloNumpy: O runtime montado com os pesos exportados.
+    """
+    modelo = _carregar_keras(model_path)
+    pesos, vieses, ativacoes = [], [], []
+    for camada in modelo.layers:
+        tipo = type(camada).__name__
+        if tipo == "Dropout":
+            continue
+        if tipo != "Dense":
+            raise ValueError(f"Camada '{camada.name}' ({tipo}) não suportada pelo runtime NumPy.")
+        configuracao = camada.get_config()
+        kernel, *vies = camada.get_weights()
+        pesos.append(kernel)
+        vieses.append(vies[0] if configuracao.get("use_bias", True) else np.zeros(kernel.shape[1], dtype=np.float32))
+        ativacoes.append(configuracao.get("activation", "linear"))
+    runtime = ModeloNumpy(pesos, vieses, ativacoes, origem_sha256=_hash_arquivo(model_path))
+    runtime.salvar(destino or caminho_pesos(model_path))
+    return runtime
+
+
+def _features_aleatorias(n_amostras, n_entradas, densidade=0.01, semente=0):
+    return sparse.random(n_amostras, n_entradas, density=densidade, format='csr',
+                         dtype=np.float32, random_state=np.random.default_rng(semente))
+
+
+def comparar_com_keras(model_path, runtime, n_amostras=1000, semente=0):
+    """
+    Diferença absoluta máxima entre os scores do TensorFlow e do runtime NumPy
+    para ``n_amostras`` entradas esparsas aleatórias.
+    """
+    modelo = _carregar_keras(model_path)
+    features = _features_aleatorias(n_amostras, runtime.n_entradas, semente=semente)
+    esperado = modelo.predict(features, batch_size=n_amostras, verbose=0)
+    obtido = runtime.predict(features)
+    return float(np.max(np.abs(esperado - obtido)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta e verifica o runtime NumPy do modelo de ranking.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    for nome, ajuda in (("exportar", "Grava o .npz com os pesos e confere contra o TensorFlow."),
+                        ("verificar", "Confere um .npz já exportado contra o TensorFlow.")):
+        sub = subcomandos.add_parser(nome, help=ajuda)
+        sub.add_argument("--modelo", default="modelo_final.keras")
+        sub.add_argument("--amostras", type=int, default=1000)
+        sub.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    args = parser.parse_args()
+
+    if args.comando == "exportar":
+        runtime = exportar_pesos(args.modelo)
+        print(f"Pesos de {len(runtime.pesos)} camadas densas ({' -> '.join(runtime.ativacoes)}) "
+              f"gravados em {caminho_pesos(args.modelo)}")
+    else:
+        runtime = ModeloNumpy.carregar(caminho_pesos(args.modelo))
+
+    diferenca = comparar_com_keras(args.modelo, runtime, args.amostras)
+    print(f"Diferença máxima contra o TensorFlow em {args.amostras} amostras: {diferenca:.2e}")
+    if diferenca > args.tolerancia:
+        print(f"ERRO: acima da tolerância {args.tolerancia:.0e}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
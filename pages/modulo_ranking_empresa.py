@@ -2,71 +2,44 @@ import pandas as pd
 import streamlit as st
 import pandas as pd
 import numpy as np
-from io import BytesIO
+from io import BytesIO, StringIO
 import re
 import json
-from modelo import SistemaRecomendacao
+import time
+from modelo import MODO_SIMILARIDADE, MODO_DUAS_ETAPAS, K_PRE_SELECAO_PADRAO
+from cache_resultados import chave_resultado
+from recursos_compartilhados import obter_registro_recomendadores, obter_cache_resultados, obter_aquecimento
+from aquecimento import ETAPA_CANDIDATOS, ETAPA_VAGAS, ETAPA_RECOMENDADOR, PENDENTE, CARREGANDO, PRONTO, ERRO
+from rastreamento import rastro, etapa
+from base_dados import carregar_candidatos_internos, carregar_vagas_sistema
+from indice_candidatos import DIRETORIO_INDICE_PADRAO, indice_disponivel
+from armazem_candidatos import ARQUIVO_ARMAZEM_PADRAO, ArmazemCandidatos, armazem_disponivel
 import apoio_tech as inteligencia_st
 st.title('Ranking de Vagas')
 
 
 
-def extrair_json_colunas(df, colunas):
-    """
-    Extrai colunas específicas de um DataFrame e converte para JSON.
-    
-    Parâmetros:
-    df (DataFrame): O DataFrame de entrada.
-    colunas (list): Lista de nomes de colunas a serem extraídas.
-    
-    Retorna:
-    str: String Dataframe atualizado com as colunas extraídas.
-    """
-    try:
-        
-        for coluna in colunas: # Itera sobre cada coluna que contém JSON
-            # Normaliza a estrutura JSON da coluna especificada para um novo DataFrame.
-            # Isso transforma objetos JSON aninhados em colunas planas.
-            df_normalizado = pd.json_normalize(df[coluna])
-            # Adiciona um prefixo ao nome das novas colunas para evitar conflitos
-            # com colunas existentes e para indicar sua origem.
-            df_normalizado = df_normalizado.add_prefix(f'{coluna}_') 
-            df = df.drop(coluna, axis=1)
-            df = pd.concat([df, df_normalizado], axis=1)            
-        return df
-    except KeyError as e:
-        # Captura erro se uma coluna especificada não existir no DataFrame.
-        print(f"Erro: Coluna não encontrada - {e}. Verifique os nomes das colunas.")
-        KeyError(e)
-def anular_campos_vazio(campo):
-    campo = str(campo)   
-
-    if campo == 'nan':
-        return None
-    
-    if campo != None:
-        campo = campo.strip()
-        
-    if campo ==  "":
-        return None
-    
-    return campo
-
 @st.cache_data # Cacheia o resultado desta função para otimizar o carregamento.
-def carregar_vagas():
+def carregar_vagas_sob_demanda():
     print("Carregando vagas...")
-    with open('dataset/vagas.json', 'r', encoding='utf-8') as f: # Abre o arquivo JSON de vagas.
-        vagas = json.load(f)
-    
-    dados_vagas = []
-    for id_vaga, info in vagas.items():
-        dados_vagas.append({
-            'id_vaga': id_vaga,
-            'titulo': info.get('informacoes_basicas', {}).get('titulo_vaga', 'Sem título'),
-            # Concatena atividades e competências para formar uma descrição completa da vaga.
-            'descricao': f"{info.get('perfil_vaga', {}).get('principais_atividades', '')} {info.get('perfil_vaga', {}).get('competencia_tecnicas_e_comportamentais', '')}" 
-        })
-    return pd.DataFrame(dados_vagas)
+    return carregar_vagas_sistema()
+
+def carregar_vagas():
+    # Usa o catálogo já carregado pelo aquecimento, quando pronto.
+    aquecimento = obter_aquecimento()
+    if aquecimento.pronto(ETAPA_VAGAS):
+        return aquecimento.valor(ETAPA_VAGAS)
+    return carregar_vagas_sob_demanda()
+
+def exibir_aquecimento(aquecimento):
+    # Mostra o andamento de cada etapa enquanto o servidor aquece.
+    rotulos = {ETAPA_CANDIDATOS: "Base de candidatos", ETAPA_VAGAS: "Catálogo de vagas",
+               ETAPA_RECOMENDADOR: "Modelo e índice"}
+    icones = {PENDENTE: "⏸️", CARREGANDO: "⏳", PRONTO: "✅", ERRO: "⚠️"}
+    st.info("⏳ O sistema está aquecendo: a base de candidatos está sendo carregada em segundo plano. "
+            "Esta página é atualizada automaticamente quando ela estiver pronta.")
+    for etapa_aquecimento, estado in aquecimento.estados().items():
+        st.write(f"{icones[estado['estado']]} {rotulos[etapa_aquecimento]}: {estado['estado']}")
 
 def main():
     st.subheader('Sistema de Recomendação de Candidatos')
@@ -86,6 +59,8 @@ def main():
         )
         
         df_candidatos = None
+        # Com o armazém SQLite/FTS5 configurado, a base interna não é carregada em memória.
+        usar_armazem = False
         
         # Lógica para carregar dados de candidatos externos via upload de Excel.
         if fonte_dados == RANKING_DADOS_EXTERNOS:
@@ -197,48 +172,44 @@ def main():
                        
         elif fonte_dados == RANKING_DADOS_INTERNOS:
                 st.subheader("Carregar candidatos do sistema interno")
-                try:
-                    @st.cache_data # Cacheia os dados internos para evitar recarregamentos.
-                    def carregar_dados_internos():                        
-                       
-                        # Lista de colunas consideradas importantes para formar o campo 'curriculo' consolidado.
-                        colunas_importantes = ["cv_pt", "cv_en", "informacoes_profissionais_titulo_profissional", "informacoes_profissionais_area_atuacao", "informacoes_profissionais_conhecimentos_tecnicos", "informacoes_profissionais_certificacoes", "informacoes_profissionais_outras_certificacoes", "informacoes_profissionais_nivel_profissional", "informacoes_profissionais_qualificacoes", "informacoes_profissionais_experiencias", "formacao_e_idiomas_nivel_academico", "formacao_e_idiomas_nivel_ingles", "formacao_e_idiomas_nivel_espanhol", "formacao_e_idiomas_outro_idioma", "formacao_e_idiomas_cursos", "formacao_e_idiomas_outro_curso"]
-                        df_applicants = pd.read_json("dataset/applicants.json", encoding="utf-8")
-                        df_applicants = df_applicants.T # Transpõe o DataFrame (IDs de candidatos como linhas).
-                        # Seleciona colunas que contêm JSON e precisam ser normalizadas, excluindo CVs.
-                        df_applicants['cv_pt'] = df_applicants['cv_pt'].apply(anular_campos_vazio)
-                        df_applicants = df_applicants.dropna(subset=['cv_pt'])
-                        
-                        colunas_applicants = df_applicants.columns.drop(['cv_pt','cv_en'])                        
-                        # Normaliza as colunas JSON.
-                        df_applicants = extrair_json_colunas(df_applicants, list(colunas_applicants))                        
-                        df_applicants.reset_index(names="id_candidato", inplace=True)
-                        # Cria uma coluna 'curriculo' unindo o conteúdo das 'colunas_importantes'.
-                        # Valores nulos são preenchidos com string vazia antes da agregação.
-
-                        
-                        
-                        df_applicants['curriculo'] = df_applicants[colunas_importantes].fillna('').agg(' '.join, axis=1)
-                        df_applicants.rename(columns={'infos_basicas_nome':'nome_candidato'}, inplace=True)
-
-                        # Seleciona as colunas finais e remove linhas com valores nulos em colunas essenciais.
-                        df_applicants = df_applicants[["id_candidato","nome_candidato", "curriculo"]]
-                        df_applicants.dropna(axis=0, how='any', inplace=True)
-                        
-                        return pd.DataFrame(df_applicants)
+                usar_armazem = armazem_disponivel(ARQUIVO_ARMAZEM_PADRAO)
+                aquecimento = obter_aquecimento()
+                if usar_armazem:
+                    # Os candidatos ficam no SQLite; os retornados pela busca são lidos de lá.
+                    armazem = ArmazemCandidatos(ARQUIVO_ARMAZEM_PADRAO)
+                    st.toast(f"{len(armazem)} candidatos no armazém", icon="👥")
+                    with st.expander("Visualizar base interna", expanded=False):
+                        st.dataframe(armazem.primeiros(10), use_container_width=True)
+                else:
+                    if aquecimento.estado(ETAPA_CANDIDATOS)["estado"] in (PENDENTE, CARREGANDO) and aquecimento.em_andamento:
+                        # Não bloqueia a sessão: mostra o aquecimento e verifica de novo em instantes.
+                        exibir_aquecimento(aquecimento)
+                        time.sleep(2)
+                        st.rerun()
+                    try:
+                        @st.cache_data # Cacheia os dados internos para evitar recarregamentos.
+                        def carregar_dados_internos():
+                            return carregar_candidatos_internos()
                     
-                    with st.spinner("Carregando base de candidatos..."):
-                        df_candidatos = carregar_dados_internos() # Carrega e processa os dados.
-                        st.toast(f"{len(df_candidatos)} candidatos carregados", icon="👥")
+                        with st.spinner("Carregando base de candidatos..."):
+                            if aquecimento.pronto(ETAPA_CANDIDATOS):
+                                # Base já carregada pelo aquecimento, compartilhada entre as sessões.
+                                df_candidatos = aquecimento.valor(ETAPA_CANDIDATOS)
+                            else:
+                                if aquecimento.estado(ETAPA_CANDIDATOS)["estado"] == ERRO:
+                                    st.warning("O aquecimento da base falhou; carregando sob demanda.")
+                                df_candidatos = carregar_dados_internos() # Carrega e processa os dados.
+                            st.toast(f"{len(df_candidatos)} candidatos carregados", icon="👥")
                     
-                    with st.expander("Visualizar base interna", expanded=False):
-                        st.dataframe(df_candidatos.head(10), use_container_width=True)
+                        with st.expander("Visualizar base interna", expanded=False):
+                            st.dataframe(df_candidatos.head(10), use_container_width=True)
                 
-                except Exception as e:
-                    st.error(f"Erro ao carregar dados internos: {str(e)}")
-                    st.stop()
-        # Continua o fluxo apenas se os dados dos candidatos (df_candidatos) foram carregados.
-        if df_candidatos is not None:            
+                    except Exception as e:
+                        st.error(f"Erro ao carregar dados internos: {str(e)}")
+                        st.stop()
+        # Continua o fluxo apenas se os dados dos candidatos (df_candidatos) foram carregados
+        # (ou se eles estão no armazém).
+        if df_candidatos is not None or usar_armazem:            
             st.divider()
             MODO_DESCRICAO = "Escrever descrição manual"
             MODO_SELECAO_VAGA = "Selecionar vaga existente"
@@ -251,6 +222,7 @@ def main():
             )
             
             descricao_vaga = ""
+            dados_vaga = None # Campos categóricos da vaga (só para vagas do sistema).
             # Lógica para selecionar uma vaga existente.
             if metodo_descricao == MODO_SELECAO_VAGA:
                 print("Carregando vagas...")
@@ -268,7 +240,8 @@ def main():
                 if vaga_selecionada:
                     # Extrai o ID da vaga selecionada para buscar sua descrição.
                     id_vaga = vaga_selecionada.split(' - ')[0]
-                    descricao_vaga = df_vagas[df_vagas['id_vaga'] == id_vaga]['descricao'].values[0]
+                    dados_vaga = df_vagas[df_vagas['id_vaga'] == id_vaga].iloc[0]
+                    descricao_vaga = dados_vaga['descricao']
                     
                     with col2:
                         with st.expander("Detalhes da vaga selecionada", expanded=True):
@@ -281,43 +254,129 @@ def main():
                 num_candidatos = st.slider("Número de candidatos para recomendar:", 
                                          1, 10, 
                                          min(1, 10))
+                # Modo em duas etapas: o TF-IDF pré-seleciona K candidatos e o modelo treinado reordena.
+                usar_modelo = st.toggle("Reordenar com o modelo treinado (duas etapas)", value=False)
+                k_pre_selecao = K_PRE_SELECAO_PADRAO
+                if usar_modelo:
+                    k_pre_selecao = st.number_input("Candidatos pré-selecionados para o modelo (K):",
+                                                    min_value=10, max_value=5000,
+                                                    value=K_PRE_SELECAO_PADRAO, step=50)
+                
+                # Identifica o ranking exibido: mudar a vaga ou o modo esconde o ranking anterior.
+                parametros_cursor = (fonte_dados, descricao_vaga, usar_modelo, int(k_pre_selecao))
                 
                 if st.button("Gerar Recomendações", type="primary"):
-                    with st.status("Processando recomendações...", expanded=True) as status:                        
-                        instancia = SistemaRecomendacao()
-
+                    # Cada etapa (modelo, índice, Gemini, busca...) é medida, gravada em
+                    # logs/rastros.jsonl e exibida no painel assim que termina.
+                    exibir_etapa = lambda registro: st.write(f"⏱️ {registro['etapa']}: {registro['duracao_ms']:.0f} ms")
+                    with st.status("Processando recomendações...", expanded=True) as status, \
+                            rastro("gerar_recomendacoes", ao_finalizar_etapa=exibir_etapa,
+                                   fonte_dados=fonte_dados, top_n=num_candidatos):
                         # Carrega o modelo de recomendação pré-treinado.
-                        instancia._carregar_modelo(
-                            df_candidatos=df_candidatos,
-                            model_path="modelo_final.keras"
-                        )
-                        # Utiliza a IA para melhorar/refinar a descrição da vaga fornecida.
-                        descricao_vaga_melhorada = inteligencia_st.melhorar_descricao_vaga(descricao_vaga)
-                        print(f"descrição nova :{descricao_vaga_melhorada}")
-                        st.write("📊 Calculando similaridades...")
-                        # Gera as recomendações com base na descrição da vaga melhorada.
-                        resultados = instancia.recomendar_candidatos(
-                            descricao_vaga=descricao_vaga_melhorada,
-                            top_n=num_candidatos
+                        # Para a base interna, usa o índice TF-IDF pré-construído
+                        # (python indice_candidatos.py) quando ele existir.
+                        caminho_indice = None
+                        if fonte_dados == RANKING_DADOS_INTERNOS and indice_disponivel(DIRETORIO_INDICE_PADRAO):
+                            caminho_indice = DIRETORIO_INDICE_PADRAO
+                        # Com o armazém SQLite/FTS5 configurado (ARMAZEM_CANDIDATOS), a busca pré-filtra
+                        # pelo FTS5 e calcula o cosseno só sobre o subconjunto.
+                        caminho_armazem = ARQUIVO_ARMAZEM_PADRAO if usar_armazem else None
+                        # Reaproveita o modelo/índice já carregado por qualquer sessão para a mesma base.
+                        registro = obter_registro_recomendadores()
+                        if fonte_dados == RANKING_DADOS_INTERNOS and \
+                                obter_aquecimento().estado(ETAPA_RECOMENDADOR)["estado"] == CARREGANDO:
+                            # O registro espera a carga em andamento em vez de repeti-la.
+                            st.write("⏳ Modelo e índice ainda aquecendo; aguardando a carga em andamento...")
+                        with etapa("obter_recomendador"):
+                            instancia = registro.obter(
+                                df_candidatos=df_candidatos,
+                                model_path="modelo_final.keras",
+                                caminho_indice=caminho_indice,
+                                caminho_armazem=caminho_armazem
+                            )
+                        estatisticas = registro.estatisticas()
+                        st.write(f"♻️ Cache de recomendadores: {estatisticas['acertos']} acertos, "
+                                 f"{estatisticas['falhas']} falhas")
+                        # Mesma vaga, mesmos parâmetros e mesma base: reaproveita o ranking
+                        # sem chamar o Gemini nem percorrer o índice novamente.
+                        modo = MODO_DUAS_ETAPAS if usar_modelo else MODO_SIMILARIDADE
+                        cache_resultados = obter_cache_resultados()
+                        chave = chave_resultado(
+                            descricao_vaga, num_candidatos, instancia.versao_candidatos,
+                            modo=modo, k_pre_selecao=int(k_pre_selecao) if usar_modelo else None,
+                            model_path=instancia.model_path,
+                            id_vaga=dados_vaga['id_vaga'] if usar_modelo and dados_vaga is not None else None
                         )
+                        with etapa("consultar_cache_resultados") as atributos_cache:
+                            resultados = cache_resultados.obter(chave)
+                            atributos_cache["acerto"] = resultados is not None
+                        if resultados is not None:
+                            st.write("⚡ Ranking reaproveitado do cache de resultados.")
+                            # Descrição refinada usada no ranking, para o cursor estender as próximas páginas.
+                            descricao_vaga_melhorada = resultados.attrs.get('descricao_vaga_melhorada', descricao_vaga)
+                        else:
+                            # Utiliza a IA para melhorar/refinar a descrição da vaga fornecida.
+                            descricao_vaga_melhorada = inteligencia_st.melhorar_descricao_vaga(descricao_vaga)
+                            print(f"descrição nova :{descricao_vaga_melhorada}")
+                            st.write("📊 Calculando similaridades...")
+                            # Gera as recomendações com base na descrição da vaga melhorada.
+                            try:
+                                resultados = instancia.recomendar_candidatos(
+                                    descricao_vaga=descricao_vaga_melhorada,
+                                    top_n=num_candidatos,
+                                    modo=modo,
+                                    k_pre_selecao=int(k_pre_selecao),
+                                    dados_vaga=dados_vaga
+                                )
+                                resultados.attrs['descricao_vaga_melhorada'] = descricao_vaga_melhorada
+                                # Só guarda rankings completos (refinamento e modo pedidos).
+                                if descricao_vaga_melhorada:
+                                    cache_resultados.guardar(chave, resultados)
+                            except FileNotFoundError as e:
+                                # Sem os artefatos do notebook, segue apenas com a similaridade.
+                                st.warning(f"Reordenação pelo modelo indisponível: {e}")
+                                modo = MODO_SIMILARIDADE
+                                resultados = instancia.recomendar_candidatos(
+                                    descricao_vaga=descricao_vaga_melhorada,
+                                    top_n=num_candidatos
+                                )
                         
-                        st.write("🧹 Processando resultados...")
-                        # Preenche valores nulos em colunas específicas para melhor apresentação.
-                        resultados.fillna({
-                            'senioridade': 'Não especificado',
-                            'nome_candidato': 'Nome não informado',
-                            'cv_texto_pt': 'Currículo não disponível' # Assume 'cv_texto_pt' como uma coluna possível.
-                        }, inplace=True)
+                        # Cursor sobre o ranking completo: as próximas páginas e a exportação
+                        # estendem o ranking sem chamar o Gemini novamente.
+                        st.session_state.cursor_ranking = instancia.abrir_cursor(
+                            descricao_vaga_melhorada,
+                            modo=modo,
+                            k_pre_selecao=int(k_pre_selecao),
+                            dados_vaga=dados_vaga,
+                            resultados_iniciais=resultados
+                        )
+                        st.session_state.parametros_cursor = parametros_cursor
+                        st.session_state.pagina_ranking = 0
                         
                         status.update(label="✅ Processo completo!", state="complete", expanded=False)
                         st.balloons()
-                    
+
+                # Exibe a página atual do último ranking gerado para esta vaga e estes parâmetros.
+                cursor = st.session_state.get('cursor_ranking')
+                if cursor is not None and st.session_state.get('parametros_cursor') == parametros_cursor:
                     st.divider()
                     st.subheader("Resultados da Recomendação")
 
+                    pagina = st.session_state.pagina_ranking
+                    resultados = cursor.pagina(pagina, num_candidatos)
+                    # Preenche valores nulos em colunas específicas para melhor apresentação.
+                    resultados.fillna({
+                        'senioridade': 'Não especificado',
+                        'nome_candidato': 'Nome não informado',
+                        'cv_texto_pt': 'Currículo não disponível' # Assume 'cv_texto_pt' como uma coluna possível.
+                    }, inplace=True)
+
                     # Ajusta as colunas exibidas se a fonte de dados for interna.
+                    colunas_exportadas = None
                     if fonte_dados == RANKING_DADOS_INTERNOS:
-                        resultados = resultados[['id_candidato', 'nome_candidato', 'curriculo', 'similaridade']]
+                        colunas_exportadas = ['id_candidato', 'nome_candidato', 'curriculo', 'similaridade',
+                                              'score_modelo', 'score_final', 'termos_relevantes', 'ids_duplicados']
+                        resultados = resultados[[c for c in colunas_exportadas if c in resultados.columns]]
                     
                     
 
@@ -330,11 +389,60 @@ def main():
                                 min_value=0,
                                 max_value=1,
                                 label="Similaridade"
+                            ),
+                            "score_modelo": st.column_config.ProgressColumn(
+                                format="%.2f",
+                                min_value=0,
+                                max_value=1,
+                                label="Score do modelo"
+                            ),
+                            "score_final": st.column_config.ProgressColumn(
+                                format="%.2f",
+                                min_value=0,
+                                max_value=1,
+                                label="Score final"
+                            ),
+                            # Parcela da similaridade devida a cada termo em comum com a vaga.
+                            "termos_relevantes": st.column_config.TextColumn(
+                                label="Termos em comum",
+                                width="large"
+                            ),
+                            # Candidatos com currículo quase idêntico, indexados uma única vez.
+                            "ids_duplicados": st.column_config.ListColumn(
+                                label="Também corresponde a"
                             )
                         },
                         use_container_width=True,
                         hide_index=True
                     )
+                    # Paginação: páginas seguintes são fatias do ranking mantido pelo cursor.
+                    col1, col2, col3 = st.columns([1,2,1])
+                    with col1:
+                        if st.button("⬅️ Anterior", key="ranking_anterior", disabled=(pagina == 0)):
+                            st.session_state.pagina_ranking -= 1
+                            st.rerun()
+                    with col2:
+                        st.write(f"Página {pagina + 1} ({cursor.calculados} candidatos ranqueados até agora)")
+                    with col3:
+                        if st.button("Próxima ➡️", key="ranking_proxima",
+                                     disabled=not cursor.ha_mais((pagina + 1) * num_candidatos)):
+                            st.session_state.pagina_ranking += 1
+                            st.rerun()
+
+                    # Exportação: o CSV é montado lote a lote a partir do cursor.
+                    total_exportacao = st.number_input("Candidatos no CSV exportado:", min_value=1,
+                                                       max_value=cursor.limite or 100000, value=min(100, cursor.limite or 100),
+                                                       step=100)
+                    if st.button("📄 Gerar CSV do ranking"):
+                        with st.spinner("Montando o CSV..."):
+                            buffer_csv = StringIO()
+                            exportados = cursor.exportar_csv(buffer_csv, int(total_exportacao), colunas=colunas_exportadas)
+                        st.download_button(
+                            label=f"📥 Baixar CSV ({exportados} candidatos)",
+                            data=buffer_csv.getvalue(),
+                            file_name="ranking_candidatos.csv",
+                            mime="text/csv"
+                        )
 
     with tab_documentacao:
         st.markdown('''
@@ -367,6 +475,8 @@ def main():
             *   **Carregamento Automático:**
                 *   Os dados são carregados de uma fonte interna (atualmente, `dataset/applicants.json`).
                 *   O sistema processa esses dados: normaliza campos JSON, consolida informações relevantes (de várias colunas como `cv_pt`, `informacoes_profissionais_titulo_profissional`, etc.) na coluna `curriculo`, e renomeia a coluna `infos_basicas_nome` para `nome_candidato`.
+                *   Ao subir o servidor, a base, o catálogo de vagas e o modelo/índice são carregados em segundo plano. Enquanto a base não fica pronta, a página mostra o andamento desse aquecimento e se atualiza sozinha; depois disso, todas as sessões já encontram tudo carregado.
+                *   Opcionalmente (variável `ARMAZEM_CANDIDATOS` apontando para um arquivo gerado por `python armazem_candidatos.py`), a base fica em um armazém SQLite/FTS5 e não é carregada em memória: a busca pré-filtra até 3000 candidatos pelo texto e calcula a similaridade só sobre eles. Isso mantém a memória constante com o crescimento da base, mas custa precisão e tempo: em testes com 20 mil currículos, ~89% dos 10 melhores coincidiram com a busca completa, e cada consulta levou ~280 ms (contra ~6 ms em memória), tempo que cresce com a base.
             *   **Visualização dos Dados:**
                 *   Uma prévia dos primeiros 10 candidatos da base interna pode ser visualizada em uma seção expansível ("Visualizar base interna").
 
@@ -384,9 +494,12 @@ def main():
                 *   O sistema utiliza um modelo de recomendação pré-treinado (`modelo_final.keras`).
                 *   A descrição da vaga fornecida é otimizada por uma IA para melhorar a precisão da busca.
                 *   As similaridades entre os currículos dos candidatos e a descrição da vaga otimizada são calculadas.
+                *   Opcionalmente ("Reordenar com o modelo treinado"), os K candidatos mais similares são pontuados pelo modelo treinado e a ordem final combina as duas pontuações. A entrada do modelo inclui os campos estruturados (nível profissional, idiomas, área de atuação etc.) do candidato e, para vagas existentes, da vaga.
             *   **Exibição dos Resultados:**
-                *   Os candidatos recomendados são exibidos em uma tabela.
+                *   Os candidatos recomendados são exibidos em uma tabela paginada: o controle deslizante define o tamanho da página e os botões "⬅️ Anterior" e "Próxima ➡️" percorrem o ranking completo, calculado sob demanda sem refinar a vaga novamente.
+                *   "📄 Gerar CSV do ranking" exporta os N primeiros candidatos do ranking (no modo em duas etapas, até os K pré-selecionados).
                 *   A coluna "Similaridade" mostra o quão aderente o candidato é à vaga, representada por uma barra de progresso (0 a 1).
+                *   A coluna "Termos em comum" explica a similaridade: lista os termos da vaga que mais pesaram para o candidato e a parcela da similaridade devida a cada um.
                 *   Se a fonte de dados for "Internos", as colunas exibidas são `id_candidato`, `nome_candidato`, `curriculo`, `similaridade`. Para dados externos, outras colunas originais da planilha podem ser mantidas.
 
         #### Como Usar o Módulo:
@@ -0,0 +1,122 @@
+import re
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from importacao_tardia import modulo_tardio
+
+# O NLTK só é importado quando um texto é pré-processado ou um recurso verificado.
+nltk = modulo_tardio("nltk")
+corpus_nltk = modulo_tardio("nltk.corpus")
+
+# Pacote do nltk.download -> caminho procurado por nltk.data.find.
+RECURSOS_NLTK = {
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'punkt': 'tokenizers/punkt',
+}
+
+
+# Abaixo disso o custo de subir processos supera o ganho do paralelismo.
+MINIMO_TEXTOS_PARALELO = 5000
+TAMANHO_BLOCO_PADRAO = 2000
+
+_DIGITOS = re.compile(r'\d+')
+_NAO_PALAVRA = re.compile(r'[^\w\s]')
+# Contrações que o tokenizador Treebank do word_tokenize separa e que continuam
+# existindo depois da remoção de pontuação (as demais regras do tokenizador só
+# atuam sobre pontuação). Mesma ordem e mesmos padrões do NLTK.
+_CONTRACOES = [
+    re.compile(r"(?i)\b(can)(not)\b"),
+    re.compile(r"(?i)\b(gim)(me)\b"),
+    re.compile(r"(?i)\b(gon)(na)\b"),
+    re.compile(r"(?i)\b(got)(ta)\b"),
+    re.compile(r"(?i)\b(lem)(me)\b"),
+    re.compile(r"(?i)\b(wan)(na)(?=\s)"),
+]
+
+
+@lru_cache(maxsize=1)
+def garantir_recursos_nltk():
+    """
+    Garante que os recursos do NLTK usados no pré-processamento estejam disponíveis.
+
+    Cada recurso é procurado primeiro nos diretórios locais do NLTK; o download
+    só acontece para o que faltar, e a verificação roda uma vez por processo.
+
+    Returns:
+        list: Pacotes que precisaram ser baixados.
+    """
+    baixados = []
+    for pacote, caminho in RECURSOS_NLTK.items():
+        try:
+            nltk.data.find(caminho)
+        except LookupError:
+            nltk.download(pacote, quiet=True)
+            baixados.append(pacote)
+    return baixados
+
+
+@lru_cache(maxsize=1)
+def stopwords_portugues():
+    """
+    Stopwords em português carregadas uma única vez por processo.
+    """
+    return frozenset(corpus_nltk.stopwords.words('portuguese'))
+
+
+def _tokenizar(text):
+    # Equivalente ao word_tokenize para texto sem dígitos nem pontuação.
+    text = " " + text + " "
+    for padrao in _CONTRACOES:
+        text = padrao.sub(r" \1 \2 ", text)
+    return text.split()
+
+
+def preprocessar_texto(text):
+    """
+    Normaliza um texto para vetorização: minúsculas, sem dígitos, sem pontuação,
+    sem stopwords em português e sem tokens com até 2 caracteres.
+
+    Args:
+        text (str): Texto de entrada (currículo ou descrição de vaga).
+
+    Returns:
+        str: Tokens resultantes unidos por espaço.
+    """
+    stop_words = stopwords_portugues()
+    text = _DIGITOS.sub('', str(text).lower())
+    text = _NAO_PALAVRA.sub('', text)
+    tokens = _tokenizar(text)
+    return ' '.join([t for t in tokens if t not in stop_words and len(t) > 2])
+
+
+def _preprocessar_bloco(textos):
+    return [preprocessar_texto(texto) for texto in textos]
+
+
+def preprocessar_lote(textos, n_processos=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Aplica ``preprocessar_texto`` a uma coleção de textos, em blocos distribuídos
+    por um pool de processos.
+
+    Args:
+        textos (iterable): Textos a processar (ex.: coluna 'curriculo').
+        n_processos (int, opcional): Processos do pool; padrão é o número de CPUs.
+            Com 1 (ou poucos textos) o processamento é feito no processo atual.
+        tamanho_bloco (int): Textos enviados por vez a cada processo.
+
+    Returns:
+        list: Textos pré-processados, na mesma ordem da entrada.
+    """
+    textos = list(textos)
+    n_processos = n_processos or os.cpu_count() or 1
+    if n_processos == 1 or len(textos) < MINIMO_TEXTOS_PARALELO:
+        return _preprocessar_bloco(textos)
+
+    blocos = [textos[i:i + tamanho_bloco] for i in range(0, len(textos), tamanho_bloco)]
+    resultado = []
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        for bloco in executor.map(_preprocessar_bloco, blocos):
+            resultado.extend(bloco)
+    return resultado
@@ -0,0 +1,199 @@
+"""
+Job em lote que pré-calcula os top-N candidatos de todas as vagas do vagas.json.
+
+Todas as descrições são vetorizadas de uma vez no espaço do índice persistido;
+os scores vaga x candidato saem de produtos esparsos em blocos, mantendo só os
+top-N por vaga. Cada lote de vagas vira um arquivo parquet parcial, o que torna
+o job retomável: uma nova execução pula os lotes já gravados.
+
+    python ranking_lote.py --top-n 50 --processos 4 --saida ranking_vagas.parquet
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+from base_dados import CAMINHO_VAGAS, carregar_vagas_sistema
+from busca_topk import topk_similaridade_lote
+from indice_candidatos import DIRETORIO_INDICE_PADRAO
+from indice_incremental import IndiceIncremental
+from preprocessamento import preprocessar_lote, garantir_recursos_nltk
+
+
+ARQUIVO_SAIDA_PADRAO = "ranking_vagas.parquet"
+TOP_N_PADRAO = 50
+VAGAS_POR_LOTE = 128
+ARQUIVO_MANIFESTO_LOTE = "manifesto.json"
+
+# Estado de cada processo do pool (o índice é aberto uma vez por processo).
+_indice_processo = None
+
+
+def _iniciar_processo(diretorio_indice):
+    global _indice_processo
+    _indice_processo = IndiceIncremental(diretorio_indice, n_fragmentos=0)
+
+
+def _top_n_segmentos(indice, consultas, top_n):
+    """
+    Top-N por vaga considerando o índice base, os segmentos incrementais e as
+    exclusões. Cada resultado é referenciado por (número do segmento, posição).
+    """
+    segmentos, mascaras, exclusoes = indice.instantaneo()
+
+    melhores_ref, melhores_scores = [], []
+    for numero, (segmento, mascara) in enumerate(zip(segmentos, mascaras)):
+        posicoes, scores = topk_similaridade_lote(segmento.matriz, consultas, top_n, mascara_excluidos=mascara)
+        melhores_ref.append(np.stack([np.full_like(posicoes, numero), posicoes], axis=-1))
+        melhores_scores.append(scores)
+    referencias = np.concatenate(melhores_ref, axis=1)
+    scores = np.concatenate(melhores_scores, axis=1)
+    ordem = np.argsort(-scores, axis=1, kind='stable')[:, :top_n]
+    return (segmentos, exclusoes, np.take_along_axis(referencias, ordem[..., None], axis=1),
+            np.take_along_axis(scores, ordem, axis=1))
+
+
+def _processar_lote(numero_lote, vagas_lote, consultas, top_n, diretorio_partes):
+    segmentos, exclusoes, referencias, scores = _top_n_segmentos(_indice_processo, consultas, top_n)
+    n_vagas, n_colunas = scores.shape
+
+    # Resolve id/nome dos candidatos por segmento, sem laço por linha.
+    numeros_segmento = referencias[..., 0].ravel()
+    posicoes = referencias[..., 1].ravel()
+    ids = np.empty(posicoes.shape[0], dtype=object)
+    nomes = np.empty(posicoes.shape[0], dtype=object)
+    # Demais ids do grupo de duplicatas, separados por vírgula ('' fora de grupos).
+    duplicados = np.full(posicoes.shape[0], '', dtype=object)
+    for numero, segmento in enumerate(segmentos):
+        selecao = (numeros_segmento == numero) & (posicoes >= 0)
+        candidatos = segmento.candidatos.iloc[posicoes[selecao]]
+        if numero == 0:
+            # Grupos de duplicatas do índice base: membros vivos e representante eleito.
+            candidatos = _indice_processo.base.resolver_grupos(candidatos.copy(), exclusoes[0])
+            if 'ids_duplicados' in candidatos.columns:
+                for posicao, grupo in zip(np.flatnonzero(selecao), candidatos['ids_duplicados']):
+                    duplicados[posicao] = ', '.join(str(i) for i in grupo)
+        ids[selecao] = candidatos['id_candidato'].astype(str).to_numpy()
+        if 'nome_candidato' in candidatos.columns:
+            nomes[selecao] = candidatos['nome_candidato'].to_numpy()
+
+    resultado = pd.DataFrame({
+        'id_vaga': np.repeat(vagas_lote['id_vaga'].astype(str).to_numpy(), n_colunas),
+        'titulo_vaga': np.repeat(vagas_lote['titulo'].to_numpy(), n_colunas),
+        'posicao': np.tile(np.arange(1, n_colunas + 1), n_vagas),
+        'id_candidato': ids,
+        'nome_candidato': nomes,
+        'similaridade': scores.ravel(),
+        'ids_duplicados': duplicados,
+    })
+    resultado = resultado[posicoes >= 0]
+
+    caminho = os.path.join(diretorio_partes, f"parte_{numero_lote:05d}.parquet")
+    temporario = caminho + ".tmp"
+    pq.write_table(pa.Table.from_pandas(resultado, preserve_index=False), temporario)
+    os.replace(temporario, caminho)
+    return numero_lote, len(resultado)
+
+
+def _preparar_diretorio_partes(diretorio_partes, parametros):
+    """
+    Reaproveita lotes de uma execução anterior somente se ela usou os mesmos
+    parâmetros e a mesma versão do índice (``IndiceIncremental.versao``, que
+    inclui as lápides: um candidato removido entre as execuções invalida os lotes).
+    """
+    caminho_manifesto = os.path.join(diretorio_partes, ARQUIVO_MANIFESTO_LOTE)
+    if os.path.exists(caminho_manifesto):
+        with open(caminho_manifesto, 'r', encoding='utf-8') as f:
+            if json.load(f) == parametros:
+                return
+        print("Parâmetros ou índice mudaram desde a última execução; recomeçando do zero.")
+        shutil.rmtree(diretorio_partes)
+    os.makedirs(diretorio_partes, exist_ok=True)
+    with open(caminho_manifesto, 'w', encoding='utf-8') as f:
+        json.dump(parametros, f, indent=2)
+
+
+def ranquear_todas_vagas(caminho_saida=ARQUIVO_SAIDA_PADRAO, top_n=TOP_N_PADRAO,
+                         diretorio_indice=DIRETORIO_INDICE_PADRAO, caminho_vagas=CAMINHO_VAGAS,
+                         n_processos=None, vagas_por_lote=VAGAS_POR_LOTE):
+    """
+    Calcula os top-N candidatos de cada vaga e grava o resultado em parquet.
+
+    Args:
+        caminho_saida (str): Arquivo parquet final.
+        top_n (int): Candidatos mantidos por vaga.
+        diretorio_indice (str): Índice persistido dos candidatos.
+        caminho_vagas (str): Arquivo vagas.json.
+        n_processos (int, opcional): Processos do pool; padrão é o número de CPUs.
+        vagas_por_lote (int): Vagas por arquivo parcial (unidade de retomada).
+
+    Returns:
+        str: Caminho do arquivo gerado.
+    """
+    n_processos = n_processos or os.cpu_count() or 1
+    indice = IndiceIncremental(diretorio_indice, n_fragmentos=0)
+    df_vagas = carregar_vagas_sistema(caminho_vagas)
+    print(f"{len(df_vagas)} vagas; vetorizando descrições...")
+    consultas = indice.vectorizer.transform(
+        preprocessar_lote(df_vagas['descricao'], n_processos=n_processos)
+    ).tocsr()
+
+    diretorio_partes = caminho_saida + ".partes"
+    _preparar_diretorio_partes(diretorio_partes, {
+        # Base, segmentos e lápides (exclusões e linhas substituídas).
+        "versao_indice": indice.versao,
+        "n_vagas": len(df_vagas),
+        "top_n": top_n,
+        "vagas_por_lote": vagas_por_lote,
+    })
+
+    lotes = range(0, len(df_vagas), vagas_por_lote)
+    pendentes = [inicio for inicio in lotes
+                 if not os.path.exists(os.path.join(diretorio_partes, f"parte_{inicio // vagas_por_lote:05d}.parquet"))]
+    print(f"{len(lotes) - len(pendentes)} de {len(lotes)} lotes já concluídos.")
+
+    inicio_job = time.time()
+    with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_processo,
+                             initargs=(diretorio_indice,)) as executor:
+        futuros = [
+            executor.submit(_processar_lote, inicio // vagas_por_lote,
+                            df_vagas.iloc[inicio:inicio + vagas_por_lote],
+                            consultas[inicio:inicio + vagas_por_lote], top_n, diretorio_partes)
+            for inicio in pendentes
+        ]
+        for futuro in tqdm(as_completed(futuros), total=len(futuros), desc="Lotes de vagas"):
+            futuro.result()
+
+    partes = sorted(nome for nome in os.listdir(diretorio_partes) if nome.endswith(".parquet"))
+    tabela = pa.concat_tables([pq.read_table(os.path.join(diretorio_partes, nome)) for nome in partes])
+    pq.write_table(tabela, caminho_saida)
+    shutil.rmtree(diretorio_partes)
+    print(f"{tabela.num_rows} linhas gravadas em {caminho_saida} em {time.time() - inicio_job:.1f}s.")
+    return caminho_saida
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-calcula os top-N candidatos de todas as vagas.")
+    parser.add_argument("--saida", default=ARQUIVO_SAIDA_PADRAO, help="Arquivo parquet de saída.")
+    parser.add_argument("--top-n", type=int, default=TOP_N_PADRAO, help="Candidatos por vaga.")
+    parser.add_argument("--indice", default=DIRETORIO_INDICE_PADRAO, help="Diretório do índice de candidatos.")
+    parser.add_argument("--vagas", default=CAMINHO_VAGAS, help="Arquivo vagas.json.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos em paralelo (padrão: número de CPUs).")
+    parser.add_argument("--vagas-por-lote", type=int, default=VAGAS_POR_LOTE,
+                        help="Vagas por arquivo parcial (unidade de retomada).")
+    args = parser.parse_args()
+
+    garantir_recursos_nltk()
+    ranquear_todas_vagas(args.saida, args.top_n, args.indice, args.vagas, args.processos, args.vagas_por_lote)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Rastreamento leve das etapas do fluxo de ranking.
+
+``etapa`` é um context manager que mede uma etapa (carregar o modelo, ajustar
+o TF-IDF, chamada ao Gemini, busca por similaridade...) e grava o resultado
+como uma linha JSON em ``logs/rastros.jsonl``. Etapas abertas dentro de um
+``rastro`` ficam agrupadas pelo mesmo identificador, guardam a etapa pai e
+são repassadas a um callback (usado pela página para exibi-las no painel
+``st.status``).
+
+Fora de um ``rastro`` (jobs em lote, processos de fragmentos, benchmarks) as
+etapas não são medidas nem gravadas, para não escrever uma linha por chamada
+nos laços quentes; ``RASTROS_SEM_RASTRO=1`` as grava mesmo assim.
+
+    with rastro("gerar_recomendacoes", ao_finalizar_etapa=mostrar):
+        with etapa("busca_similaridade", k=10):
+            ...
+"""
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+ARQUIVO_RASTROS_PADRAO = os.environ.get("RASTROS_ARQUIVO", os.path.join("logs", "rastros.jsonl"))
+# Grava também as etapas executadas fora de um ``rastro``.
+GRAVAR_SEM_RASTRO = os.environ.get("RASTROS_SEM_RASTRO", "0") == "1"
+
+_rastro_atual = ContextVar("rastro_atual", default=None)
+_etapa_atual = ContextVar("etapa_atual", default=None)
+_trava_arquivo = threading.Lock()
+
+
+class Rastro:
+    """
+    Conjunto das etapas de uma execução do fluxo (por exemplo, um clique em
+    "Gerar Recomendações").
+    """
+
+    def __init__(self, nome, ao_finalizar_etapa=None, arquivo=ARQUIVO_RASTROS_PADRAO):
+        self.id = uuid.uuid4().hex[:16]
+        self.nome = nome
+        self.ao_finalizar_etapa = ao_finalizar_etapa
+        self.arquivo = arquivo
+        self.etapas = []
+
+    def resumo(self):
+        """
+        Duração total (ms) de cada etapa, na ordem em que terminaram.
+        """
+        return [(registro["etapa"], registro["duracao_ms"]) for registro in self.etapas]
+
+
+def _gravar(registro, arquivo):
+    if not arquivo:
+        return
+    linha = json.dumps(registro, ensure_ascii=False, default=str)
+    try:
+        diretorio = os.path.dirname(arquivo)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with _trava_arquivo, open(arquivo, 'a', encoding='utf-8') as f:
+            f.write(linha + "\n")
+    except OSError as e:
+        # O rastreamento nunca interrompe o fluxo principal.
+        print(f"Não foi possível gravar o rastro em {arquivo}: {e}")
+
+
+@contextmanager
+def rastro(nome, ao_finalizar_etapa=None, arquivo=ARQUIVO_RASTROS_PADRAO, **atributos):
+    """
+    Abre um rastro: todas as ``etapa`` executadas dentro dele compartilham o
+    mesmo identificador. O próprio rastro é registrado como a etapa raiz.
+
+    Args:
+        nome (str): Nome do fluxo rastreado.
+        ao_finalizar_etapa (callable, opcional): Chamado com o registro (dict) de cada etapa concluída.
+        arquivo (str): Arquivo JSONL de destino (None desativa a gravação).
+        **atributos: Informações extras gravadas na etapa raiz.
+
+    Yields:
+        Rastro: O rastro em andamento (``.etapas`` acumula os registros).
+    """
+    atual = Rastro(nome, ao_finalizar_etapa, arquivo)
+    token = _rastro_atual.set(atual)
+    try:
+        with etapa(nome, **atributos):
+            yield atual
+    finally:
+        _rastro_atual.reset(token)
+
+
+@contextmanager
+def etapa(nome, **atributos):
+    """
+    Mede uma etapa e registra nome, duração, etapa pai, status e atributos.
+
+    Os atributos podem ser completados dentro do bloco pelo dict retornado
+    (por exemplo, a quantidade de resultados obtidos). Sem um ``rastro`` ativo
+    (e sem ``GRAVAR_SEM_RASTRO``) nada é registrado.
+
+    Args:
+        nome (str): Nome da etapa.
+        **atributos: Informações extras (tamanho do lote, k, modo...).
+
+    Yields:
+        dict: Atributos da etapa, que podem ser alterados dentro do bloco.
+    """
+    atual = _rastro_atual.get()
+    if atual is None and not GRAVAR_SEM_RASTRO:
+        yield atributos
+        return
+    pai = _etapa_atual.get()
+    id_etapa = uuid.uuid4().hex[:16]
+    token = _etapa_atual.set(id_etapa)
+    registro = {
+        "rastro": atual.id if atual else None,
+        "fluxo": atual.nome if atual else None,
+        "etapa": nome,
+        "id": id_etapa,
+        "pai": pai,
+        "inicio": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pid": os.getpid(),
+        "status": "ok",
+    }
+    inicio = time.perf_counter()
+    try:
+        yield atributos
+    except BaseException as e:
+        registro["status"] = "erro"
+        registro["erro"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _etapa_atual.reset(token)
+        registro["duracao_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+        registro["atributos"] = atributos
+        _gravar(registro, atual.arquivo if atual else ARQUIVO_RASTROS_PADRAO)
+        if atual is not None:
+            atual.etapas.append(registro)
+            if atual.ao_finalizar_etapa is not None:
+                try:
+                    atual.ao_finalizar_etapa(registro)
+                except Exception as e:
+                    print(f"Erro ao exibir a etapa '{nome}': {e}")
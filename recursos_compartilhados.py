@@ -0,0 +1,27 @@
+"""
+Recursos compartilhados por todas as sessões do servidor (``st.cache_resource``).
+
+Ficam em um módulo próprio para que o ``App.py`` e as páginas obtenham as
+mesmas instâncias: o aquecimento iniciado pelo ``App.py`` publica o
+recomendador no mesmo registro que a página de ranking consulta.
+"""
+import streamlit as st
+
+from aquecimento import Aquecimento
+from cache_resultados import CacheResultados
+from registro_recomendadores import RegistroRecomendadores
+
+
+@st.cache_resource # Um único registro por processo, compartilhado entre todas as sessões.
+def obter_registro_recomendadores():
+    return RegistroRecomendadores()
+
+
+@st.cache_resource # Rankings já calculados, compartilhados entre as sessões.
+def obter_cache_resultados():
+    return CacheResultados()
+
+
+@st.cache_resource # Um único aquecimento por processo; o App.py o inicia ao subir o servidor.
+def obter_aquecimento():
+    return Aquecimento(obter_registro_recomendadores())
@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from modelo import SistemaRecomendacao
+from indice_candidatos import ARQUIVO_METADADOS
+
+
+def impressao_digital_candidatos(df_candidatos):
+    """
+    Calcula um hash do conteúdo da base de candidatos.
+
+    Duas bases com as mesmas colunas e os mesmos valores, na mesma ordem, geram a
+    mesma impressão digital, independentemente da sessão que as carregou.
+
+    Args:
+        df_candidatos (DataFrame): Base de candidatos.
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal.
+    """
+    hasher = hashlib.sha256()
+    hasher.update("\x1f".join(map(str, df_candidatos.columns)).encode("utf-8"))
+    hasher.update(pd.util.hash_pandas_object(df_candidatos, index=False).values.tobytes())
+    return hasher.hexdigest()
+
+
+def _versao_indice(caminho_indice):
+    with open(os.path.join(caminho_indice, ARQUIVO_METADADOS), 'r', encoding='utf-8') as f:
+        return json.load(f).get("versao")
+
+
+class RegistroRecomendadores:
+    """
+    Registro de instâncias de ``SistemaRecomendacao`` compartilhado pelo processo.
+
+    Cada instância é identificada pela impressão digital da base de candidatos
+    (ou pela versão do índice persistido) e pelo caminho do modelo, de forma que
+    todas as sessões que ranqueiam a mesma base reutilizam o modelo e o índice
+    já carregados. Mantém no máximo ``capacidade`` instâncias (LRU); a
+    instância despejada é fechada (``SistemaRecomendacao.fechar``).
+    """
+
+    def __init__(self, capacidade=4):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._travas_chave = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def _chave(self, df_candidatos, model_path, caminho_indice, caminho_armazem=None):
+        if caminho_armazem:
+            # A versão do armazém muda a cada escrita; a instância aberta continua válida.
+            return ("armazem", os.path.abspath(caminho_armazem), model_path)
+        if caminho_indice:
+            return ("indice", os.path.abspath(caminho_indice), _versao_indice(caminho_indice), model_path)
+        return ("base", impressao_digital_candidatos(df_candidatos), model_path)
+
+    def obter(self, df_candidatos, model_path, caminho_indice=None, caminho_armazem=None):
+        """
+        Retorna um ``SistemaRecomendacao`` carregado para a base informada,
+        criando-o apenas se ainda não existir no registro.
+
+        Args:
+            df_candidatos (DataFrame): Base de candidatos.
+            model_path (str): Caminho do modelo Keras.
+            caminho_indice (str, opcional): Índice persistido a ser usado no lugar da base.
+            caminho_armazem (str, opcional): Armazém SQLite/FTS5 (tem precedência sobre o índice).
+
+        Returns:
+            SistemaRecomendacao: Instância pronta para ``recomendar_candidatos``.
+        """
+        chave = self._chave(df_candidatos, model_path, caminho_indice, caminho_armazem)
+        with self._trava:
+            if chave in self._itens:
+                self.acertos += 1
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+            trava_chave = self._travas_chave.setdefault(chave, threading.Lock())
+
+        # Sessões concorrentes pedindo a mesma base esperam uma única construção.
+        with trava_chave:
+            with self._trava:
+                if chave in self._itens:
+                    self.acertos += 1
+                    self._itens.move_to_end(chave)
+                    return self._itens[chave]
+                self.falhas += 1
+
+            try:
+                instancia = SistemaRecomendacao()
+                instancia._carregar_modelo(
+                    df_candidatos=df_candidatos,
+                    model_path=model_path,
+                    caminho_indice=caminho_indice,
+                    caminho_armazem=caminho_armazem
+                )
+            except BaseException:
+                # Sem isso a trava da chave ficaria no registro para sempre.
+                with self._trava:
+                    self._travas_chave.pop(chave, None)
+                raise
+
+            despejadas = []
+            with self._trava:
+                self._itens[chave] = instancia
+                while len(self._itens) > self.capacidade:
+                    despejadas.append(self._itens.popitem(last=False)[1])
+                self._travas_chave.pop(chave, None)
+        self._fechar(despejadas)
+        return instancia
+
+    def _fechar(self, instancias):
+        # Fora da trava: encerrar os processos dos fragmentos pode levar alguns segundos.
+        for instancia in instancias:
+            try:
+                instancia.fechar()
+            except Exception as e:
+                print(f"Erro ao fechar recomendador despejado: {e}")
+
+    def limpar(self):
+        with self._trava:
+            instancias = list(self._itens.values())
+            self._itens.clear()
+        self._fechar(instancias)
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "instancias": len(self._itens),
+            }
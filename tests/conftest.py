@@ -0,0 +1,58 @@
+import os
+import sys
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório, sem pacote instalável.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indice_candidatos import ajustar_indice, salvar_indice
+from preprocessamento import garantir_recursos_nltk, preprocessar_lote
+
+
+# Palavras sintéticas só com letras: passam inteiras pelo pré-processamento.
+SILABAS = ["ka", "lo", "mi", "ru", "te", "zo", "ba", "ne"]
+VOCABULARIO = ["".join(silabas) for silabas in itertools.product(SILABAS, repeat=3)]
+
+
+def gerar_curriculos(n, semente=0, palavras=30):
+    """
+    Currículos sintéticos, reprodutíveis pela ``semente``.
+    """
+    aleatorio = np.random.default_rng(semente)
+    return [" ".join(aleatorio.choice(VOCABULARIO, size=palavras)) for _ in range(n)]
+
+
+def gerar_candidatos(n, primeiro_id=1000, semente=0):
+    return pd.DataFrame({
+        "id_candidato": np.arange(primeiro_id, primeiro_id + n),
+        "nome_candidato": [f"Candidato {i}" for i in range(primeiro_id, primeiro_id + n)],
+        "curriculo": gerar_curriculos(n, semente),
+    })
+
+
+def consulta(indice, texto):
+    """
+    Vetor TF-IDF de ``texto`` no vocabulário do índice.
+    """
+    return indice.vectorizer.transform(preprocessar_lote([texto], n_processos=1))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def recursos_nltk():
+    garantir_recursos_nltk()
+
+
+@pytest.fixture
+def base_candidatos():
+    return gerar_candidatos(80)
+
+
+@pytest.fixture
+def diretorio_indice(tmp_path, base_candidatos):
+    diretorio = str(tmp_path / "indice")
+    salvar_indice(ajustar_indice(base_candidatos, n_processos=1), diretorio)
+    return diretorio
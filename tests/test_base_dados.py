@@ -0,0 +1,153 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from base_dados import (COLUNAS_IMPORTANTES, CAMPOS_CATEGORICOS_CANDIDATO, anular_campos_vazio,
+                        carregar_candidatos_internos, concatenar_colunas, iterar_objeto_json)
+
+
+APPLICANTS = {
+    "31000": {
+        "infos_basicas": {"nome": "Ana \"Aninha\" Souza", "email": "ana@exemplo.com"},
+        "informacoes_profissionais": {
+            "titulo_profissional": "Engenheira de dados",
+            "conhecimentos_tecnicos": "Python, SQL, Spark\nAirflow",
+            "certificacoes": "AWS \\ GCP",
+            "nivel_profissional": "Sênior",
+            "remuneracao": 12500.75,
+        },
+        "formacao_e_idiomas": {"nivel_academico": "Ensino Superior Completo", "nivel_ingles": "Avançado",
+                               "cursos": "Ciência da Computação"},
+        "cv_pt": "  Experiência com pipelines em Python — ETL, ☁️ e análise 😀  ",
+        "cv_en": "Data engineer",
+    },
+    # Seções vazias, nulas ou ausentes viram campos vazios.
+    "31001": {
+        "infos_basicas": {"nome": "Bruno"},
+        "informacoes_profissionais": {},
+        "formacao_e_idiomas": None,
+        "cv_pt": "Desenvolvedor Java com Spring",
+    },
+    "31002": {"infos_basicas": {"nome": "Carla"}, "cv_pt": "Analista de testes é ção 😀"},
+    # Sem CV em português (vazio ou só espaços) ou sem nome: fica de fora.
+    "31003": {"infos_basicas": {"nome": "Diego"}, "cv_pt": "   "},
+    "31004": {"infos_basicas": {"nome": "Eva"}, "cv_pt": ""},
+    "31005": {"infos_basicas": {}, "cv_pt": "Sem nome"},
+    "31006": {"infos_basicas": {"nome": "Fábio"}},
+    # Objeto aninhado dentro de uma seção não vira texto.
+    "31007": {
+        "infos_basicas": {"nome": "Gabi", "telefones": {"celular": "11 99999-0000"}},
+        "informacoes_profissionais": {"area_atuacao": {"principal": "TI"}, "experiencias": [1.5e3, -2E-2, 0, True, None]},
+        "cv_pt": "Consultora SAP",
+    },
+}
+
+
+def gravar_json(caminho, conteudo, **opcoes):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f, **opcoes)
+    return str(caminho)
+
+
+@pytest.fixture(params=[{"ensure_ascii": True}, {"ensure_ascii": False, "indent": 2}], ids=["ascii", "indentado"])
+def arquivo_applicants(tmp_path, request):
+    return gravar_json(tmp_path / "applicants.json", APPLICANTS, **request.param)
+
+
+def referencia_candidatos(caminho):
+    """
+    Carga original (antes da leitura em fluxo): json.load + colunas '<seção>_<campo>'
+    + junção linha a linha das ``COLUNAS_IMPORTANTES``.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        applicants = json.load(f)
+    linhas = []
+    for id_candidato, applicant in applicants.items():
+        cv_pt = anular_campos_vazio(applicant.get('cv_pt')) if applicant.get('cv_pt') is not None else None
+        nome = (applicant.get('infos_basicas') or {}).get('nome')
+        if cv_pt is None or nome is None:
+            continue
+        campos = {'cv_pt': cv_pt, 'cv_en': applicant.get('cv_en')}
+        for secao, conteudo in applicant.items():
+            if isinstance(conteudo, dict):
+                campos.update({f"{secao}_{campo}": valor for campo, valor in conteudo.items()
+                               if not isinstance(valor, dict)})
+        linhas.append({"id_candidato": int(id_candidato), "nome_candidato": nome, **campos})
+    df = pd.DataFrame(linhas).reindex(columns=["id_candidato", "nome_candidato"] + COLUNAS_IMPORTANTES)
+    df['curriculo'] = df[COLUNAS_IMPORTANTES].fillna('').astype(str).agg(' '.join, axis=1)
+    for coluna, nome in CAMPOS_CATEGORICOS_CANDIDATO.items():
+        df[nome] = df[coluna].fillna('')
+    return df
+
+
+@pytest.mark.parametrize("tamanho_leitura", [1, 2, 3, 5, 7, 16, 64, 1 << 20])
+def test_iterar_objeto_json_equivale_ao_json_load(arquivo_applicants, tamanho_leitura):
+    with open(arquivo_applicants, 'r', encoding='utf-8') as f:
+        esperado = list(json.load(f).items())
+    assert list(iterar_objeto_json(arquivo_applicants, tamanho_leitura)) == esperado
+
+
+def test_iterar_objeto_json_em_todos_os_cortes(tmp_path):
+    # Números, escapes e literais cortados em qualquer posição da leitura.
+    conteudo = {"a": 12.5, "b": -3e-7, "c": 1E+10, "d": "x\"y\\z é 😀", "e": [True, False, None],
+                "f": {}, "g": [], "h": 0, "i": 123456789012345678901234567890}
+    caminho = gravar_json(tmp_path / "cortes.json", conteudo, separators=(',', ':'))
+    tamanho = len(open(caminho, encoding='utf-8').read())
+    for tamanho_leitura in range(1, tamanho + 1):
+        assert dict(iterar_objeto_json(caminho, tamanho_leitura)) == conteudo, tamanho_leitura
+
+
+@pytest.mark.parametrize("texto", ["{}", "  {\n}\n", "{ }"])
+def test_iterar_objeto_json_vazio(tmp_path, texto):
+    caminho = tmp_path / "vazio.json"
+    caminho.write_text(texto, encoding='utf-8')
+    assert list(iterar_objeto_json(str(caminho), 1)) == []
+
+
+@pytest.mark.parametrize("texto", ["[1, 2]", '{"a": 1 "b": 2}', '{"a" 1}', '{"a": 1,'])
+def test_iterar_objeto_json_invalido(tmp_path, texto):
+    caminho = tmp_path / "invalido.json"
+    caminho.write_text(texto, encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(iterar_objeto_json(str(caminho), 2))
+
+
+@pytest.mark.parametrize("tamanho_bloco", [1, 2, 3, 10000])
+def test_carregar_candidatos_equivale_a_carga_original(arquivo_applicants, tamanho_bloco):
+    df = carregar_candidatos_internos(arquivo_applicants, manter_campos=True, usar_cache=False,
+                                      tamanho_bloco=tamanho_bloco)
+    esperado = referencia_candidatos(arquivo_applicants)
+
+    assert df['id_candidato'].tolist() == [31000, 31001, 31002, 31007]
+    assert df['id_candidato'].tolist() == esperado['id_candidato'].tolist()
+    assert df['nome_candidato'].tolist() == esperado['nome_candidato'].tolist()
+    assert df['curriculo'].tolist() == esperado['curriculo'].tolist()
+    for nome in CAMPOS_CATEGORICOS_CANDIDATO.values():
+        assert df[nome].tolist() == esperado[nome].tolist(), nome
+    # Seções vazias, nulas ou ausentes: campos "".
+    assert (df.loc[df['id_candidato'] == 31001, 'informacoes_profissionais_conhecimentos_tecnicos'] == '').all()
+
+
+@pytest.mark.parametrize("tamanho_bloco", [1, 4, 10000])
+def test_concatenar_colunas_equivale_ao_join_por_linha(tamanho_bloco):
+    aleatorio = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "texto": ["á b", None, "", "x\ny", "😀", "  ", np.nan, "fim"],
+        "numero": [1, 2.5, None, 0, -3, 7, 8, 9],
+        "misto": ["a", 3, None, True, "ç", "", "b", 4.0],
+        "vazio": [None] * 8,
+    }, index=aleatorio.permutation(8) + 10)
+    colunas = ["texto", "numero", "misto", "vazio"]
+    esperado = df[colunas].fillna('').astype(str).agg(' '.join, axis=1)
+
+    resultado = concatenar_colunas(df, colunas, tamanho_bloco)
+    assert resultado.tolist() == esperado.tolist()
+    assert resultado.index.equals(df.index)
+
+
+def test_concatenar_colunas_ausentes_e_vazio():
+    df = pd.DataFrame({"a": ["x", "y"]})
+    assert concatenar_colunas(df, ["a", "nao_existe", "a"]).tolist() == ["x  x", "y  y"]
+    assert concatenar_colunas(df.iloc[:0], ["a"]).tolist() == []
@@ -0,0 +1,138 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indice_incremental import IndiceIncremental
+
+from conftest import consulta, gerar_candidatos, gerar_curriculos
+
+
+@pytest.fixture
+def indice(diretorio_indice):
+    indice = IndiceIncremental(diretorio_indice, n_fragmentos=0)
+    yield indice
+    indice.fechar()
+
+
+def ids_top_k(indice, texto, k=10):
+    candidatos, similaridades = indice.buscar(consulta(indice, texto), k)
+    return candidatos['id_candidato'].tolist(), similaridades
+
+
+def test_adicionar_e_buscar(indice):
+    novos = gerar_candidatos(5, primeiro_id=5000, semente=1)
+    indice.adicionar(novos, n_processos=1)
+
+    for id_candidato, curriculo in zip(novos['id_candidato'], novos['curriculo']):
+        ids, similaridades = ids_top_k(indice, curriculo)
+        assert ids[0] == id_candidato
+        assert similaridades[0] == pytest.approx(1.0, abs=1e-5)
+    # Outra instância no mesmo diretório enxerga o segmento novo.
+    outro = IndiceIncremental(indice.diretorio, n_fragmentos=0)
+    assert ids_top_k(outro, novos['curriculo'].iloc[0])[0][0] == novos['id_candidato'].iloc[0]
+
+
+def test_readicionar_substitui_linha_anterior(indice, base_candidatos):
+    id_base = int(base_candidatos['id_candidato'].iloc[3])
+    curriculo_antigo = base_candidatos['curriculo'].iloc[3]
+    novo_curriculo = gerar_curriculos(1, semente=7)[0]
+    indice.adicionar(pd.DataFrame({"id_candidato": [id_base], "nome_candidato": ["Reenviado"],
+                                   "curriculo": [novo_curriculo]}), n_processos=1)
+
+    # A linha antiga (no índice base) não volta mais; a nova responde pelo id.
+    ids, _ = ids_top_k(indice, curriculo_antigo, k=len(base_candidatos) + 1)
+    assert ids.count(id_base) == 1
+    candidatos, similaridades = indice.buscar(consulta(indice, novo_curriculo), 1)
+    assert candidatos['id_candidato'].tolist() == [id_base]
+    assert candidatos['curriculo'].iloc[0] == novo_curriculo
+    assert similaridades[0] == pytest.approx(1.0, abs=1e-5)
+
+    # Reenviar de novo substitui também a linha do segmento anterior.
+    terceiro = gerar_curriculos(1, semente=8)[0]
+    indice.adicionar(pd.DataFrame({"id_candidato": [id_base], "curriculo": [terceiro]}), n_processos=1)
+    ids, _ = ids_top_k(indice, novo_curriculo, k=len(base_candidatos) + 2)
+    assert ids.count(id_base) == 1
+    assert ids_top_k(indice, terceiro, k=1)[0] == [id_base]
+
+
+def test_readicionar_removido_volta_a_aparecer(indice, base_candidatos):
+    id_base = int(base_candidatos['id_candidato'].iloc[0])
+    indice.remover([id_base])
+    assert id_base not in ids_top_k(indice, base_candidatos['curriculo'].iloc[0])[0]
+
+    curriculo = gerar_curriculos(1, semente=9)[0]
+    indice.adicionar(pd.DataFrame({"id_candidato": [id_base], "curriculo": [curriculo]}), n_processos=1)
+    assert ids_top_k(indice, curriculo, k=1)[0] == [id_base]
+
+
+def test_remover_e_compactar_mantem_top_k(indice, base_candidatos):
+    primeiro = gerar_candidatos(20, primeiro_id=5000, semente=2)
+    segundo = gerar_candidatos(20, primeiro_id=6000, semente=3)
+    indice.adicionar(primeiro, n_processos=1)
+    indice.adicionar(segundo, n_processos=1)
+    # Reenvio dentro dos segmentos e remoções no base e nos segmentos.
+    indice.adicionar(primeiro.iloc[:3].assign(curriculo=gerar_curriculos(3, semente=4)), n_processos=1)
+    removidos = [int(base_candidatos['id_candidato'].iloc[1]), 5005, 6010]
+    indice.remover(removidos)
+
+    textos = list(base_candidatos['curriculo'].iloc[:5]) + list(primeiro['curriculo'].iloc[:5])
+    antes = [ids_top_k(indice, texto, k=15) for texto in textos]
+    assert indice.compactar() is not None
+    assert len(indice.segmentos) == 1
+    depois = [ids_top_k(indice, texto, k=15) for texto in textos]
+
+    for (ids_antes, scores_antes), (ids_depois, scores_depois) in zip(antes, depois):
+        assert ids_depois == ids_antes
+        np.testing.assert_allclose(scores_depois, scores_antes, rtol=1e-5)
+        assert not set(removidos) & set(ids_depois)
+        assert len(set(ids_depois)) == len(ids_depois)
+
+
+def test_versao_muda_a_cada_escrita(indice, base_candidatos):
+    versoes = [indice.versao]
+    indice.adicionar(gerar_candidatos(3, primeiro_id=5000, semente=5), n_processos=1)
+    versoes.append(indice.versao)
+    indice.adicionar(gerar_candidatos(3, primeiro_id=6000, semente=6), n_processos=1)
+    versoes.append(indice.versao)
+    indice.remover([5001])
+    versoes.append(indice.versao)
+    indice.adicionar(gerar_candidatos(1, primeiro_id=int(base_candidatos['id_candidato'].iloc[2]), semente=7),
+                     n_processos=1)
+    versoes.append(indice.versao)
+    indice.compactar()
+    versoes.append(indice.versao)
+
+    assert len(set(versoes)) == len(versoes)
+    # A versão depende só do estado em disco: outra instância chega ao mesmo valor.
+    assert IndiceIncremental(indice.diretorio, n_fragmentos=0).versao == versoes[-1]
+
+
+def test_trava_do_diretorio(indice):
+    outro = IndiceIncremental(indice.diretorio, n_fragmentos=0)
+    with indice._trava_diretorio():
+        with pytest.raises(TimeoutError):
+            with outro._trava_diretorio(timeout=0.1):
+                pass
+    # Liberada a trava, a escrita do outro processo segue normalmente.
+    outro.remover([1000])
+    assert 1000 not in ids_top_k(indice, gerar_curriculos(1)[0])[0]
+
+
+def test_compactacao_em_segundo_plano(indice, base_candidatos):
+    for semente in range(3):
+        indice.adicionar(gerar_candidatos(5, primeiro_id=5000 + 100 * semente, semente=10 + semente),
+                         n_processos=1)
+    texto = base_candidatos['curriculo'].iloc[0]
+    antes = ids_top_k(indice, texto, k=20)[0]
+
+    indice.iniciar_compactacao(intervalo=0.05, minimo_segmentos=2)
+    limite = time.time() + 10
+    while len(indice.segmentos) > 1 and time.time() < limite:
+        time.sleep(0.05)
+        indice.recarregar()
+    indice.parar_compactacao()
+
+    assert len(indice.segmentos) == 1
+    assert ids_top_k(indice, texto, k=20)[0] == antes